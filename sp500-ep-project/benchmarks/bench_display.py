@@ -0,0 +1,240 @@
+'''This program compares the helpers in display_helper_func.py
+   with the per-quarter loops they replaced, on synthetic
+   histories and projections of increasing length.
+   For each length, it checks that both versions return the
+   same df and prints their times.
+
+   run from the project's directory:
+        python sp500-ep-project/benchmarks/bench_display.py
+'''
+
+import argparse
+import gc
+import sys
+import time
+from copy import deepcopy
+from pathlib import Path
+
+import numpy as np
+import polars as pl
+
+# the project's modules are in the parent directory
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import func_module.calendar_func as cf
+import func_module.dataset_func as ds
+import func_module.display_helper_func as dh
+
+# first quarter of the synthetic history, 2000-Q1
+FIRST_KEY = 2000 * 4 + 1
+# quarters projected by each workbook
+PROJ_QTRS = 12
+
+
+def synthetic_data(n_qtrs, seed= 0):
+    '''
+        history of n_qtrs quarters, most recent first, and
+        the projections made in each quarter
+        return (hist df, proj_dict, stacked proj df)
+    '''
+
+    rng = np.random.default_rng(seed)
+    keys = list(range(FIRST_KEY + n_qtrs - 1, FIRST_KEY - 1, -1))
+    hist_df = pl.DataFrame(
+        {'yr_qtr': keys,
+         '12m_op_eps': rng.uniform(100, 250, n_qtrs)},
+        schema= {'yr_qtr': cf.QTR_KEY_DTYPE,
+                 '12m_op_eps': pl.Float32})
+
+    proj_dict = dict()
+    for key in keys:
+        # projections for the quarters before and after key
+        targets = list(range(key + PROJ_QTRS - 4, key - 4, -1))
+        proj_dict[key] = pl.DataFrame(
+            {'op_eps': rng.uniform(25, 65, PROJ_QTRS),
+             'rep_eps': rng.uniform(20, 60, PROJ_QTRS),
+             '12m_op_eps': rng.uniform(100, 250, PROJ_QTRS),
+             'yr_qtr': targets},
+            schema= {'op_eps': pl.Float32,
+                     'rep_eps': pl.Float32,
+                     '12m_op_eps': pl.Float32,
+                     'yr_qtr': cf.QTR_KEY_DTYPE})
+
+    proj_df = pl.concat([p_df.with_columns(
+                             pl.lit(key, dtype= cf.QTR_KEY_DTYPE)
+                               .alias(ds.PROJ_KEY))
+                         for key, p_df in proj_dict.items()])
+    return hist_df, proj_dict, proj_df
+
+
+def page0_df_loop(df, p_dict, p_dict_columns, name_act):
+    '''
+        page0_df before it was vectorized: a filter,
+        deepcopy, and concat for each quarter
+    '''
+
+    hf = df.select(pl.col(name_act),
+                   pl.col('yr_qtr'))\
+                .filter(cf.is_quarter_4(pl.col('yr_qtr')))\
+                .join(df,
+                      how= 'right',
+                      on= 'yr_qtr',
+                      coalesce= True)\
+                .select(pl.col(name_act),
+                        pl.col('yr_qtr'))
+
+    for idx, yrqtr in enumerate(df['yr_qtr']):
+        pro_df = p_dict[yrqtr]\
+                    .select(p_dict_columns)\
+                    .filter(cf.is_quarter_4(pl.col('yr_qtr')))\
+                    .with_columns(cf.key_year(pl.col('yr_qtr'))
+                                      .alias('year'),
+                                  pl.lit(yrqtr, dtype= cf.QTR_KEY_DTYPE)
+                                      .alias('yr_qtr'))
+        if yrqtr % 4 == 1:
+            pro_df = pro_df.filter(pl.col('year')>= (yrqtr - 1) // 4)
+        if idx == 0:
+            p_df = deepcopy(pro_df)
+        else:
+            p_df = pl.concat([p_df, pro_df],
+                             how= 'vertical')
+
+    p_df = p_df.pivot(index= 'yr_qtr',
+                      on= 'year')
+    p_df = hf.select(['yr_qtr',
+                      name_act])\
+             .join(p_df,
+                   on= 'yr_qtr',
+                   how= 'left',
+                   coalesce= True)
+    return p_df
+
+
+def contemp_12m_fwd_proj_loop(df, p_dict, eps, name_proj):
+    '''
+        contemp_12m_fwd_proj before it was vectorized:
+        fwd_12m_ern_loop for each quarter, one eps col per call
+    '''
+
+    df = df.with_columns(pl.Series(
+                    [fwd_12m_ern_loop(eps, p_dict[yrqtr])
+                     for yrqtr in df['yr_qtr']])
+                         .alias(name_proj))\
+           .cast({name_proj: pl.Float32})
+    return df
+
+
+def fwd_12m_ern_loop(name, p_df):
+    '''
+        fwd_12m_ern before it was vectorized: a sort, four
+        item() lookups, and a full gc for each quarter
+    '''
+
+    p_df = p_df.sort(by= 'yr_qtr')
+    fwd_e = sum((p_df.item(id, name)
+                 for id in range(4)))
+    del p_df
+    gc.collect()
+    return fwd_e
+
+
+def best_time(func, repeat):
+    '''
+        return (result of func(), best of repeat times)
+    '''
+
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+def bench_page0(n_qtrs_lst, repeat):
+    '''
+        time page0_df and page0_df_loop for each length
+        return dict, n_qtrs -> (loop seconds, vectorized seconds)
+    '''
+
+    results = dict()
+    print(f'\n{"page0_df":<12}{"quarters":>10}'
+          f'{"loop":>12}{"vectorized":>12}{"speedup":>10}')
+    for n_qtrs in n_qtrs_lst:
+        hist_df, proj_dict, proj_df = synthetic_data(n_qtrs)
+
+        loop_df, loop_time = best_time(
+            lambda: page0_df_loop(hist_df, proj_dict,
+                                  ['12m_op_eps', 'yr_qtr'],
+                                  '12m_op_eps'),
+            repeat)
+        vect_df, vect_time = best_time(
+            lambda: dh.page0_df(hist_df, proj_df,
+                                '12m_op_eps', '12m_op_eps'),
+            repeat)
+
+        if not vect_df.sort(by= 'yr_qtr')\
+                      .equals(loop_df.sort(by= 'yr_qtr')):
+            print(f'\npage0_df differs for {n_qtrs} quarters')
+
+        results[n_qtrs] = (loop_time, vect_time)
+        print(f'{"":<12}{n_qtrs:>10}'
+              f'{loop_time:>11.4f}s{vect_time:>11.4f}s'
+              f'{loop_time / vect_time:>9.1f}x')
+    return results
+
+
+def bench_fwd_proj(n_qtrs_lst, repeat):
+    '''
+        time contemp_12m_fwd_proj, op and rep in one pass, and
+        contemp_12m_fwd_proj_loop, called for op and for rep,
+        for each length
+        return dict, n_qtrs -> (loop seconds, vectorized seconds)
+    '''
+
+    name_projs = {'op_eps': 'fwd_12mproj_op_eps',
+                  'rep_eps': 'fwd_12mproj_rep_eps'}
+    results = dict()
+    print(f'\n{"fwd_proj":<12}{"quarters":>10}'
+          f'{"loop":>12}{"vectorized":>12}{"speedup":>10}')
+    for n_qtrs in n_qtrs_lst:
+        hist_df, proj_dict, proj_df = synthetic_data(n_qtrs)
+        hist_df = hist_df.select('yr_qtr')
+
+        def loop():
+            df = hist_df
+            for eps, name_proj in name_projs.items():
+                df = contemp_12m_fwd_proj_loop(df, proj_dict,
+                                               eps, name_proj)
+            return df
+
+        loop_df, loop_time = best_time(loop, repeat)
+        vect_df, vect_time = best_time(
+            lambda: dh.contemp_12m_fwd_proj(hist_df, proj_df,
+                                            name_projs),
+            repeat)
+
+        if not vect_df.equals(loop_df):
+            print(f'\ncontemp_12m_fwd_proj differs for '
+                  f'{n_qtrs} quarters')
+
+        results[n_qtrs] = (loop_time, vect_time)
+        print(f'{"":<12}{n_qtrs:>10}'
+              f'{loop_time:>11.4f}s{vect_time:>11.4f}s'
+              f'{loop_time / vect_time:>9.1f}x')
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description= 'compare the display helpers with their loops')
+    parser.add_argument('--quarters', type= int, nargs= '+',
+                        default= [32, 128, 512],
+                        help= 'lengths of the synthetic histories')
+    parser.add_argument('--repeat', type= int, default= 3,
+                        help= 'times each version runs')
+    args = parser.parse_args()
+
+    bench_page0(args.quarters, args.repeat)
+    bench_fwd_proj(args.quarters, args.repeat)
@@ -0,0 +1,106 @@
+'''This program compares the readers of .xlsx workbooks,
+   rd.XLSX_BACKENDS, on the archived sp-500-eps-est workbooks.
+   For each workbook, each reader reads the blocks that
+   update_data.py reads: dates, prices, actuals, margins,
+   quarterly data, and projections. The program checks that
+   the readers return the same dfs and prints their times.
+
+   run from the project's directory:
+        python sp500-ep-project/benchmarks/bench_readers.py [dir]
+   dir defaults to ARCHIVE_DIR in paths.py
+'''
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# the project's modules are in the parent directory
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import paths as sp
+import func_module.read_data_func as rd
+import update_data as ud
+
+
+def read_workbook(file_addr, backend):
+    '''
+        read all blocks that update_data reads from one workbook
+        return dict, block name -> df
+    '''
+
+    active_workbook = rd.open_workbook(file_addr, backend)
+    blocks = rd.read_blocks(active_workbook[ud.SHT_EST_NAME],
+                            ud.SHT_EST_PLAN)
+    blocks |= rd.read_blocks(active_workbook[ud.SHT_QTR_NAME],
+                             ud.SHT_QTR_PLAN)
+    active_workbook.close()
+
+    _, blocks['proj'] = rd.proj_reader(file_addr,
+                                       ud.SHT_EST_NAME,
+                                       ud.SHT_EST_PROJ_DATE_PARAMS,
+                                       ud.SHT_EST_PROJ_PARAMS,
+                                       ud.YR_QTR_NAME,
+                                       backend)
+    return blocks
+
+
+def bench_readers(input_dir, repeat):
+    '''
+        time each backend on each workbook in input_dir
+        return dict, backend -> total seconds (best of repeat)
+    '''
+
+    files = sorted(input_dir.glob('sp-500-eps-est*.xlsx'))
+    if len(files) == 0:
+        print('\n============================================')
+        print(f'No sp-500-eps-est workbooks in \n{input_dir}')
+        print('============================================\n')
+        sys.exit()
+
+    totals = {backend: 0.0 for backend in rd.XLSX_BACKENDS}
+    print(f'\n{"workbook":<36}' +
+          ''.join(f'{backend:>12}' for backend in rd.XLSX_BACKENDS))
+
+    for file_addr in files:
+        results = dict()
+        times = dict()
+        for backend in rd.XLSX_BACKENDS:
+            best = None
+            for _ in range(repeat):
+                start = time.perf_counter()
+                results[backend] = read_workbook(file_addr, backend)
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            times[backend] = best
+            totals[backend] += best
+
+        # the backends must agree, block by block
+        base = results[rd.XLSX_BACKENDS[-1]]
+        for backend in rd.XLSX_BACKENDS[:-1]:
+            for name, df in results[backend].items():
+                if not df.equals(base[name]):
+                    print(f'\n{file_addr.name}: {backend} differs '
+                          f'in block {name}')
+
+        print(f'{file_addr.name:<36}' +
+              ''.join(f'{times[backend]:>11.3f}s'
+                      for backend in rd.XLSX_BACKENDS))
+
+    print(f'{"total":<36}' +
+          ''.join(f'{totals[backend]:>11.3f}s'
+                  for backend in rd.XLSX_BACKENDS))
+    return totals
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description= 'compare the .xlsx readers on s&p workbooks')
+    parser.add_argument('input_dir', nargs= '?', type= Path,
+                        default= sp.ARCHIVE_DIR,
+                        help= 'directory of sp-500-eps-est workbooks')
+    parser.add_argument('--repeat', type= int, default= 3,
+                        help= 'times each workbook is read')
+    args = parser.parse_args()
+
+    bench_readers(args.input_dir, args.repeat)
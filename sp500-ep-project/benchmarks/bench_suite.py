@@ -0,0 +1,270 @@
+'''This program times the readers and the two programs of the project
+   on synthetic workbooks, synth_workbooks.py, at multiples of the
+   current history: 1x, 10x, and 100x by default.
+   For each scale, it times
+        the loaders in read_data_func.py, on the latest workbook:
+            read_sp_date, sp_loader, margin_loader,
+            industry_loader, and fred_reader on DFII10.xlsx
+        update_data_files, from an empty project directory
+        display_data, all pages, from the files just written
+   The loaders' times include indexing the worksheet; the times of
+   the programs include reading and writing their files.
+   The programs run in a fresh process with its cwd set to a
+   temporary project directory, as they run from the command line.
+
+   The results are written as json, to track regressions:
+        {"meta": {python, polars, platform, timestamp, repeat},
+         "results": [{scale, hist_qtrs, workbooks, bench,
+                      seconds, error}, ...]}
+   seconds is the best of repeat times, or null if bench raised
+   error, the text of the exception, else null
+
+   run from the project's directory:
+        python sp500-ep-project/benchmarks/bench_suite.py
+            [--scales 1 10 100] [--repeat n] [--out results.json]
+'''
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import traceback
+from datetime import datetime
+from pathlib import Path
+
+import polars as pl
+
+PROJECT_DIR = Path(__file__).resolve().parents[1]
+# the project's modules are in the parent directory
+sys.path.insert(0, str(PROJECT_DIR))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import synth_workbooks as sw
+
+LOADERS = ['read_sp_date', 'sp_loader', 'margin_loader',
+           'industry_loader', 'fred_reader']
+PROGRAMS = ['update_data_files', 'display_data']
+# directories of a project, relative to its cwd
+PROJECT_DIRS = ['input_dir', 'output_dir/estimates', 'backup_dir',
+                'archive_dir', 'display_dir']
+
+
+def best_time(func, repeat):
+    '''
+        return (best of repeat times of func(), error)
+        error: text of the exception func() raised, else None
+    '''
+
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        try:
+            func()
+        except Exception as err:
+            return None, f'{type(err).__name__}: {err}'
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, None
+
+
+def loader_calls(input_dir):
+    '''
+        the calls of the loaders on the workbooks in input_dir,
+        with the params that update_data.py passes
+        return dict, loader -> (func without args, workbooks to close)
+    '''
+
+    import func_module.read_data_func as rd
+    import update_data as ud
+
+    latest_addr = max(input_dir.glob('sp-500-eps-est*.xlsx'))
+    est_wb = rd.open_workbook(latest_addr, 'fast')
+    fred_wb = rd.open_workbook(input_dir / 'DFII10.xlsx', 'fast')
+    est_sht = est_wb[ud.SHT_EST_NAME]
+    ind_sht = est_wb[ud.SHT_IND_NAME]
+
+    calls = {
+        'read_sp_date': lambda: rd.read_sp_date(
+            est_sht, **{**ud.SHT_EST_DATE_PARAMS,
+                        'include_prices': True}),
+        'sp_loader': lambda: rd.sp_loader(
+            est_sht, **ud.SHT_HIST_PARAMS),
+        'margin_loader': lambda: rd.margin_loader(
+            est_sht, **ud.SHT_BC_MARG_PARAMS),
+        'industry_loader': lambda: rd.industry_loader(
+            ind_sht, **ud.SHT_BC_IND_PARAMS),
+        'fred_reader': lambda: rd.fred_reader(
+            fred_wb.active, **ud.SHT_FRED_PARAMS)
+    }
+    return calls, [est_wb, fred_wb]
+
+
+def bench_loaders(input_dir, repeat):
+    '''
+        time each loader on the workbooks in input_dir
+        return dict, loader -> (seconds, error)
+    '''
+
+    calls, workbooks = loader_calls(input_dir)
+    # the loaders print their errors; keep the report readable
+    with contextlib.redirect_stdout(open(os.devnull, 'w')):
+        results = {loader: best_time(calls[loader], repeat)
+                   for loader in LOADERS}
+    for workbook in workbooks:
+        workbook.close()
+    return results
+
+
+def run_programs(base_dir):
+    '''
+        in the process started by bench_programs, cwd base_dir:
+        run update_data_files, then display_data, once each
+        print json, program -> [seconds, error], to stdout
+    '''
+
+    import matplotlib
+    matplotlib.use('Agg')
+
+    import paths as sp
+    sp.ARCHIVE_DIR = base_dir / 'archive_dir'
+    import update_data as ud
+    ud.HALT_PROCESS = False
+    import display_data as dd
+
+    calls = {'update_data_files': ud.update_data_files,
+             'display_data': lambda: dd.display_data(force= True)}
+    results = dict()
+    with contextlib.redirect_stdout(sys.stderr):
+        for program in PROGRAMS:
+            start = time.perf_counter()
+            try:
+                calls[program]()
+                results[program] = [time.perf_counter() - start, None]
+            except (Exception, SystemExit) as err:
+                traceback.print_exc()
+                results[program] = [None, f'{type(err).__name__}: {err}']
+                break
+    print(json.dumps(results))
+
+
+def bench_programs(input_dir, repeat):
+    '''
+        time update_data_files and display_data, each run in a
+        fresh project directory that contains the workbooks
+        in input_dir
+        return dict, program -> (seconds, error)
+    '''
+
+    results = {program: (None, None) for program in PROGRAMS}
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            base_dir = Path(tmp_dir)
+            for dir_name in PROJECT_DIRS:
+                (base_dir / dir_name).mkdir(parents= True)
+            for file_addr in input_dir.glob('*.xlsx'):
+                shutil.copy(file_addr, base_dir / 'input_dir')
+
+            proc = subprocess.run(
+                [sys.executable, str(Path(__file__).resolve()),
+                 '--run-programs', str(base_dir)],
+                cwd= base_dir, capture_output= True, text= True)
+            try:
+                times = json.loads(proc.stdout.splitlines()[-1])
+            except (IndexError, json.JSONDecodeError):
+                error = proc.stderr.strip().splitlines()[-1:] or \
+                        [f'exit status {proc.returncode}']
+                return {program: (None, error[0])
+                        for program in PROGRAMS}
+
+        for program in PROGRAMS:
+            seconds, error = times.get(program,
+                                       (None, 'did not run'))
+            best, prev_error = results[program]
+            if error is not None or prev_error is not None:
+                results[program] = (None, error or prev_error)
+            else:
+                results[program] = (seconds if best is None
+                                    else min(best, seconds), None)
+    return results
+
+
+def bench_suite(scales, repeat):
+    '''
+        time the loaders and the programs at each scale
+        return dict, the report written as json
+    '''
+
+    report = {'meta': {'python': platform.python_version(),
+                       'polars': pl.__version__,
+                       'platform': platform.platform(),
+                       'timestamp': datetime.now().isoformat(
+                           timespec= 'seconds'),
+                       'repeat': repeat},
+              'results': []}
+
+    print(f'\n{"bench":<20}{"scale":>8}{"quarters":>10}'
+          f'{"workbooks":>11}{"seconds":>12}')
+    for scale in scales:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            input_dir = Path(tmp_dir)
+            start = time.perf_counter()
+            file_addrs = sw.write_input_dir(input_dir, scale)
+            print(f'{"(synth_workbooks)":<20}{scale:>7}x'
+                  f'{sw.BASE_HIST_QTRS * scale:>10}'
+                  f'{len(file_addrs):>11}'
+                  f'{time.perf_counter() - start:>11.3f}s')
+
+            timings = bench_loaders(input_dir, repeat) | \
+                      bench_programs(input_dir, repeat)
+
+        for bench, (seconds, error) in timings.items():
+            report['results'].append(
+                {'scale': scale,
+                 'hist_qtrs': sw.BASE_HIST_QTRS * scale,
+                 'workbooks': len(file_addrs),
+                 'bench': bench,
+                 'seconds': seconds,
+                 'error': error})
+            shown = 'error' if seconds is None else f'{seconds:.3f}s'
+            print(f'{bench:<20}{scale:>7}x'
+                  f'{sw.BASE_HIST_QTRS * scale:>10}'
+                  f'{len(file_addrs):>11}{shown:>12}')
+    return report
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description= 'time the loaders and programs on '
+                     'synthetic workbooks')
+    parser.add_argument('--scales', type= int, nargs= '+',
+                        default= [1, 10, 100],
+                        help= 'multiples of the current history')
+    parser.add_argument('--repeat', type= int, default= 1,
+                        help= 'times each bench runs')
+    parser.add_argument('--out', type= Path,
+                        default= Path('bench_results.json'),
+                        help= 'file for the json results')
+    parser.add_argument('--run-programs', type= Path,
+                        help= argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_programs is not None:
+        run_programs(args.run_programs)
+        sys.exit()
+
+    report = bench_suite(args.scales, args.repeat)
+    with args.out.open('w') as f:
+        json.dump(report, f, indent= 4)
+
+    errors = [result for result in report['results']
+              if result['error'] is not None]
+    for result in errors:
+        print(f'\n{result["bench"]} at {result["scale"]}x: '
+              f'{result["error"]}')
+    print(f'\nWrote results to: \n{args.out}')
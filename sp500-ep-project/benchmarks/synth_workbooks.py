@@ -0,0 +1,263 @@
+'''This program writes synthetic workbooks for the benchmarks:
+   sp-500-eps-est YYYY MM DD.xlsx workbooks, with the
+   ESTIMATES&PEs, QUARTERLY DATA, and SECTOR EPS sheets laid out
+   as the loaders in read_data_func.py expect, and DFII10.xlsx,
+   daily 10-year TIPS rates laid out as FRED writes them.
+   The values are random; the layouts, keys, and types are not.
+
+   at scale 1, the history resembles the current workbooks:
+        BASE_HIST_QTRS quarters of actual data,
+        BASE_WORKBOOKS quarterly workbooks, and
+        BASE_FRED_YEARS years of daily rates
+   scale k multiplies each of these by k; the dates run forward
+   from FIRST_YEAR, so that each quarter's key is unique
+
+   run from the project's directory:
+        python sp500-ep-project/benchmarks/synth_workbooks.py dir [--scale k]
+'''
+
+import argparse
+import random
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+from openpyxl import Workbook
+
+FIRST_YEAR = 1988
+BASE_HIST_QTRS = 146
+BASE_WORKBOOKS = 8
+BASE_FRED_YEARS = 22
+# quarters of projections in each workbook
+PROJ_QTRS = 6
+# quarters of sector eps at scale 1
+BASE_SECTOR_QTRS = 12
+# history in the workbooks before the latest, which
+# update_data.py reads only for their projections;
+# their sector eps do not scale
+PREV_HIST_QTRS = 8
+
+SECTORS = ['Energy', 'Materials', 'Industrials',
+           'Consumer Discretionary', 'Consumer Staples',
+           'Health Care', 'Financials', 'Information Technology',
+           'Communication Services', 'Utilities', 'Real Estate',
+           'Index']
+# 12 "industries", 4 size indexes
+SECTOR_NAMES = [f'S&P {size} {sector} (Sector)'
+                for size in (500, 400, 600, 1500)
+                for sector in SECTORS]
+
+
+def qtr_end(year, qtr):
+    '''
+        datetime of the last day of the quarter
+    '''
+
+    month = 3 * qtr
+    day = date(year + (month == 12), month % 12 + 1, 1) - \
+          timedelta(days= 1)
+    return datetime(day.year, day.month, day.day)
+
+
+def to_key(year, qtr):
+    '''
+        int, consecutive for consecutive quarters
+    '''
+
+    return year * 4 + qtr - 1
+
+
+def from_key(key):
+    '''
+        (year, qtr) of to_key's int
+    '''
+
+    return key // 4, key % 4 + 1
+
+
+def qtrs_back(year, qtr, n_qtrs):
+    '''
+        list of (year, qtr) for n_qtrs quarters,
+        from (year, qtr) back, most recent first
+    '''
+
+    return [from_key(to_key(year, qtr) - idx)
+            for idx in range(n_qtrs)]
+
+
+def make_sp_workbook(file_addr, name_date, n_hist= BASE_HIST_QTRS,
+                     n_sector_qtrs= BASE_SECTOR_QTRS, seed= 0):
+    '''
+        write an sp-500-eps-est workbook dated name_date,
+        with n_hist quarters of actual data and
+        n_sector_qtrs quarters of sector eps
+    '''
+
+    rnd = random.Random(seed)
+    wb = Workbook(write_only= True)
+    year, qtr = name_date.year, (name_date.month - 1) // 3 + 1
+
+    # projections from the quarter before name_date's, the
+    # last actual quarter, forward, oldest first
+    last_act = qtrs_back(year, qtr, 2)[1]
+    proj_qtrs = [from_key(to_key(*last_act) + idx)
+                 for idx in range(PROJ_QTRS)]
+
+# +++++  ESTIMATES&PEs  +++++++++++++++++++++++++++++++++++++++++++++++
+    ws = wb.create_sheet('ESTIMATES&PEs')
+    ws.append(['S&P Dow Jones Indices'])
+    ws.append(['S&P 500 EARNINGS AND ESTIMATE REPORT'])
+    ws.append([])
+    ws.append(['Data as of the close of:', None, None, name_date])
+    ws.append(['S&P 500 close of:', None, None,
+               6000.0 + rnd.random()])
+    ws.append([])
+    ws.append(['QUARTER', 'PRICE', 'OP EPS', 'REP EPS', None,
+               'OP PE', 'REP PE', None, '12M OP', '12M REP'])
+    ws.append(['ESTIMATES'])
+    for yr, q in reversed(proj_qtrs):
+        op_12m = 240 + rnd.random() * 30
+        ws.append([qtr_end(yr, q).strftime('%m/%d/%Y'), None,
+                   60 + rnd.random() * 10, 55 + rnd.random() * 10, None,
+                   20 + rnd.random(), 22 + rnd.random(), None,
+                   op_12m, op_12m * (0.75 + rnd.random() * 0.2)])
+    ws.append([])
+    ws.append([qtr_end(*last_act).strftime('%m/%d/%Y') + ' (prelim.)',
+               5700.0 + rnd.random()])
+    ws.append([])
+    ws.append(['ACTUALS'])
+    hist_qtrs = qtrs_back(*qtrs_back(*last_act, 2)[1], n_hist)
+    for yr, q in hist_qtrs:
+        op_12m = 50 + rnd.random() * 200
+        ws.append([qtr_end(yr, q), 1000 + rnd.random() * 4000,
+                   10 + rnd.random() * 50, 9 + rnd.random() * 50, None,
+                   15 + rnd.random() * 10, 16 + rnd.random() * 10, None,
+                   op_12m, op_12m * (0.75 + rnd.random() * 0.2)])
+    ws.append([])
+    ws.append([])
+
+    # margins: a col for each year, most recent first
+    years = sorted({yr for yr, _ in hist_qtrs}, reverse= True)
+    ws.append(['QTR',
+               *[f'{yr}*' if yr == 2008 else yr for yr in years],
+               None, None, 'note'])
+    for q in (4, 3, 2, 1):
+        ws.append([f'Q{q} margin',
+                   *[rnd.random() * 0.15 for _ in years]])
+    ws.append([])
+    ws.append(['Source: S&P Dow Jones Indices'])
+
+# +++++  QUARTERLY DATA  ++++++++++++++++++++++++++++++++++++++++++++++
+    ws = wb.create_sheet('QUARTERLY DATA')
+    ws.append(['S&P 500 quarterly data'])
+    ws.append([])
+    ws.append(['QUARTER'])
+    ws.append(['END'])
+    for yr, q in hist_qtrs:
+        ws.append([qtr_end(yr, q), rnd.random() * 20, None, None,
+                   400 + rnd.random() * 100, 1000 + rnd.random() * 100,
+                   25 + rnd.random() * 5, None, 8000 + rnd.random() * 500])
+    ws.append([])
+    ws.append(['Source: S&P Dow Jones Indices'])
+
+# +++++  SECTOR EPS  ++++++++++++++++++++++++++++++++++++++++++++++++++
+    ws = wb.create_sheet('SECTOR EPS')
+    sector_qtrs = qtrs_back(*last_act, n_sector_qtrs)
+    ws.append(['S&P sector eps'])
+    ws.append([])
+    ws.append(['INDEX NAME', 'CURRENT PRICE',
+               *[f'{yr} Q{q}' for yr, q in sector_qtrs]])
+    for title in ['Operating Earnings Per Share by Economic Sector',
+                  'As Reported Earnings Per Share by Economic Sector']:
+        ws.append([title])
+        for name in SECTOR_NAMES:
+            ws.append([name, rnd.random() * 1000,
+                       *[rnd.random() * 50 for _ in sector_qtrs]])
+        ws.append([])
+
+    wb.save(file_addr)
+
+
+def make_fred_workbook(file_addr, start, end, seed= 0):
+    '''
+        write DFII10.xlsx with a daily rate for each weekday
+        from start through end
+    '''
+
+    rnd = random.Random(seed)
+    wb = Workbook(write_only= True)
+    ws = wb.create_sheet('FRED Graph')
+    for line in ['FRED Graph Observations',
+                 'Federal Reserve Economic Data',
+                 'Link: https://fred.stlouisfed.org',
+                 'Help: https://fredhelp.stlouisfed.org',
+                 'Economic Research Division',
+                 'Federal Reserve Bank of St. Louis',
+                 None,
+                 'DFII10  Market Yield on U.S. Treasury Securities at '
+                 '10-Year Constant Maturity, Quoted on an '
+                 'Investment Basis, Inflation-Indexed',
+                 None,
+                 'Frequency: Daily']:
+        ws.append([line])
+    ws.append(['observation_date', 'DFII10'])
+
+    day = start
+    while day <= end:
+        if day.weekday() < 5:
+            ws.append([datetime(day.year, day.month, day.day),
+                       round(rnd.random() * 3 - 0.5, 2)])
+        day += timedelta(days= 1)
+    wb.save(file_addr)
+
+
+def write_input_dir(input_dir, scale= 1, seed= 0):
+    '''
+        write the workbooks for one run of update_data.py
+        at scale into input_dir
+        return list of the addresses of the files
+    '''
+
+    input_dir.mkdir(parents= True, exist_ok= True)
+    n_hist = BASE_HIST_QTRS * scale
+    n_workbooks = BASE_WORKBOOKS * scale
+
+    # the history runs from FIRST_YEAR Q1 to two quarters
+    # before the latest workbook's quarter
+    last_year, last_qtr = from_key(to_key(FIRST_YEAR, 1) + n_hist + 1)
+
+    # one workbook in each quarter, in the middle of its 3rd month
+    file_addrs = []
+    for idx, (yr, q) in enumerate(qtrs_back(last_year, last_qtr,
+                                            n_workbooks)):
+        name_date = datetime(yr, 3 * q, 15)
+        file_addr = input_dir / \
+            f'sp-500-eps-est {name_date:%Y %m %d}.xlsx'
+        latest = idx == 0
+        make_sp_workbook(file_addr, name_date,
+                         n_hist= n_hist if latest else PREV_HIST_QTRS,
+                         n_sector_qtrs= BASE_SECTOR_QTRS *
+                                        (scale if latest else 1),
+                         seed= seed + idx)
+        file_addrs.append(file_addr)
+
+    # daily rates through the latest workbook's date
+    end = date(last_year, 3 * last_qtr, 15)
+    start = date(max(end.year - BASE_FRED_YEARS * scale, 1), 1, 2)
+    file_addr = input_dir / 'DFII10.xlsx'
+    make_fred_workbook(file_addr, start, end, seed= seed)
+    file_addrs.append(file_addr)
+    return file_addrs
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description= 'write synthetic s&p and FRED workbooks')
+    parser.add_argument('input_dir', type= Path,
+                        help= 'directory for the workbooks')
+    parser.add_argument('--scale', type= int, default= 1,
+                        help= 'multiple of the current history')
+    parser.add_argument('--seed', type= int, default= 0)
+    args = parser.parse_args()
+
+    file_addrs = write_input_dir(args.input_dir, args.scale, args.seed)
+    print(f'Wrote {len(file_addrs)} workbooks to: \n{args.input_dir}')
@@ -6,27 +6,54 @@
    project directory: S&P500_PE/sp500_pe/__init__.py
 '''
 
+import argparse
+import multiprocessing
+import re
 import sys
-import gc
+
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
 
 import polars as pl
-import json
+import matplotlib
+# render to files only: no gui, in the main process or a worker
+matplotlib.use('Agg')
 import matplotlib.pyplot as plt
 
 import paths as sp
 
+import func_module.calendar_func as cf
+import func_module.dataset_func as ds
 import func_module.display_helper_func as dh
+import func_module.ipc_func as ic
+import func_module.manifest_func as mf
 import func_module.plot_func as pf
+import func_module.profile_func as pr
+import func_module.render_cache_func as rc
+import func_module.sector_func as sc
 
 
 #=================  Global Parameters  ================================
 
+# the rate against which pages 2 and 3 measure the equity premium:
+# real_int_rate, the 10-year TIPS rate, or a maturity of the
+# real-rate curve, real_rate_5y ... real_rate_30y, in the history
+# when update_data.py has read fredgraph, see CURVE_MATURITIES
+PREMIUM_RATE_COL = 'real_int_rate'
+PREMIUM_RATE_LABEL = '10-year TIPS rate'
+
+# the label in titles: '10-year TIPS rate' -> '10-Year TIPS Rate'
+PREMIUM_RATE_TITLE = re.sub(r'\b([a-z])',
+                            lambda match: match.group(1).upper(),
+                            PREMIUM_RATE_LABEL)
+
 # main titles for displays
 PAGE0_SUPTITLE = " \nPrice-Earnings Ratios for the S&P 500"
 PROJ_EPS_SUPTITLE = " \nCalendar-Year Earnings per Share for the S&P 500"
 PAGE2_SUPTITLE = " \nEarnings Margin and Equity Premium for the S&P 500"
 PAGE3_SUPTITLE = \
-    " \nS&P 500 Forward Earnings Yield, 10-Year TIPS Rate, and Equity Premium"
+    f" \nS&P 500 Forward Earnings Yield, {PREMIUM_RATE_TITLE}, and Equity Premium"
+PAGE4_SUPTITLE = " \nGrowth of Earnings per Share by Sector of the S&P 500"
 
 # str: source footnotes for displays
 E_DATA_SOURCE = \
@@ -36,10 +63,19 @@ RR_DATA_SOURCE = '10-year TIPS: latest rate for each quarter,' + \
     '\nMarket Yield on U.S. Treasury Securities at 10-Year' + \
     ' Constant Maturity, Investment Basis, Inflation-Indexed,' +\
     '\nfrom Federal Reserve Bank of St. Louis, FRED [DFII10].'
+CURVE_DATA_SOURCE = f'{PREMIUM_RATE_TITLE}: latest rates for each quarter,' + \
+    ' Board of Governors of the Federal Reserve System, ' + \
+    '\nMarket Yield on U.S. Treasury Securities at Constant Maturity,' + \
+    ' Investment Basis, Inflation-Indexed, interpolated by maturity,' + \
+    '\nfrom Federal Reserve Bank of St. Louis, FRED [DFII5, DFII10, DFII20, DFII30].'
+# the source of the rate of the premium
+PREMIUM_DATA_SOURCE = RR_DATA_SOURCE \
+    if PREMIUM_RATE_COL == 'real_int_rate' else CURVE_DATA_SOURCE
 PAGE0_SOURCE = E_DATA_SOURCE
 PAGE1_SOURCE = E_DATA_SOURCE
-PAGE2_SOURCE = E_DATA_SOURCE + '\n\n' + RR_DATA_SOURCE
-PAGE3_SOURCE = E_DATA_SOURCE + '\n\n' + RR_DATA_SOURCE
+PAGE2_SOURCE = E_DATA_SOURCE + '\n\n' + PREMIUM_DATA_SOURCE
+PAGE3_SOURCE = E_DATA_SOURCE + '\n\n' + PREMIUM_DATA_SOURCE
+PAGE4_SOURCE = E_DATA_SOURCE
 
 # hyopothetical quarterly growth factor future stock prices
 ROGQ = (1+0.05)**(1/4)
@@ -51,6 +87,14 @@ HIST_COL_NAMES = ['date', 'yr_qtr', 'price', 'op_eps', 'rep_eps',
 DATA_COLS_RENAME  = {'op_margin': 'margin',
                     'real_int_rate': 'real_rate'}
 
+# page 4: the sectors of this index, from the sector cube;
+# growth beyond SECTOR_GROWTH_LIMIT, percent, takes the end colors
+SECTOR_INDEX_NAME = 'S&P 500'
+SECTOR_GROWTH_LIMIT = 50
+
+# the display pages, eps_page0.pdf ... eps_page4.pdf
+PAGES = (0, 1, 2, 3, 4)
+
 
 # ================  MAIN =============================================+
 
@@ -61,41 +105,54 @@ DATA_COLS_RENAME  = {'op_margin': 'margin',
 # https://docs.pola.rs/py-polars/html/reference/dataframe/api/polars.DataFrame.filter.html
 # https://fralfaro.github.io/DS-Cheat-Sheets/examples/polars/polars/
 
-def display_data():
-    
-# read record_dict
-    if sp.RECORD_DICT_ADDR.exists():
-        with sp.RECORD_DICT_ADDR.open('r') as f:
-            record_dict = json.load(f)
-        print('\n============================================')
-        print(f'Read record_dict from: \n{sp.RECORD_DICT_ADDR}')
-        print('============================================\n')
+def scan_output_files():
+    '''
+        scan the files that update_data.py wrote
+        return (latest_used_file, proj_yr_qtrs, proj_files,
+                LazyFrame of the history,
+                LazyFrame of the stacked projections)
+    '''
+    
+# read the manifest
+    # a new manifest imports an existing record_dict.json
+    if sp.MANIFEST_ADDR.exists() or sp.RECORD_DICT_ADDR.exists():
+        manifest = mf.open_manifest(sp.MANIFEST_ADDR, sp.RECORD_DICT_ADDR)
+        latest_used_file = manifest.latest_used_file()
+        proj_yr_qtrs = manifest.proj_yr_qtrs()
+        proj_files = manifest.proj_files()
+        manifest.close()
     else:
+        latest_used_file = None
+        
+    if latest_used_file is None:
         print('\n============================================')
-        print(f'No record_dict in \n{sp.RECORD_DICT_ADDR.name}')
-        print(f'at: \n{sp.RECORD_DICT_ADDR}')
+        print(f'No manifest in \n{sp.MANIFEST_ADDR.name}')
+        print(f'at: \n{sp.MANIFEST_ADDR}')
         print('Processing ended')
         print('============================================\n')
         sys.exit()
-        
-    # provide the date of projection
-    
-    date_this_projn = record_dict['latest_used_file'].split('.')[0][-10:]
-    yr_qtr_current_projn = record_dict["proj_yr_qtrs"][0]
+    print('\n============================================')
+    print(f'Read manifest from: \n{sp.MANIFEST_ADDR}')
+    print('============================================\n')
     
- # read hist_df
+ # scan hist_df
+    # reads only the cols used, only rows for proj_yr_qtrs
+    # from the ipc mirror, memory mapped, if it is current
     if sp.OUTPUT_HIST_ADDR.exists():
-        with sp.OUTPUT_HIST_ADDR.open('r') as f:
-            data_df = pl.read_parquet(source= f,
-                                      columns= HIST_COL_NAMES)\
-                        .filter(pl.col('yr_qtr')
-                                  .is_in(record_dict['proj_yr_qtrs']))
-                        
-            #pl.col("yr_qtr").is_in('proj_yr_qtrs'.replace_strict(record_dict))
-            #pl.col('yr_qtr').map_elements(lambda x: x in record_dict['proj_yr_qtrs']
+        if ic.is_current(sp.OUTPUT_HIST_MIRROR_ADDR,
+                         [sp.OUTPUT_HIST_ADDR]):
+            hist_addr = sp.OUTPUT_HIST_MIRROR_ADDR
+            hist_lf = ic.scan_mirror(hist_addr)
+        else:
+            hist_addr = sp.OUTPUT_HIST_ADDR
+            hist_lf = pl.scan_parquet(hist_addr)
+        data_lf = cf.migrate_qtr_keys(
+                        select_hist_cols(hist_lf))\
+                    .filter(pl.col('yr_qtr')
+                              .is_in(proj_yr_qtrs))
             
         print('\n============================================')
-        print(f'Read data history from: \n{sp.OUTPUT_HIST_ADDR}')
+        print(f'Scan data history from: \n{hist_addr}')
         print('============================================\n')
     else:
         print('\n============================================')
@@ -105,34 +162,301 @@ def display_data():
         print('============================================\n')
         sys.exit()
     
-# +++++ read proj dfs +++++++++++++++++++++++++++++++++++++++++++++++++
-# put dfs in proj_dict, key = dfs' 'yr_qtr' value (from file.name)
-    proj_dict = dict()
-    for file_name, yr_qtr in zip(record_dict['output_proj_files'],
-                                 record_dict['proj_yr_qtrs']):
-        file_addr = sp.OUTPUT_PROJ_DIR / file_name
-        if file_addr.exists():
-            with file_addr.open('r') as f:
-                proj_dict[yr_qtr] = pl.read_parquet(f)
-        else:
+# +++++ scan proj dfs +++++++++++++++++++++++++++++++++++++++++++++++++
+# one scan of the projections dataset, pruned to the recorded quarters
+    if not ds.has_partitions(sp.OUTPUT_PROJ_DIR):
+        print('\n============================================')
+        print(f'No projections dataset in: \n{sp.OUTPUT_PROJ_DIR}')
+        print('To rewrite earlier projection files into the dataset:')
+        print('python update_data.py --compact')
+        print('Processing ended')
+        print('============================================\n')
+        sys.exit()
+    
+    proj_keys = [yr_qtr for yr_qtr, _ in proj_files]
+    if ic.is_current(sp.OUTPUT_PROJ_MIRROR_ADDR,
+                     ds.dataset_addrs(sp.OUTPUT_PROJ_DIR)):
+        proj_lf = ic.scan_mirror(sp.OUTPUT_PROJ_MIRROR_ADDR)\
+                    .filter(pl.col(ds.PROJ_KEY).is_in(proj_keys))
+    else:
+        proj_lf = ds.scan_proj(sp.OUTPUT_PROJ_DIR,
+                               proj_yr_qtrs= proj_keys)
+    return latest_used_file, proj_yr_qtrs, proj_files, data_lf, proj_lf
+
+
+def select_hist_cols(hist_lf):
+    '''
+        the cols of the history that the pages use:
+        HIST_COL_NAMES and PREMIUM_RATE_COL
+        return LazyFrame
+    '''
+    
+    if PREMIUM_RATE_COL not in hist_lf.collect_schema().names():
+        print('\n============================================')
+        print(f'No col {PREMIUM_RATE_COL}, PREMIUM_RATE_COL, '
+              f'in the history')
+        print('For the real-rate curve, put fredgraph.csv in input_dir')
+        print('and run update_data.py')
+        print('Processing ended')
+        print('============================================\n')
+        sys.exit()
+    
+    return hist_lf.select(HIST_COL_NAMES +
+                          [PREMIUM_RATE_COL]
+                          if PREMIUM_RATE_COL not in HIST_COL_NAMES
+                          else HIST_COL_NAMES)
+
+
+def scan_run_data(run_data):
+    '''
+        scan the data that update_data_files returned, while
+        its files are written: the history and the new
+        projections in memory, the earlier projections in
+        the dataset
+        return as scan_output_files()
+    '''
+    
+    latest_used_file = run_data['latest_used_file']
+    proj_yr_qtrs = run_data['proj_yr_qtrs']
+    proj_files = run_data['proj_files']
+    
+    data_lf = select_hist_cols(run_data['actual_df'].lazy())\
+                .filter(pl.col('yr_qtr')
+                          .is_in(proj_yr_qtrs))
+    
+    # the new projections, with the col of the dataset's partitions
+    proj_lfs = [proj_df.lazy()
+                       .with_columns(pl.lit(yr_qtr,
+                                            dtype= cf.QTR_KEY_DTYPE)
+                                       .alias(ds.PROJ_KEY))
+                for yr_qtr, proj_df in run_data['proj_dfs'].items()]
+    
+    # the earlier projections, from their partitions
+    prev_yr_qtrs = [yr_qtr for yr_qtr, _ in proj_files
+                    if yr_qtr not in run_data['proj_dfs']]
+    if (len(prev_yr_qtrs) > 0 and 
+        ds.has_partitions(sp.OUTPUT_PROJ_DIR)):
+        proj_lfs.append(ds.scan_proj(sp.OUTPUT_PROJ_DIR,
+                                     proj_yr_qtrs= prev_yr_qtrs))
+    
+    if len(proj_lfs) == 0:
+        print('\n============================================')
+        print('No projections in the data of this run')
+        print(f'or in: \n{sp.OUTPUT_PROJ_DIR}')
+        print('Processing ended')
+        print('============================================\n')
+        sys.exit()
+    proj_lf = pl.concat(proj_lfs, how= 'diagonal')
+    
+    print('\n============================================')
+    print(f'Display the data of this run: \n{latest_used_file}')
+    print('============================================\n')
+    return latest_used_file, proj_yr_qtrs, proj_files, data_lf, proj_lf
+
+
+def scan_sector_cube(run_data= None):
+    '''
+        the sector cube: from run_data, if given,
+        otherwise from the file that update_data.py wrote
+        return LazyFrame, or None if there is no cube
+    '''
+    
+    if run_data is not None and 'sector_df' in run_data:
+        return run_data['sector_df'].lazy()
+    if sp.OUTPUT_SECTOR_ADDR.exists():
+        return sc.scan_cube(sp.OUTPUT_SECTOR_ADDR)
+    
+    print('\n============================================')
+    print(f'No sector cube at: \n{sp.OUTPUT_SECTOR_ADDR}')
+    print('Skipped page 4')
+    print('============================================\n')
+    return None
+
+
+def prepare_pages(pages= PAGES, run_data= None):
+    '''
+        read the data and build the dfs that the pages plot
+        pages: the pages to prepare
+        run_data: the data returned by update_data_files;
+            if None, read the files that it wrote
+        return (date of the latest projection,
+                dict, page -> dict, panel -> df)
+        page 4 is not in the dict if there is no sector cube
+    '''
+    
+    if run_data is None:
+        latest_used_file, proj_yr_qtrs, proj_files, data_lf, proj_lf = \
+            scan_output_files()
+    else:
+        latest_used_file, proj_yr_qtrs, proj_files, data_lf, proj_lf = \
+            scan_run_data(run_data)
+        
+    # provide the date of projection
+    date_this_projn = latest_used_file.split('.')[0][-10:]
+    # qtr keys
+    yr_qtr_current_projn = proj_yr_qtrs[0]
+    
+    current_proj_lf = proj_lf.filter(pl.col(ds.PROJ_KEY) ==
+                                     yr_qtr_current_projn)
+
+# +++++ declare the queries for the pages +++++++++++++++++++++++++++++
+# each page declares its queries on data_lf and proj_lf;
+# collect_all runs them together: the scans, the proj_yr_qtrs
+# filter, and the common subplans run once
+    queries = dict()
+    queries['proj_keys'] = proj_lf.select(pl.col(ds.PROJ_KEY).unique())
+    
+    if 0 in pages:
+        # 12m eps, proj from the stacked projections
+        queries['proj'] = proj_lf
+        queries['p0_op'] = data_lf.select(['yr_qtr', '12m_op_eps'])
+        queries['p0_rep'] = data_lf.select(['yr_qtr', '12m_rep_eps'])
+    
+    if 1 in pages:
+        # historical and projected p/e
+        queries['p1_op'] = dh.page1_df(
+            data_lf.select(['yr_qtr', '12m_op_eps', 'price']),
+            current_proj_lf.select(['yr_qtr', '12m_op_eps']),
+            '12m_op_eps', ROGQ)
+        queries['p1_rep'] = dh.page1_df(
+            data_lf.select(['yr_qtr', '12m_rep_eps', 'price']),
+            current_proj_lf.select(['yr_qtr', '12m_rep_eps']),
+            '12m_rep_eps', ROGQ)
+    
+    if 2 in pages:
+        # margin, quality, and premium
+        queries['p2_margin'] = \
+            data_lf.rename({'op_margin' : 'margin'})\
+                   .select('yr_qtr', 'margin')\
+                   .with_columns((pl.col('margin') * 100)
+                               .alias('margin100'))\
+                   .drop('margin')\
+                   .rename({'margin100': 'margin'})\
+                   .sort(by= 'yr_qtr')
+        queries['p2_quality'] = \
+            data_lf.rename({'12m_rep_eps': 'reported',
+                            '12m_op_eps': 'operating'})\
+                   .select('yr_qtr', 'reported', 'operating')\
+                   .with_columns((pl.col('reported') / 
+                                  pl.col('operating') * 100)
+                                 .cast(pl.Int8)
+                                 .alias('quality'))\
+                   .drop('reported', 'operating')\
+                   .sort(by= 'yr_qtr')
+        queries['p2_premium'] = \
+            data_lf.rename({PREMIUM_RATE_COL : 'real_rate'})\
+                   .select('yr_qtr', '12m_rep_eps', 
+                           'real_rate', 'price')\
+                   .with_columns(((pl.col('12m_rep_eps') /
+                                   pl.col('price')) * 100 -
+                                   pl.col('real_rate'))
+                               .alias('premium'))\
+                   .drop('12m_rep_eps', 'real_rate', 'price')\
+                   .sort(by= 'yr_qtr')
+    
+    if 3 in pages:
+        # fwd 12m proj eps, op and rep in one pass
+        fwd_lf = dh.contemp_12m_fwd_proj(
+            data_lf.select('yr_qtr', 'price', PREMIUM_RATE_COL),
+            proj_lf,
+            {'op_eps': 'fwd_12mproj_op_eps',
+             'rep_eps': 'fwd_12mproj_rep_eps'})
+        queries['p3_op'] = dh.page3_df(fwd_lf, 'fwd_12mproj_op_eps',
+                                       PREMIUM_RATE_COL,
+                                       PREMIUM_RATE_LABEL)
+        queries['p3_rep'] = dh.page3_df(fwd_lf, 'fwd_12mproj_rep_eps',
+                                        PREMIUM_RATE_COL,
+                                        PREMIUM_RATE_LABEL)
+    
+    cube_lf = scan_sector_cube(run_data) if 4 in pages else None
+    if cube_lf is not None:
+        # growth of sector eps, long format; pivoted below
+        for panel in ['op', 'rep']:
+            queries[f'p4_{panel}'] = dh.page4_df(cube_lf, panel,
+                                                 SECTOR_INDEX_NAME)
+    
+    with pr.stage('collect queries', queries= len(queries)):
+        frames = dict(zip(queries.keys(),
+                          pl.collect_all(list(queries.values()))))
+    
+    # qtr keys of the projections read
+    proj_read = set(frames['proj_keys'][ds.PROJ_KEY])
+    
+    for yr_qtr, file_name in proj_files:
+        if yr_qtr not in proj_read:
+            file_addr = ds.proj_file_addr(sp.OUTPUT_PROJ_DIR,
+                                          yr_qtr, file_name)
             print('\n============================================')
             print(f'No output file at \n{file_addr.name}')
             print(f'in: \n{file_addr}')
-            print('Processing ended')
+            print('To rewrite earlier projection files into the dataset:')
+            print('python update_data.py --compact')
             print('============================================\n')
 
+# +++++ the dfs for each page, by panel +++++++++++++++++++++++++++++++
+    page_dfs = dict()
+    
+    if 0 in pages:
+        with pr.stage('page0_df'):
+            page_dfs[0] = {
+                panel: dh.page0_df(frames[f'p0_{panel}'], frames['proj'],
+                                   f'12m_{panel}_eps', f'12m_{panel}_eps')
+                         .rename({f'12m_{panel}_eps': 'actual'})
+                         .sort(by= 'yr_qtr')
+                for panel in ['op', 'rep']}
+    
+    if 1 in pages:
+        denom = 'divided by projected earnings'
+        legend1 = f'price constant from {date_this_projn}\n{denom}'
+        legend2 = f'price increases 5% ar from {date_this_projn}\n{denom}'
+        page_dfs[1] = {
+            panel: frames[f'p1_{panel}']
+                     .rename({'pe': 'historical',
+                              'fix_proj_p/e': legend1,
+                              'incr_proj_p/e': legend2})
+            for panel in ['op', 'rep']}
+    
+    if 2 in pages:
+        page_dfs[2] = {
+            panel: frames[f'p2_{panel}']
+            for panel in ['margin', 'quality', 'premium']}
+    
+    if 3 in pages:
+        page_dfs[3] = {
+            panel: frames[f'p3_{panel}']
+                     .rename({'earnings / price':
+                              'projected earnings / price'})
+            for panel in ['op', 'rep']}
+    
+    if cube_lf is not None:
+        # one pivot: a row for each qtr, a col for each sector
+        with pr.stage('page4_df'):
+            page_dfs[4] = {
+                panel: frames[f'p4_{panel}']
+                         .pivot(on= 'sector',
+                                index= 'yr_qtr',
+                                values= 'growth')
+                         .sort(by= 'yr_qtr')
+                for panel in ['op', 'rep']}
+    
+    return date_this_projn, page_dfs
+
+
 # DISPLAY THE DATA ====================================================
-    # https://matplotlib.org/stable/api/_as_gen/matplotlib.pyplot.subplot_mosaic.html
-    # https://matplotlib.org/stable/api/axes_api.html
-    # https://matplotlib.org/stable/api/axes_api.html#axes-position
+# https://matplotlib.org/stable/api/_as_gen/matplotlib.pyplot.subplot_mosaic.html
+# https://matplotlib.org/stable/api/axes_api.html
+# https://matplotlib.org/stable/api/axes_api.html#axes-position
 
-# +++++ create the y-values (columns) for the series to be plotted
+# each render_page function draws one page from its dfs,
+# saves it to display_addr, and closes its figure
 
 # page zero  ======================
 # shows:  projected eps for current cy and future cy
 # the projections shown for each quarter are the latest
 # made in the quarter
 
+def render_page0(dfs, date_this_projn, display_addr):
+    
     # create graphs
     fig = plt.figure(figsize=(8.5, 11), 
                      layout="constrained")
@@ -144,31 +468,19 @@ def display_data():
         fontsize=13,
         fontweight='bold')
     fig.supxlabel(PAGE0_SOURCE, fontsize= 8)
-
-    # subsets of columns for op eps (top panel)
-    df = data_df.select(['yr_qtr', '12m_op_eps'])
-    p_dict_columns = ['12m_op_eps', 'yr_qtr']
-    df = dh.page0_df(df, proj_dict, p_dict_columns, '12m_op_eps')\
-                .rename({'12m_op_eps': 'actual'})\
-                .sort(by= 'yr_qtr')
     
     xlabl = '\ndate of projection\n'
     ylabl = '\nearnings per share\n'
     
-    pf.plots_page0(ax['operating'], df,
+    # op eps (top panel)
+    pf.plots_page0(ax['operating'], dfs['op'],
                 title= ' \nProjections of Operating EPS',
                 ylim= (100, None),
                 xlabl= xlabl,
                 ylabl= ylabl)
     
-    # subsets of columns for rep eps (bottom panel)
-    df = data_df.select(['yr_qtr', '12m_rep_eps'])
-    p_dict_columns = ['12m_rep_eps', 'yr_qtr']
-    df = dh.page0_df(df, proj_dict, p_dict_columns, '12m_rep_eps')\
-                .rename({'12m_rep_eps': 'actual'})\
-                .sort(by= 'yr_qtr')
-    
-    pf.plots_page0(ax['reported'], df,
+    # rep eps (bottom panel)
+    pf.plots_page0(ax['reported'], dfs['rep'],
                 title= ' \nProjections of Reported EPS',
                 ylim= (75, None),
                 xlabl= xlabl,
@@ -176,17 +488,18 @@ def display_data():
     
     # show the figure
     print('\n============================')
-    print(sp.DISPLAY_0_ADDR)
+    print(display_addr)
     print('============================\n')
-    fig.savefig(str(sp.DISPLAY_0_ADDR))
-    
-    del df
-    gc.collect()
+    fig.savefig(str(display_addr))
+    plt.close(fig)
+    return display_addr
     
 # page one  ======================
 # shows:  historical 12m trailing pe plus
 #    forward 12m trailing pe, using current p
 
+def render_page1(dfs, date_this_projn, display_addr):
+
     # create graphs
     fig = plt.figure(figsize=(8.5, 11), 
                      layout="constrained")
@@ -200,69 +513,42 @@ def display_data():
     fig.supxlabel(PAGE1_SOURCE, fontsize= 8)
     
     # create the top and bottom graphs for op and rep pe
-    # new DF with cols for p/e and alt p/e, both using 12m trailing E
-        #   also yr_qtr and actual cy
+    # dfs with cols for p/e and alt p/e, both using 12m trailing E
         #       0) yr_qtr (from df) 
         #       1) historical 12m trailing p/e (from df)
         #       2) alt1 using constant p for proj quarters
         #       3) alt2 using p growing at ROG for proj quarters
-        #       4) rolling 12m E (hist+proj) for proj quarters
     
     # top panel
-    df = data_df.select(['yr_qtr', '12m_op_eps', 'price'])
-               
-    p_df = proj_dict[yr_qtr_current_projn]\
-                .select(['yr_qtr', '12m_op_eps'])
-    
-    df = dh.page1_df(df, p_df, '12m_op_eps', ROGQ )
-    
-    denom = 'divided by projected earnings'
-    legend1 = f'price constant from {date_this_projn}\n{denom}'
-    legend2 = f'price increases 5% ar from {date_this_projn}\n{denom}'
-    
-    df = df.rename({'pe': 'historical',
-               'fix_proj_p/e': legend1,
-               'incr_proj_p/e': legend2})
-    
     title = 'Ratio: Price to 12-month Trailing Operating Earnings'
    
-    pf.plots_page1(ax['operating'], df,
+    pf.plots_page1(ax['operating'], dfs['op'],
                     ylim= (None, None),
                     title= title,
                     ylabl= ' \n',
                     xlabl= ' \n')
 
     # bottom panel
-    df = data_df.select(['yr_qtr', '12m_rep_eps', 'price'])
-    
-    p_df = proj_dict[yr_qtr_current_projn]\
-               .select(['yr_qtr', '12m_rep_eps'])
-    
-    df = dh.page1_df(df, p_df, '12m_rep_eps', ROGQ )
-    
-    df = df.rename({'pe': 'historical',
-                    'fix_proj_p/e': legend1,
-                    'incr_proj_p/e': legend2})
-    
     title = 'Ratio: Price to 12-month Trailing Reported Earnings'
     
-    pf.plots_page1(ax['reported'], df,
+    pf.plots_page1(ax['reported'], dfs['rep'],
                     ylim= (None, None),
                     title= title,
                     ylabl= ' \n',
                     xlabl= ' \n')
     
     print('\n============================')
-    print(sp.DISPLAY_1_ADDR)
+    print(display_addr)
     print('============================\n')
-    fig.savefig(str(sp.DISPLAY_1_ADDR))
-    
-    del df
-    gc.collect()
+    fig.savefig(str(display_addr))
+    plt.close(fig)
+    return display_addr
     
 # page two  ======================
 # shows:  historical data for margins and 
 # historical and current estimates for equity premium
+
+def render_page2(dfs, date_this_projn, display_addr):
     
     # create graphs
     fig = plt.figure(figsize=(8.5, 11), 
@@ -277,60 +563,31 @@ def display_data():
         fontweight='bold')
     fig.supxlabel(PAGE2_SOURCE, fontsize= 8)
     
-    # create the top and bottom graphs for margins and premiums
-    # create working df for op margins (top panel)
-
-    df = data_df.rename({'op_margin' : 'margin'})\
-                .select('yr_qtr', 'margin')\
-                .with_columns((pl.col('margin') * 100)
-                            .alias('margin100'))\
-                .drop('margin')\
-                .rename({'margin100': 'margin'})\
-                .sort(by= 'yr_qtr')
-    
+    # op margins (top panel)
     title = 'Margin: quarterly operating earnings relative to revenue'
     
-    pf.plots_page2(ax['margin'], df,
+    pf.plots_page2(ax['margin'], dfs['margin'],
                     ylim= (None, None),
                     title= title,
                     ylabl= ' \npercent\n ',
                     xlabl= ' \n ',
                     hrzntl_vals= [10.0])
     
-    # create working df for ratio: reported / operating E
-    df = data_df.rename({'12m_rep_eps': 'reported',
-                         '12m_op_eps': 'operating'})\
-                .select('yr_qtr', 'reported', 'operating')\
-                .with_columns((pl.col('reported') / 
-                               pl.col('operating') * 100)
-                              .cast(pl.Int8)
-                              .alias('quality'))\
-                .drop('reported', 'operating')\
-                .sort(by= 'yr_qtr')
+    # ratio: reported / operating E
     title = 'Quality of Earnings: ratio of 12-month reported to operating earings'
     
-    pf.plots_page2(ax['quality'], df,
+    pf.plots_page2(ax['quality'], dfs['quality'],
                     ylim= (None, None),
                     title= title,
                     ylabl= ' \npercent\n ',
                     xlabl= ' \n ',
                     hrzntl_vals= [80, 90])
 
-    # create working df for premia (bottom panel)
-    df = data_df.rename({'real_int_rate' : 'real_rate'})\
-                .select('yr_qtr', '12m_rep_eps', 
-                        'real_rate', 'price')\
-                .with_columns(((pl.col('12m_rep_eps') /
-                                pl.col('price')) * 100 -
-                                pl.col('real_rate'))
-                            .alias('premium'))\
-                .drop('12m_rep_eps', 'real_rate', 'price')\
-                .sort(by= 'yr_qtr')
-
+    # premia (bottom panel)
     title = 'Equity Premium: \nratio of 12-month trailing reported earnings to price, '
-    title += 'less 10-year TIPS rate'
+    title += f'less {PREMIUM_RATE_LABEL}'
 
-    pf.plots_page2(ax['premium'], df,
+    pf.plots_page2(ax['premium'], dfs['premium'],
                     ylim= (None, None),
                     title= title,
                     ylabl= ' \npercent\n ',
@@ -338,17 +595,18 @@ def display_data():
                     hrzntl_vals= [2.0, 4.0])
     
     print('\n============================')
-    print(sp.DISPLAY_2_ADDR)
+    print(display_addr)
     print('============================\n')
-    fig.savefig(str(sp.DISPLAY_2_ADDR))
+    fig.savefig(str(display_addr))
     #plt.savefig(f'{output_dir}/eps_page2.pdf', bbox_inches='tight')
-    
-    del df
-    gc.collect()
+    plt.close(fig)
+    return display_addr
     
 # page three  ======================
 # shows:  components of the equity premium,
 # using 12m forward projected earnings
+
+def render_page3(dfs, date_this_projn, display_addr):
     
     # create graphs
     fig = plt.figure(figsize=(8.5, 11), 
@@ -362,45 +620,23 @@ def display_data():
         fontweight='bold')
     fig.supxlabel(PAGE3_SOURCE, fontsize= 8)
     
-    xlabl = '\nquarter of projection, price, and TIPS rate\n\n'
+    xlabl = f'\nquarter of projection, price, and {PREMIUM_RATE_LABEL}\n\n'
     ylabl = ' \npercent\n '
     
-    # create the top and bottom graphs for premiums
-
-    # create working df for op premium (top panel)
-    # add a col: proj eps over the next 4 qtrs
-    df = data_df.select('yr_qtr', 'price', 'real_int_rate',
-                        'op_eps')
-    df = dh.contemp_12m_fwd_proj(data_df, proj_dict,
-                                 'op_eps', 'fwd_12mproj_op_eps')
-    
-    df = dh.page3_df(df, 'fwd_12mproj_op_eps')
-    
-    df = df.rename({'earnings / price': 'projected earnings / price'})
-    
+    # op premium (top panel)
     title = 'Operating Earnings: projected over next 4 quarters'
 
-    pf.plots_page3(ax['operating'], df,
+    pf.plots_page3(ax['operating'], dfs['op'],
                 ylim= (None, 9),
                 title= title,
                 ylabl= ylabl,
                 xlabl= xlabl,
                 hrzntl_vals= [2.0, 4.0])
     
-    # bottom panel
-    df = data_df.select('yr_qtr', 'price', 'real_int_rate',
-                        'rep_eps')
-    
-    # add a col : proj eps over the next 4 qtrs
-    df = dh.contemp_12m_fwd_proj(data_df, proj_dict,
-                                 'rep_eps', 'fwd_12mproj_rep_eps')
-    df = dh.page3_df(df, 'fwd_12mproj_rep_eps')
-    
-    df = df.rename({'earnings / price': 'projected earnings / price'})
-    
+    # rep premium (bottom panel)
     title = 'Reported Earnings: projected over next 4 quarters'
 
-    pf.plots_page3(ax['reported'], df,
+    pf.plots_page3(ax['reported'], dfs['rep'],
                 ylim= (None, 9),
                 title= title,
                 ylabl= ylabl,
@@ -408,15 +644,169 @@ def display_data():
                 hrzntl_vals= [2.0, 4.0])
     
     print('\n============================')
-    print(sp.DISPLAY_3_ADDR)
+    print(display_addr)
     print('============================\n')
-    fig.savefig(str(sp.DISPLAY_3_ADDR))
+    fig.savefig(str(display_addr))
     #plt.savefig(f'{output_dir}/eps_page3.pdf', bbox_inches='tight')
+    plt.close(fig)
+    return display_addr
+
+
+# page four  ======================
+# shows:  growth of eps of each sector over the same
+# quarter a year earlier, a heat map
+
+def render_page4(dfs, date_this_projn, display_addr):
+    
+    # create graphs
+    fig = plt.figure(figsize=(8.5, 11), 
+                     layout="constrained")
+    # upper and lower plots
+    ax = fig.subplot_mosaic([['operating'],
+                             ['reported']])
+    fig.suptitle(
+        f'{PAGE4_SUPTITLE}\n{date_this_projn}\n',
+        fontsize=13,
+        fontweight='bold')
+    fig.supxlabel(PAGE4_SOURCE, fontsize= 8)
+    
+    xlabl = '\nquarter\n'
+    cbar_labl = 'percent change from a year earlier'
+    
+    # op eps growth (top panel)
+    title = 'Operating EPS: growth from the same quarter a year earlier'
     
-    del df
-    gc.collect()
+    pf.plots_page4(ax['operating'], dfs['op'],
+                   title= title,
+                   xlabl= xlabl,
+                   vlim= SECTOR_GROWTH_LIMIT,
+                   cbar_labl= cbar_labl)
+    
+    # rep eps growth (bottom panel)
+    title = 'Reported EPS: growth from the same quarter a year earlier'
+    
+    pf.plots_page4(ax['reported'], dfs['rep'],
+                   title= title,
+                   xlabl= xlabl,
+                   vlim= SECTOR_GROWTH_LIMIT,
+                   cbar_labl= cbar_labl)
+    
+    print('\n============================')
+    print(display_addr)
+    print('============================\n')
+    fig.savefig(str(display_addr))
+    plt.close(fig)
+    return display_addr
+
+
+RENDER_PAGE = {0: render_page0,
+               1: render_page1,
+               2: render_page2,
+               3: render_page3,
+               4: render_page4}
+
+
+@pr.stage('display_data')
+def display_data(pages= None, workers= 1, force= False,
+                 run_data= None):
+    '''
+        write the display pages to display_dir
+        pages: list of the pages to render; None renders all
+        workers: number of processes that render the pages
+        force: render the pages even if their fingerprints
+            have not changed
+        run_data: the data returned by update_data_files;
+            if None, read the files that it wrote
+    '''
+    
+    pages = PAGES if pages is None else sorted(set(pages))
+    display_addrs = {0: sp.DISPLAY_0_ADDR,
+                     1: sp.DISPLAY_1_ADDR,
+                     2: sp.DISPLAY_2_ADDR,
+                     3: sp.DISPLAY_3_ADDR,
+                     4: sp.DISPLAY_4_ADDR}
+    
+    date_this_projn, page_dfs = prepare_pages(pages, run_data)
+    # without the data for a page, such as the sector cube
+    pages = [page for page in pages if page in page_dfs]
+    
+# +++++ skip the pages whose data and code have not changed +++++++++++
+    with pr.stage('fingerprints'):
+        fingerprints = rc.load_fingerprints(sp.DISPLAY_FINGERPRINT_ADDR)
+        code_hash = rc.code_digest([Path(__file__), Path(pf.__file__)])
+        page_fps = {page: rc.page_fingerprint(page_dfs[page],
+                                              {'page': page,
+                                               'date': date_this_projn},
+                                              code_hash)
+                    for page in pages}
+    
+    unchanged = [page for page in pages
+                 if not force and
+                    rc.is_current(fingerprints, display_addrs[page],
+                                  page_fps[page])]
+    if len(unchanged) > 0:
+        print('\n============================================')
+        print('Pages unchanged since they were rendered:')
+        for page in unchanged:
+            print(display_addrs[page])
+        print('============================================\n')
+    pages = [page for page in pages if page not in unchanged]
+    
+# +++++ render the pages ++++++++++++++++++++++++++++++++++++++++++++++
+    # each page's dfs are small: render the pages in
+    # parallel when workers > 1, otherwise in turn
+    if (workers is None or
+        workers <= 1 or
+        len(pages) <= 1):
+        for page in pages:
+            with pr.stage(f'render page {page}'):
+                RENDER_PAGE[page](page_dfs[page], date_this_projn,
+                                  display_addrs[page])
+    else:
+        # 'spawn': a forked child can deadlock on polars' thread pool
+        workers = min(workers, len(pages))
+        with ProcessPoolExecutor(
+                max_workers= workers,
+                mp_context= multiprocessing.get_context('spawn')) as pool:
+            # each worker returns its stages with its result
+            futures = [pool.submit(pr.traced_call, pr.ENABLED,
+                                   f'render page {page}',
+                                   RENDER_PAGE[page], page_dfs[page],
+                                   date_this_projn, display_addrs[page])
+                       for page in pages]
+            for future in futures:
+                _, events = future.result()
+                pr.add_events(events)
+    
+    # record the fingerprints of the pages rendered
+    if len(pages) > 0:
+        for page in pages:
+            fingerprints[display_addrs[page].name] = page_fps[page]
+        rc.store_fingerprints(sp.DISPLAY_FINGERPRINT_ADDR, fingerprints)
 
 
 if __name__ == '__main__':
-    display_data()
-    
\ No newline at end of file
+    parser = argparse.ArgumentParser(
+        description= 'write the display pages from the data files')
+    parser.add_argument('--pages', type= int, nargs= '+',
+                        choices= PAGES, default= None,
+                        help= 'pages to render; default all')
+    parser.add_argument('--workers', type= int, default= 1,
+                        help= 'number of processes that render pages')
+    parser.add_argument('--force', action= 'store_true',
+                        help= 'render the pages even if unchanged')
+    parser.add_argument('--profile', nargs= '?', type= Path,
+                        const= sp.PROFILE_TRACE_ADDR, default= None,
+                        metavar= 'ADDR',
+                        help= 'record the time and memory of each stage '
+                              'as a Chrome trace')
+    args = parser.parse_args()
+    
+    if args.profile is not None:
+        pr.enable()
+    try:
+        display_data(pages= args.pages, workers= args.workers,
+                     force= args.force)
+    finally:
+        if args.profile is not None:
+            pr.write_trace(args.profile)
@@ -1,45 +1,183 @@
 __all__ = [
+    "calendar_func",
+    "dataset_func",
     "display_helper_func",
     "helper_func",
+    "ipc_func",
+    "manifest_func",
     "plot_func",
-    "read_data_func"
+    "profile_func",
+    "rate_store_func",
+    "read_data_func",
+    "render_cache_func",
+    "sector_func",
+    "vintage_func",
+    "xlsx_func",
+    "cache_func"
 ]
 
 '''
+from calendar_func import (
+    file_date,
+    qtr_key,
+    margin_qtr_key,
+    key_year,
+    key_qtr,
+    is_quarter_4,
+    key_to_label,
+    label_to_key,
+    file_names_to_keys,
+    key_label,
+    labels_to_keys,
+    migrate_qtr_keys
+)
+
+from dataset_func import (
+    partition_dir,
+    proj_file_addr,
+    write_proj,
+    remove_proj,
+    has_partitions,
+    dataset_addrs,
+    loose_proj_files,
+    scan_proj,
+    compact_proj
+)
+
 from display_helper_func import (
     contemp_12m_fwd_proj,
     fwd_12m_ern,
     page0_df,
     page1_df,
-    page3_df
+    page3_df,
+    page4_df
 )
 
 from helper_func import (
     my_df_print,
     dt_str_to_date,
-    string_to_date,
-    date_to_year_qtr,
-    date_to_qtr,
-    is_quarter_4,
-    yrqtr_to_yr,
+    replace_atomically,
+    changed_rows,
+    upsert_rows,
+    SheetIndex,
+    find_key_in_row,
+    sheet_index,
+    cell_value,
     find_key_row,
     item_matches_key,
     find_key_col
 )
 
+from ipc_func import (
+    sources_addr,
+    file_stamp,
+    file_stamps,
+    write_mirror,
+    remove_mirror,
+    is_current,
+    read_mirror,
+    scan_mirror
+)
+
+from manifest_func import (
+    Manifest,
+    open_manifest
+)
+
 from plot_func import (
     plots_page0,
     plots_page1,
     plots_page2,
-    plots_page3
+    plots_page3,
+    plots_page4
+)
+
+from profile_func import (
+    enable,
+    disable,
+    max_rss_mib,
+    stage,
+    traced_call,
+    add_events,
+    drain_events,
+    process_names,
+    write_trace,
+    print_summary
+)
+
+from rate_store_func import (
+    eoq_frame,
+    read_store,
+    last_date,
+    append_rates,
+    write_store,
+    rate_curve
+)
+
+from render_cache_func import (
+    frame_digest,
+    code_digest,
+    page_fingerprint,
+    load_fingerprints,
+    store_fingerprints,
+    is_current
 )
 
 from read_data_func import (
+    open_workbook,
     read_sp_date,
+    sp_date_frame,
     data_block_reader,
     sp_loader,
+    sp_frame,
     margin_loader,
+    margin_frame,
     industry_loader,
-    fred_reader
+    industry_frame,
+    fred_reader,
+    fred_daily_reader,
+    fred_csv_reader,
+    fred_series_reader,
+    fred_series_csv_reader,
+    compile_plan,
+    read_blocks,
+    read_workbook_blocks,
+    fred_file_reader,
+    fred_series_file_reader,
+    proj_reader,
+    proj_pool_reader
+)
+
+from sector_func import (
+    cube_frame,
+    upsert_cube,
+    read_cube,
+    write_cube,
+    scan_cube
+)
+
+from vintage_func import (
+    segment_file_name,
+    segment_generation,
+    is_keyed,
+    delta_frame,
+    apply_delta,
+    iter_vintages,
+    read_vintage,
+    add_vintages,
+    remove_segments
+)
+
+from xlsx_func import (
+    XlsxWorkbook,
+    XlsxSheet
+)
+
+from cache_func import (
+    file_digest,
+    cache_key,
+    cache_load,
+    cache_store,
+    cache_evict
 )
 '''
\ No newline at end of file
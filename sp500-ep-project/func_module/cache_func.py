@@ -0,0 +1,126 @@
+'''
+   a cache of the dfs that are parsed from .xlsx workbooks
+
+   the key of an entry is the sha-256 of the workbook's bytes
+   plus a hash of the extraction params (plans, param dicts)
+   and CACHE_VERSION; an entry is a directory in the cache
+   that contains a .parquet file for each df
+
+   when the cache exceeds its size, the least recently used
+   entries are removed
+
+   access these values in other modules by
+        import func_module.cache_func as ch
+'''
+
+import hashlib
+import json
+import os
+import shutil
+
+import polars as pl
+
+# change CACHE_VERSION when the parsing code changes the dfs
+# that it returns for the same workbook and params
+CACHE_VERSION = 3
+CACHE_MAX_BYTES = 256 * 2**20
+CHUNK_BYTES = 2**20
+
+
+def file_digest(file_addr):
+    '''
+        sha-256 of the bytes of the file at file_addr
+        return str of hex digits
+    '''
+
+    digest = hashlib.sha256()
+    with file_addr.open('rb') as f:
+        while chunk := f.read(CHUNK_BYTES):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cache_key(file_addr, params):
+    '''
+        key for the dfs parsed from file_addr using params
+        params: the plans or param dicts that fix the parsing
+        return str
+    '''
+
+    params_str = json.dumps([CACHE_VERSION, params],
+                            sort_keys= True, default= str)
+    params_digest = hashlib.sha256(params_str.encode()).hexdigest()
+    return f'{file_digest(file_addr)}-{params_digest[:16]}'
+
+
+def cache_load(cache_dir, key):
+    '''
+        fetch the dfs of the entry for key
+        mark the entry as the most recently used
+        return dict, name -> df, or None if key is not in the cache
+    '''
+
+    entry_dir = cache_dir / key
+    if not entry_dir.is_dir():
+        return None
+
+    try:
+        blocks = {file.stem: pl.read_parquet(file)
+                  for file in entry_dir.glob('*.parquet')}
+    # entry removed by another process, or damaged
+    except (OSError, pl.exceptions.ComputeError):
+        return None
+
+    os.utime(entry_dir)
+    return blocks
+
+
+def cache_store(cache_dir, key, blocks, max_bytes= CACHE_MAX_BYTES):
+    '''
+        write the dfs in blocks, dict name -> df, to the entry for key
+        then evict the least recently used entries, if necessary
+    '''
+
+    cache_dir.mkdir(parents= True, exist_ok= True)
+    entry_dir = cache_dir / key
+
+    # write to a temporary directory, then rename it,
+    # so that other processes never see a partial entry
+    tmp_dir = cache_dir / f'{key}.tmp-{os.getpid()}'
+    tmp_dir.mkdir(exist_ok= True)
+    for name, df in blocks.items():
+        df.write_parquet(tmp_dir / f'{name}.parquet')
+
+    try:
+        tmp_dir.rename(entry_dir)
+    # another process stored the same entry
+    except OSError:
+        shutil.rmtree(tmp_dir, ignore_errors= True)
+
+    cache_evict(cache_dir, max_bytes)
+
+
+def cache_evict(cache_dir, max_bytes= CACHE_MAX_BYTES):
+    '''
+        remove the least recently used entries until the cache
+        holds no more than max_bytes
+    '''
+
+    entries = []
+    for entry_dir in cache_dir.iterdir():
+        if not entry_dir.is_dir() or '.tmp-' in entry_dir.name:
+            continue
+        try:
+            size = sum(file.stat().st_size
+                       for file in entry_dir.iterdir())
+            entries.append((entry_dir.stat().st_mtime, size, entry_dir))
+        except OSError:
+            continue
+
+    total = sum(size for _, size, _ in entries)
+    # oldest first
+    for _, size, entry_dir in sorted(entries):
+        if total <= max_bytes:
+            break
+        shutil.rmtree(entry_dir, ignore_errors= True)
+        total -= size
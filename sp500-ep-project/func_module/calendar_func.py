@@ -0,0 +1,150 @@
+'''
+   polars expressions for the dates and quarters
+   of the ingest and display pipelines
+
+   each function receives a pl.Expr, usually pl.col(...),
+   and returns a pl.Expr; polars evaluates them in its own
+   vectorized kernels, without calling python for each row
+
+   a quarter is keyed by an ordinal, pl.Int16:
+        qtr key = year * 4 + q, q in 1..4
+   so that consecutive quarters have consecutive keys;
+   the datasets store the key in the col 'yr_qtr', and
+   the displays format it as the label, yyyy-Qq
+
+   access these values in other modules by
+        import func_module.calendar_func as cf
+'''
+
+import polars as pl
+
+QTR_KEY_DTYPE = pl.Int16
+
+
+def file_date(expr):
+    '''
+        expr: str file names, "... yyyy mm dd.xlsx"
+        return expr of pl.Date
+    '''
+
+    return expr.str.extract(r'(\d{4} \d{2} \d{2})')\
+               .str.strptime(pl.Date, '%Y %m %d')
+
+
+def qtr_key(expr):
+    '''
+        expr: pl.Date or pl.Datetime
+        return expr of qtr keys
+    '''
+
+    return (expr.dt.year() * 4 + expr.dt.quarter())\
+               .cast(QTR_KEY_DTYPE)
+
+
+def margin_qtr_key(year, qtr):
+    '''
+        year: expr of yyyy; qtr: expr of str, 'Qq ...'
+        return expr of qtr keys
+    '''
+
+    qtr_numb = qtr.str.split(' ').list.first().str.slice(1)
+    return (year.cast(QTR_KEY_DTYPE) * 4 +
+            qtr_numb.cast(QTR_KEY_DTYPE))\
+               .cast(QTR_KEY_DTYPE)
+
+
+def key_year(expr):
+    '''
+        expr: qtr keys
+        return expr of the years, pl.Int16
+    '''
+
+    return ((expr - 1) // 4).cast(QTR_KEY_DTYPE)
+
+
+def key_qtr(expr):
+    '''
+        expr: qtr keys
+        return expr of the quarters, 1..4, pl.Int8
+    '''
+
+    return ((expr - 1) % 4 + 1).cast(pl.Int8)
+
+
+def is_quarter_4(expr):
+    '''
+        expr: qtr keys
+        return expr of bool: T if qtr == 4; else F
+    '''
+
+    return key_qtr(expr) == 4
+
+
+def key_to_label(expr):
+    '''
+        expr: qtr keys
+        return expr of str, yyyy-Qq
+    '''
+
+    return pl.concat_str([key_year(expr).cast(pl.String),
+                          pl.lit('-Q'),
+                          key_qtr(expr).cast(pl.String)])
+
+
+def label_to_key(expr):
+    '''
+        expr: str, yyyy-Qq
+        return expr of qtr keys
+    '''
+
+    return (expr.str.slice(0, 4).cast(QTR_KEY_DTYPE) * 4 +
+            expr.str.slice(6, 1).cast(QTR_KEY_DTYPE))\
+               .cast(QTR_KEY_DTYPE)
+
+
+def file_names_to_keys(file_names):
+    '''
+        file_names: list of str, "... yyyy mm dd.xlsx"
+        return list of int, qtr keys
+    '''
+
+    return pl.DataFrame({'file': file_names},
+                        schema= {'file': pl.String})\
+             .select(qtr_key(file_date(pl.col('file'))))\
+             .to_series()\
+             .to_list()
+
+
+def key_label(key):
+    '''
+        label, yyyy-Qq, of one qtr key, an int
+    '''
+
+    return f'{(key - 1) // 4}-Q{(key - 1) % 4 + 1}'
+
+
+def labels_to_keys(items):
+    '''
+        items: list of qtr keys or yyyy-Qq labels,
+        as recorded before the keys replaced the labels
+        return list of int, qtr keys
+    '''
+
+    return [int(item[:4]) * 4 + int(item[6])
+            if isinstance(item, str) else item
+            for item in items]
+
+
+def migrate_qtr_keys(df, col_name= 'yr_qtr'):
+    '''
+        replace the yyyy-Qq labels in col_name with qtr keys,
+        for a df written before the keys replaced the labels
+        df is a DataFrame or a LazyFrame
+        return df, unchanged if col_name already holds keys
+    '''
+
+    schema = df.collect_schema()
+    if (col_name not in schema or
+        schema[col_name] != pl.String):
+        return df
+    return df.with_columns(label_to_key(pl.col(col_name)))
@@ -0,0 +1,146 @@
+'''
+   the projections dataset: one hive-partitioned parquet dataset
+   for the projections of all quarters
+
+   the partition of a projection quarter, the qtr key of the
+   workbook that made the projections, is the directory
+        dataset_dir / proj_yr_qtr=<qtr key> /
+   which contains the quarter's projection file, written with
+   row-group statistics
+
+   a query scans the dataset once; filters on proj_yr_qtr prune
+   partitions, and filters on yr_qtr skip row groups
+
+   access these values in other modules by
+        import func_module.dataset_func as ds
+'''
+
+import polars as pl
+
+import func_module.calendar_func as cf
+import func_module.helper_func as hp
+
+PROJ_KEY = 'proj_yr_qtr'
+
+
+def partition_dir(dataset_dir, proj_yr_qtr):
+    '''
+        directory of the partition for qtr key proj_yr_qtr
+    '''
+
+    return dataset_dir / f'{PROJ_KEY}={proj_yr_qtr}'
+
+
+def proj_file_addr(dataset_dir, proj_yr_qtr, file_name):
+    '''
+        address of the projection file in its partition
+    '''
+
+    return partition_dir(dataset_dir, proj_yr_qtr) / file_name
+
+
+def write_proj(dataset_dir, proj_yr_qtr, file_name, proj_df):
+    '''
+        write proj_df, the projections made in the quarter
+        proj_yr_qtr, to its partition
+        return the address of the file
+    '''
+
+    file_addr = proj_file_addr(dataset_dir, proj_yr_qtr, file_name)
+    file_addr.parent.mkdir(parents= True, exist_ok= True)
+
+    hp.replace_atomically(
+        file_addr,
+        lambda tmp_addr: proj_df.write_parquet(tmp_addr,
+                                               statistics= True))
+    
+    # a partition holds one file: the quarter's latest projections
+    for other_addr in file_addr.parent.glob('*.parquet'):
+        if other_addr != file_addr:
+            other_addr.unlink()
+    return file_addr
+
+
+def remove_proj(dataset_dir, proj_yr_qtr, file_name):
+    '''
+        remove a projection file, and its partition if empty
+        return True if the file existed
+    '''
+
+    file_addr = proj_file_addr(dataset_dir, proj_yr_qtr, file_name)
+    if not file_addr.exists():
+        return False
+    file_addr.unlink()
+    if not any(file_addr.parent.iterdir()):
+        file_addr.parent.rmdir()
+    return True
+
+
+def has_partitions(dataset_dir):
+    '''
+        True if the dataset contains a projection file
+    '''
+
+    return any(dataset_dir.glob(f'{PROJ_KEY}=*/*.parquet'))
+
+
+def dataset_addrs(dataset_dir):
+    '''
+        the dataset's dir and its projection files: the files
+        whose modification times date the dataset's contents
+        return list of Path
+    '''
+
+    return [dataset_dir,
+            *sorted(dataset_dir.glob(f'{PROJ_KEY}=*/*.parquet'))]
+
+
+def loose_proj_files(dataset_dir):
+    '''
+        the .parquet files in dataset_dir outside the partitions:
+        projection files in the layout before the dataset, which
+        scan_proj does not read
+        return list of file names
+    '''
+
+    return sorted(file_addr.name
+                  for file_addr in dataset_dir.glob('*.parquet'))
+
+
+def scan_proj(dataset_dir, proj_yr_qtrs= None):
+    '''
+        LazyFrame of the projections in the dataset,
+        with col PROJ_KEY, the qtr key of the projections
+        proj_yr_qtrs: list of qtr keys of the partitions to read
+        None reads all partitions
+    '''
+
+    lf = pl.scan_parquet(dataset_dir / f'{PROJ_KEY}=*' / '*.parquet',
+                         hive_partitioning= True,
+                         hive_schema= {PROJ_KEY: cf.QTR_KEY_DTYPE})
+    if proj_yr_qtrs is not None:
+        lf = lf.filter(pl.col(PROJ_KEY).is_in(proj_yr_qtrs))
+    return lf
+
+
+def compact_proj(src_dir, dataset_dir, proj_files,
+                 yr_qtr_name= 'yr_qtr'):
+    '''
+        rewrite the projection files in src_dir, one file per
+        quarter in the layout before the dataset, into the
+        partitions of dataset_dir; src_dir may be dataset_dir
+        proj_files: list of (qtr key, file name)
+        return list of the files rewritten
+    '''
+
+    compacted = []
+    for proj_yr_qtr, file_name in proj_files:
+        src_addr = src_dir / file_name
+        if not src_addr.is_file():
+            continue
+        proj_df = cf.migrate_qtr_keys(pl.read_parquet(src_addr),
+                                      yr_qtr_name)
+        write_proj(dataset_dir, proj_yr_qtr, file_name, proj_df)
+        src_addr.unlink()
+        compacted.append(file_name)
+    return compacted
@@ -1,126 +1,116 @@
-from copy import deepcopy
-import gc
 import sys
 
 import polars as pl
 
-import func_module.helper_func as hp
+import func_module.calendar_func as cf
+import func_module.dataset_func as ds
 
 
-def contemp_12m_fwd_proj(df, p_dict, eps, name_proj):
+def contemp_12m_fwd_proj(df, proj_df, name_projs):
     '''
-        add col to df that contains
+        add cols to df that contain, for each quarter,
         projected E over the next 4 quarters
+        proj_df: the projections of all quarters, stacked,
+            with col ds.PROJ_KEY, the qtr key of the projections
+        name_projs: dict, eps col -> name of its new col
+        df and proj_df are both DataFrames or both LazyFrames
         return df
     '''
-    # put 12m fwd projection in new col name_proj
-    # for all qtrs in df
-    df = df.with_columns(pl.Series(
-                    [fwd_12m_ern(eps, p_dict[yrqtr])
-                     for yrqtr in df['yr_qtr']])
-                         .alias(name_proj))\
-           .cast({name_proj: pl.Float32})
-    return df
+    
+    return df.join(fwd_12m_ern(proj_df, name_projs),
+                   on= 'yr_qtr',
+                   how= 'left',
+                   coalesce= True)
 
 
-def fwd_12m_ern(name, p_df):
+def fwd_12m_ern(proj_df, name_projs):
     '''
         calculate "contemporaneous" projection 
-        of next 4 qtrs of earnings
-        return float
+        of next 4 qtrs of earnings for each quarter,
+        one col for each eps col in name_projs
+        return df, with col yr_qtr, the qtr key of the projections
     '''
-    # ensure the yr_qtrs are ascending to sum down the rows
-    # from the current 'yr_qtr'
-    p_df = p_df.sort(by= 'yr_qtr')
-    fwd_e = sum((p_df.item(id, name)
-                 for id in range(4)))
-    del p_df
-    gc.collect()
-    return fwd_e
+    
+    # for each quarter's projections, sort the target yr_qtrs
+    # ascending and sum the first 4 rows
+    return proj_df.group_by(ds.PROJ_KEY)\
+                  .agg(pl.col(eps)
+                         .sort_by('yr_qtr', maintain_order= True)
+                         .head(4)
+                         .cast(pl.Float64)
+                         .sum()
+                         .cast(pl.Float32)
+                         .alias(name_proj)
+                       for eps, name_proj in name_projs.items())\
+                  .rename({ds.PROJ_KEY: 'yr_qtr'})
 
 
-def page0_df(df, p_dict, p_dict_columns, name_act):
+def page0_df(df, proj_df, name_proj, name_act):
     '''
         return df with data to be plotted on page 0
+        proj_df: the projections of all quarters, stacked,
+            with col ds.PROJ_KEY, the qtr key of the projections
     '''
     
     # create 2cols 
     #   actual_op and actual_rep 12m eps for each yr,
     #   which appears only in the 4th qtr, otherwise null
-    hf = df.select(pl.col(name_act),
-                   pl.col('yr_qtr'))\
-                .filter(pl.col('yr_qtr')
-                        .map_batches(hp.is_quarter_4))\
-                .join(df,
-                      how= 'right',
-                      on= 'yr_qtr',
-                      coalesce= True)\
-                .select(pl.col(name_act),
-                        pl.col('yr_qtr'))
-
-    # for each yr_qtr in df, fetch its proj_df from p_dict
-    # filter to select 12m proj in Q4s
-    # join with df on yr_qtr
+    hf = df.select(pl.col('yr_qtr'),
+                   pl.when(cf.is_quarter_4(pl.col('yr_qtr')))
+                     .then(pl.col(name_act))
+                     .alias(name_act))
     
-    # name of the col of e from proj from list: op or rep?
-    for idx, yrqtr in enumerate(df['yr_qtr']):
-        # target yr_qtr, place in col for filtered pro_df
-        pro_df = p_dict[yrqtr]\
-                    .select(p_dict_columns)\
-                    .filter(pl.col('yr_qtr')
-                            .map_batches(hp.is_quarter_4))\
-                    .with_columns(pl.col('yr_qtr')
-                                      .map_batches(hp.yrqtr_to_yr)
-                                      .alias('year'),
-                                  pl.lit(yrqtr).alias('yr_qtr'))
-                    
-        # remove any projections for previous year from Q1
-        if yrqtr[-2:] == 'Q1':
-            pro_df = pro_df.filter(pl.col('year')>= yrqtr[0:4])
-        
-        # accumulate rows for the projection DF for each yr_qtr  
-        if idx == 0:
-            p_df = deepcopy(pro_df)
-        else:
-            p_df = pl.concat([p_df, pro_df],
-                             how= 'vertical')
+    # for each yr_qtr in df, select its 12m proj in Q4s
+    # remove any projections for previous year from Q1
+    proj_key = pl.col(ds.PROJ_KEY)
+    p_df = proj_df.filter(proj_key.is_in(df['yr_qtr']),
+                          cf.is_quarter_4(pl.col('yr_qtr')))\
+                  .with_columns(cf.key_year(pl.col('yr_qtr'))
+                                    .alias('year'))\
+                  .filter((cf.key_qtr(proj_key) != 1) |
+                          (pl.col('year') >= cf.key_year(proj_key)))\
+                  .select(proj_key.alias('yr_qtr'),
+                          pl.col('year'),
+                          pl.col(name_proj))\
+                  .sort(by= 'year', descending= True,
+                        maintain_order= True)
     
-    # pivot years into column names for each yr_qtr
+    # pivot years into column names for each yr_qtr,
+    # most recent year first
     p_df = p_df.pivot(index= 'yr_qtr',
-                      columns= 'year')
+                      on= 'year',
+                      values= name_proj)
     
     # build DF to return for plotting
-    p_df = hf.select(['yr_qtr', 
-                      name_act])\
-             .join(p_df,
+    p_df = hf.join(p_df,
                    on= 'yr_qtr',
                    how= 'left',
                    coalesce= True)
-    del hf
-    del pro_df
-    gc.collect()
     return p_df
 
 
 def  page1_df(df, p_df, eps, ROGQ):
     '''
         return df with data to be plotted on page 1
+        df and p_df are both DataFrames or both LazyFrames
     '''
     
     # find most recent price from projection df
     df = df.with_columns((pl.col('price') / pl.col(eps))
                             .alias('pe'))\
            .sort(by= 'yr_qtr')
-    base_price = \
-        df.filter(pl.col(eps).is_not_null())[-1, 'price']
+    base_df = df.filter(pl.col(eps).is_not_null())\
+                .select(pl.col('price').last()
+                          .cast(pl.Float64)
+                          .alias('fixed_price'))
 
     # build projected df for graph from df and p_df
-    p_df = p_df.with_columns(pl.lit(base_price)
-                               .alias('fixed_price'))\
-               .sort(by= 'yr_qtr')\
-               .with_columns(pl.Series(
-                                    [base_price * ROGQ**idx
-                                     for idx in range(len(p_df))])
+    # price grows from base price at ROGQ per quarter
+    p_df = p_df.sort(by= 'yr_qtr')\
+               .join(base_df, how= 'cross')\
+               .with_columns((pl.col('fixed_price') *
+                              pl.lit(ROGQ) ** pl.int_range(pl.len())
+                                               .cast(pl.Float64))
                                 .alias('incr_price'))\
                .with_columns((pl.col('fixed_price') / pl.col(eps))
                                 .alias('fix_proj_p/e'),
@@ -135,9 +125,12 @@ def  page1_df(df, p_df, eps, ROGQ):
                     'fix_proj_p/e', 'incr_proj_p/e'])
     return df
 
-def page3_df(df, name_12m_fwd_eps):
+def page3_df(df, name_12m_fwd_eps,
+             rate_col= 'real_int_rate',
+             rate_label= '10-year TIPS rate'):
     '''
         return df with data to be plotted on page 3
+        rate_col: col of the real rate, shown as rate_label
     '''
     
     hf = df.with_columns((pl.col(name_12m_fwd_eps) * 100 /
@@ -145,12 +138,49 @@ def page3_df(df, name_12m_fwd_eps):
            .alias('earnings / price'))\
            .with_columns((
                pl.col('earnings / price') -
-               pl.col('real_int_rate'))
+               pl.col(rate_col))
            .alias('equity premium'))\
-           .rename({'real_int_rate': '10-year TIPS rate'})\
+           .rename({rate_col: rate_label})\
            .select('yr_qtr', 
                    'earnings / price', 
                    'equity premium',
-                   '10-year TIPS rate')\
+                   rate_label)\
            .sort(by= 'yr_qtr')
     return hf 
+
+
+def page4_df(cube_df, eps, index_name= 'S&P 500'):
+    '''
+        return df with data to be plotted on page 4, long format:
+        for each quarter and each sector of index_name, the growth
+        of eps over the same quarter a year earlier, percent
+        null if there is no eps a year earlier, or it is not positive
+        cube_df: the sector cube, see sector_func.py
+        eps: 'op' or 'rep'
+        cols yr_qtr, sector (without index_name), growth,
+            index_name's own rows first
+    '''
+    
+    prefix = f'{index_name} '
+    sector = pl.col('sector').cast(pl.String)
+    hf = cube_df.filter((pl.col('eps') == eps) &
+                        sector.str.starts_with(prefix))\
+                .select('yr_qtr',
+                        pl.when(sector == f'{prefix}Index')
+                          .then(pl.lit(index_name))
+                          .otherwise(sector.str.strip_prefix(prefix))
+                          .alias('sector'),
+                        'value')
+    
+    # the eps a year earlier: 4 qtr keys before
+    prev = hf.with_columns((pl.col('yr_qtr') + 4)
+                           .cast(cf.QTR_KEY_DTYPE))\
+             .rename({'value': 'prev'})
+    hf = hf.join(prev, on= ['yr_qtr', 'sector'], how= 'left')\
+           .select('yr_qtr', 'sector',
+                   pl.when(pl.col('prev') > 0)
+                     .then((pl.col('value') / pl.col('prev') - 1) * 100)
+                     .alias('growth'))\
+           .sort(by= [pl.col('sector') != index_name,
+                      'sector', 'yr_qtr'])
+    return hf
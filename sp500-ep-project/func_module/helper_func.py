@@ -7,6 +7,7 @@
 '''
 import sys
 
+from bisect import bisect_left
 from datetime import datetime
 
 import openpyxl.utils.cell
@@ -40,60 +41,213 @@ def dt_str_to_date(item):
     return dt
         
 
-def string_to_date(series):
+def replace_atomically(file_addr, write_fn):
     '''
-        receives pl.Series (col from df), str file names
-        extracts the date string, "yyyy mm dd",
-        returns the string to date object, as pl.Series
+        write_fn(tmp_addr) writes the new file beside file_addr,
+        which it then replaces: readers see the old file or the
+        new one, never part of a file
+        if write_fn raises, file_addr is unchanged
     '''
-    # splits f_name into two two words,
-    # the first and the rest
-    # then splits the .xlsx from the rest
-    return pl.Series([datetime.strptime((f_name.split(' ', 1)[1])
-                                               .split('.', 1)[0], 
-                                        '%Y %m %d').date()
-                      for f_name in series])
-    
-    
-def date_to_year_qtr(series):
+
+    tmp_addr = file_addr.with_name(f'{file_addr.name}.tmp')
+    try:
+        write_fn(tmp_addr)
+    except BaseException:
+        tmp_addr.unlink(missing_ok= True)
+        raise
+    tmp_addr.replace(file_addr)
+
+
+def changed_rows(hist_df, new_df):
+    '''
+        rows of new_df that do not appear, value for value,
+        in hist_df: new rows and revised rows
+        if the cols differ, all rows of new_df
+    '''
+
+    if hist_df.schema != new_df.schema:
+        return new_df
+    return new_df.join(hist_df,
+                       on= new_df.columns,
+                       how= 'anti',
+                       join_nulls= True)
+
+
+def upsert_rows(hist_df, new_df, key):
     '''
-        Receives pl.Series (col from df)
-        Returns year_qtr string, yyyy-Qq, as pl.Series
+        replace the rows of hist_df that have the same key as a
+        changed row of new_df, add new_df's rows with new keys
+        rows of hist_df with keys absent from new_df are kept
+        return (df sorted by key, most recent first,
+                list of the keys that changed)
+    '''
+
+    upd_df = changed_rows(hist_df, new_df)
+    keys = upd_df[key].to_list()
+    if len(keys) == 0:
+        return hist_df, keys
+
+    df = pl.concat([hist_df.filter(~pl.col(key).is_in(keys)),
+                    upd_df],
+                   how= 'diagonal_relaxed')\
+           .sort(by= key, descending= True, maintain_order= True)
+    return df, keys
+
+
+class SheetIndex:
+    '''
+        reads a worksheet once, iter_rows(values_only= True),
+        and records
+            the values in each row
+            the rows of each str key in col A
+            the blank rows in col A
+        the loaders answer find_key_row, find_key_col, and
+        cell reads from the index, not from the worksheet,
+        which, when read_only, re-reads its xml for each cell
     '''
-    return pl.Series([f"{date.year}-Q{date_to_qtr(date)}"
-            for date in series])
     
+    def __init__(self, wksht):
+        self.title = wksht.title
+        
+        # rows[0] is a placeholder: row numbers begin at 1
+        self.rows = [()]
+        # key_rows: str in col A -> ascending list of row numbers
+        self.key_rows = dict()
+        # blank_rows: ascending list of rows with None in col A
+        self.blank_rows = []
+        
+        for row_number, row in enumerate(
+                wksht.iter_rows(values_only= True), start= 1):
+            self.rows.append(row)
+            item = row[0] if len(row) > 0 else None
+            if item is None:
+                self.blank_rows.append(row_number)
+            elif isinstance(item, str):
+                self.key_rows.setdefault(item, []).append(row_number)
+        
+        self.max_row = len(self.rows) - 1
+        self.max_column = max((len(row) for row in self.rows),
+                              default= 0)
+        
+    def find_key_row(self, start_row, key_values= None):
+        '''
+            first row, at or after start_row, with a blank
+            (key_values is None) or (one of) the key(s) in col A
+            return 0 if there is no match
+        '''
+        
+        if key_values is None:
+            row_lsts = [self.blank_rows]
+        else:
+            row_lsts = [self.key_rows[key]
+                        for key in key_values
+                        if key in self.key_rows]
+        
+        # each list is ascending: bisect for the first row >= start_row
+        found = [row_lst[idx]
+                 for row_lst in row_lsts
+                 if (idx := bisect_left(row_lst, start_row)) 
+                     < len(row_lst)]
+        return min(found, default= 0)
+        
+    def find_key_col(self, search_row, start_col, key_value= None):
+        '''
+            first col, at or after start_col, in search_row
+            whose cell matches key_value
+            cells to the right of the recorded values are blank
+            return 0 if there is no match
+        '''
+        
+        return find_key_in_row(self.rows[search_row],
+                               start_col, key_value)
+    
+    def value(self, col_ltr, row_number):
+        '''
+            value of the cell at col_ltr, row_number
+            None for cells outside the recorded values
+        '''
+        
+        col_idx = openpyxl.utils.cell.column_index_from_string(col_ltr)
+        if not (0 < row_number <= self.max_row):
+            return None
+        row = self.rows[row_number]
+        if col_idx > len(row):
+            return None
+        return row[col_idx - 1]
     
-def date_to_qtr(date):
+    def block(self, start_row, stop_row, first_col, last_col, skip_col):
+        '''
+            values from first_col to last_col for rows
+            start_row through stop_row, omitting skip_col,
+            as a list of lists
+        '''
+        
+        first_idx = openpyxl.utils.cell.column_index_from_string(first_col)
+        last_idx = openpyxl.utils.cell.column_index_from_string(last_col)
+        width = last_idx - first_idx + 1
+        
+        data = []
+        for row in self.rows[start_row: stop_row + 1]:
+            # pad short rows with None
+            values = row[first_idx - 1: last_idx]
+            values = (*values, *([None] * (width - len(values))))
+            data.append([value 
+                         for ind, value in enumerate(values)
+                         if ind not in skip_col])
+        return data
+
+
+def find_key_in_row(row, start_col, key_value= None):
     '''
-        Returns qtr number as string
+        row is a tuple of the values in a row of a worksheet
+        return the first col number, at or after start_col,
+        whose value matches key_value
+        cells to the right of the values in row are blank
+        return 0 if there is no match
     '''
-    return f"{((date.month) - 1) // 3 + 1 }"
+    
+    for col_numb in range(start_col, len(row) + 1):
+        if item_matches_key(row[col_numb - 1], key_value):
+            return col_numb
+    
+    if key_value is None:
+        return max(start_col, len(row) + 1)
+    return 0
 
 
-def is_quarter_4(series):
+def sheet_index(wksht):
     '''
-        returns bool: T if qtr == 4; else F
+        return a SheetIndex for wksht
+        if wksht is a SheetIndex, return it
     '''
-    return pl.Series([yq[-1] == '4'
-                      for yq in series])
     
-    
-def yrqtr_to_yr(series):
-    '''series of strings y-q in,
-       series of strings y out
+    if isinstance(wksht, SheetIndex):
+        return wksht
+    return SheetIndex(wksht)
+
+
+def cell_value(wksht, col_ltr, row_number):
+    '''
+        value of the cell at col_ltr, row_number
+        wksht is either a worksheet or a SheetIndex
     '''
-    return pl.Series([yq[:4]
-                      for yq in series])
     
+    if isinstance(wksht, SheetIndex):
+        return wksht.value(col_ltr, row_number)
+    return wksht[f'{col_ltr}{row_number}'].value
+
 
 def find_key_row(wksht, search_col, start_row, key_values= None):
     '''
         for key_values (either None or a list),
         find cell containing (one of) the specified key(s)
         crawl down col A; return the row number of the first match
+        for a SheetIndex, look up the row in its index of col A
     '''
     
+    if isinstance(wksht, SheetIndex) and search_col == 'A':
+        return wksht.find_key_row(start_row, key_values)
+    
     # cap the number of rows to read
     max_to_read = wksht.max_row
     
@@ -148,8 +302,12 @@ def find_key_col(wksht, search_row, start_col, key_value= None):
         crawl along search_row to
         find cell containing the specified key,
         return col number of the first cell that matches
+        for a SheetIndex, search its record of search_row
     '''
     
+    if isinstance(wksht, SheetIndex):
+        return wksht.find_key_col(search_row, start_col, key_value)
+    
     # cap the number of rows to read
     max_to_read = wksht.max_column
     
@@ -0,0 +1,136 @@
+'''
+   the ipc mirror: uncompressed Arrow IPC (Feather v2) copies of
+   the history and of the stacked projections, beside the .parquet
+   files that update_data.py writes
+
+   a reader maps a mirror's file into memory: a read starts at
+   once and does not copy or decompress the data; repeated reads
+   share the pages of the file
+        df = ic.read_mirror(sp.OUTPUT_HIST_MIRROR_ADDR)
+        lf = ic.scan_mirror(sp.OUTPUT_PROJ_MIRROR_ADDR)
+
+   the .parquet files remain the record; beside each mirror, a
+   json file records the size and mtime of the mirror and of each
+   of its sources when it was written
+        <mirror's file name>.json
+   a mirror is current only if those values match the files that
+   are there now, so a source restored from a backup, whatever its
+   mtime, makes the mirror stale; readers fall back to the .parquet
+   files when it is not current
+
+   access these values in other modules by
+        import func_module.ipc_func as ic
+'''
+
+import json
+
+import polars as pl
+
+import func_module.helper_func as hp
+
+
+def sources_addr(mirror_addr):
+    '''
+        address of the json file that records the
+        sources of the mirror at mirror_addr
+    '''
+
+    return mirror_addr.with_name(f'{mirror_addr.name}.json')
+
+
+def file_stamp(file_addr):
+    '''
+        [size, mtime in ns] of the file at file_addr
+        None if there is no file
+    '''
+
+    try:
+        stat = file_addr.stat()
+    except FileNotFoundError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def file_stamps(file_addrs):
+    '''
+        dict, file's address -> file_stamp()
+    '''
+
+    return {str(file_addr): file_stamp(file_addr)
+            for file_addr in file_addrs}
+
+
+def write_mirror(df, mirror_addr, source_addrs):
+    '''
+        write df to mirror_addr, uncompressed, as one
+        record batch, so that a read maps each col
+        as one buffer
+        source_addrs: the .parquet files that df was read
+            from, or written to; their stamps are recorded
+    '''
+
+    mirror_addr.parent.mkdir(parents= True, exist_ok= True)
+    # a mirror without its json file is not current
+    sources_addr(mirror_addr).unlink(missing_ok= True)
+
+    hp.replace_atomically(
+        mirror_addr,
+        lambda tmp_addr: df.rechunk().write_ipc(
+            tmp_addr, compression= 'uncompressed'))
+
+    stamps = file_stamps([mirror_addr, *source_addrs])
+    hp.replace_atomically(
+        sources_addr(mirror_addr),
+        lambda tmp_addr: tmp_addr.write_text(
+            json.dumps(stamps, indent= 4, sort_keys= True)))
+
+
+def remove_mirror(mirror_addr):
+    '''
+        remove the mirror, if any
+        return True if the file existed
+    '''
+
+    sources_addr(mirror_addr).unlink(missing_ok= True)
+    if not mirror_addr.exists():
+        return False
+    mirror_addr.unlink()
+    return True
+
+
+def is_current(mirror_addr, source_addrs):
+    '''
+        T if mirror_addr exists and was written from
+        source_addrs as they are now: the same files, each
+        with the size and mtime recorded when the mirror
+        was written
+    '''
+
+    if not mirror_addr.exists():
+        return False
+    try:
+        with sources_addr(mirror_addr).open('r') as f:
+            stamps = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return False
+    return stamps == file_stamps([mirror_addr, *source_addrs])
+
+
+def read_mirror(mirror_addr, columns= None):
+    '''
+        the df in mirror_addr, memory mapped
+        columns: list of the cols to read; None, all
+    '''
+
+    return pl.read_ipc(mirror_addr,
+                       columns= columns,
+                       memory_map= True,
+                       rechunk= False)
+
+
+def scan_mirror(mirror_addr):
+    '''
+        LazyFrame of the df in mirror_addr, memory mapped
+    '''
+
+    return pl.scan_ipc(mirror_addr, memory_map= True)
@@ -0,0 +1,291 @@
+'''
+   the manifest of the files that update_data.py has read
+   and written, an sqlite database that replaces record_dict.json
+
+   tables, each indexed by its primary key:
+        meta:        key -> value; the sources of the data
+        input_files: each sp-500-eps-est workbook seen
+        used_files:  qtr key -> the workbook used for the quarter,
+                     the one with the latest date in the quarter
+        proj_files:  qtr key -> the projection file written
+                     from the quarter's workbook
+        vintages:    date of projections -> the qtr key of the date,
+                     the file in the vintage store, and its kind,
+                     'snapshot' or 'delta'; see vintage_func
+   qtr keys as in calendar_func
+
+   updates are made in one transaction, which commit() ends;
+   when a run ends without commit(), none of its updates are kept
+
+   export_json() writes the manifest in the format of
+   record_dict.json; an existing record_dict.json is imported
+   when the manifest is created
+
+   access these values in other modules by
+        import func_module.manifest_func as mf
+'''
+
+import json
+import sqlite3
+
+import func_module.calendar_func as cf
+
+SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS meta (
+        key TEXT PRIMARY KEY,
+        value TEXT NOT NULL
+    ) WITHOUT ROWID;
+    CREATE TABLE IF NOT EXISTS input_files (
+        file_name TEXT PRIMARY KEY
+    ) WITHOUT ROWID;
+    CREATE TABLE IF NOT EXISTS used_files (
+        yr_qtr INTEGER PRIMARY KEY,
+        file_name TEXT NOT NULL UNIQUE
+    );
+    CREATE TABLE IF NOT EXISTS proj_files (
+        yr_qtr INTEGER PRIMARY KEY,
+        file_name TEXT NOT NULL UNIQUE
+    );
+    CREATE TABLE IF NOT EXISTS vintages (
+        vintage TEXT PRIMARY KEY,
+        proj_yr_qtr INTEGER NOT NULL,
+        file_name TEXT NOT NULL,
+        kind TEXT NOT NULL
+    ) WITHOUT ROWID;
+'''
+
+
+class Manifest:
+    '''
+        the manifest in the sqlite database at db_addr
+        the database and its tables are created if necessary
+    '''
+
+    def __init__(self, db_addr):
+        self.db_addr = db_addr
+        # one thread at a time: update_data_files may hand the
+        # manifest to the thread that writes the output files
+        self.conn = sqlite3.connect(db_addr, check_same_thread= False)
+        self.conn.executescript(SCHEMA)
+
+    def is_empty(self):
+        return self.conn.execute(
+            'SELECT NOT EXISTS (SELECT 1 FROM input_files)'
+            ).fetchone()[0] == 1
+
+    def commit(self):
+        self.conn.commit()
+
+    def close(self):
+        '''
+            close the database; uncommitted updates are discarded
+        '''
+
+        self.conn.close()
+
+# +++++  meta  ++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    def get_meta(self, key):
+        row = self.conn.execute('SELECT value FROM meta WHERE key = ?',
+                                (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key, value):
+        self.conn.execute('INSERT OR REPLACE INTO meta VALUES (?, ?)',
+                          (key, value))
+
+# +++++  input files  +++++++++++++++++++++++++++++++++++++++++++++++++
+    def new_input_files(self, file_names):
+        '''
+            return set, the file_names not previously seen
+        '''
+
+        return {file_name
+                for file_name in file_names
+                if self.conn.execute(
+                    'SELECT 1 FROM input_files WHERE file_name = ?',
+                    (file_name,)).fetchone() is None}
+
+    def add_input_files(self, file_names):
+        self.conn.executemany(
+            'INSERT OR IGNORE INTO input_files VALUES (?)',
+            ((file_name,) for file_name in file_names))
+
+    def input_files(self):
+        '''
+            return list of file names, most recent first
+        '''
+
+        return [row[0] for row in self.conn.execute(
+            'SELECT file_name FROM input_files ORDER BY file_name DESC')]
+
+# +++++  used files  ++++++++++++++++++++++++++++++++++++++++++++++++++
+    def used_file(self, yr_qtr):
+        '''
+            return the workbook used for qtr key yr_qtr, or None
+        '''
+
+        row = self.conn.execute(
+            'SELECT file_name FROM used_files WHERE yr_qtr = ?',
+            (yr_qtr,)).fetchone()
+        return row[0] if row else None
+
+    def set_used_file(self, yr_qtr, file_name):
+        self.conn.execute(
+            'INSERT OR REPLACE INTO used_files VALUES (?, ?)',
+            (yr_qtr, file_name))
+
+    def used_files(self):
+        '''
+            return list of (qtr key, file name), most recent first
+        '''
+
+        return self.conn.execute(
+            'SELECT yr_qtr, file_name FROM used_files '
+            'ORDER BY yr_qtr DESC').fetchall()
+
+    def latest_used_file(self):
+        '''
+            return the workbook used for the most recent quarter,
+            or None
+        '''
+
+        row = self.conn.execute(
+            'SELECT file_name FROM used_files '
+            'ORDER BY yr_qtr DESC LIMIT 1').fetchone()
+        return row[0] if row else None
+
+    def proj_yr_qtrs(self):
+        '''
+            return list of the qtr keys of the used files,
+            most recent first
+        '''
+
+        return [row[0] for row in self.conn.execute(
+            'SELECT yr_qtr FROM used_files ORDER BY yr_qtr DESC')]
+
+# +++++  projection files  ++++++++++++++++++++++++++++++++++++++++++++
+    def proj_file(self, yr_qtr):
+        '''
+            return the projection file for qtr key yr_qtr, or None
+        '''
+
+        row = self.conn.execute(
+            'SELECT file_name FROM proj_files WHERE yr_qtr = ?',
+            (yr_qtr,)).fetchone()
+        return row[0] if row else None
+
+    def set_proj_file(self, yr_qtr, file_name):
+        self.conn.execute(
+            'INSERT OR REPLACE INTO proj_files VALUES (?, ?)',
+            (yr_qtr, file_name))
+
+    def remove_proj_file(self, yr_qtr):
+        self.conn.execute('DELETE FROM proj_files WHERE yr_qtr = ?',
+                          (yr_qtr,))
+
+    def proj_files(self):
+        '''
+            return list of (qtr key, file name), most recent first
+        '''
+
+        return self.conn.execute(
+            'SELECT yr_qtr, file_name FROM proj_files '
+            'ORDER BY yr_qtr DESC').fetchall()
+
+# +++++  vintages  ++++++++++++++++++++++++++++++++++++++++++++++++++++
+    def set_vintage(self, vintage, proj_yr_qtr, file_name, kind):
+        self.conn.execute(
+            'INSERT OR REPLACE INTO vintages VALUES (?, ?, ?, ?)',
+            (vintage, proj_yr_qtr, file_name, kind))
+
+    def vintages(self):
+        '''
+            return list of (vintage, qtr key, file name, kind),
+            in order of the vintages' dates, earliest first
+        '''
+
+        return self.conn.execute(
+            'SELECT vintage, proj_yr_qtr, file_name, kind '
+            'FROM vintages ORDER BY vintage').fetchall()
+
+    def latest_vintages(self):
+        '''
+            the latest vintage of each quarter
+            return list of (qtr key, vintage), most recent first
+        '''
+
+        return self.conn.execute(
+            'SELECT proj_yr_qtr, MAX(vintage) FROM vintages '
+            'GROUP BY proj_yr_qtr ORDER BY proj_yr_qtr DESC').fetchall()
+
+# +++++  record_dict.json  ++++++++++++++++++++++++++++++++++++++++++++
+    def to_record_dict(self):
+        '''
+            return the manifest as a record_dict
+        '''
+
+        used = self.used_files()
+        return {'sources': {'s&p': self.get_meta('s&p') or '',
+                            'tips': self.get_meta('tips') or ''},
+                'latest_used_file': self.latest_used_file() or '',
+                'proj_yr_qtrs': [yr_qtr for yr_qtr, _ in used],
+                'prev_used_files': [file_name for _, file_name in used],
+                'output_proj_files': [file_name for _, file_name
+                                      in self.proj_files()],
+                'prev_files': self.input_files()}
+
+    def import_record_dict(self, record_dict):
+        '''
+            add the entries of a record_dict to the manifest
+            prev_used_files and output_proj_files are paired by
+            position, most recent first: a projection file is
+            named by the date in its sheet, which can differ from
+            the date in the name of its workbook
+        '''
+
+        for key, value in record_dict.get('sources', dict()).items():
+            self.set_meta(key, value)
+        self.add_input_files(record_dict.get('prev_files', []))
+
+        used_files = sorted(record_dict.get('prev_used_files', []),
+                            reverse= True)
+        output_files = sorted(record_dict.get('output_proj_files', []),
+                              reverse= True)
+        if len(output_files) != len(used_files):
+            print('\n============================================')
+            print(f'record_dict lists {len(used_files)} used files '
+                  f'and {len(output_files)} projection files')
+            print('Paired them by position, most recent first')
+            print('============================================\n')
+
+        for yr_qtr, file_name in zip(cf.file_names_to_keys(used_files),
+                                     used_files):
+            self.set_used_file(yr_qtr, file_name)
+        for yr_qtr, proj_file in zip(cf.file_names_to_keys(used_files),
+                                     output_files):
+            self.set_proj_file(yr_qtr, proj_file)
+
+    def export_json(self, json_addr):
+        with json_addr.open('w') as f:
+            json.dump(self.to_record_dict(), f)
+
+
+def open_manifest(db_addr, json_addr= None):
+    '''
+        open the manifest at db_addr
+        a new manifest imports the record_dict at json_addr,
+        if it exists
+        return Manifest
+    '''
+
+    manifest = Manifest(db_addr)
+    if (manifest.is_empty() and
+        json_addr is not None and json_addr.exists()):
+        with json_addr.open('r') as f:
+            manifest.import_record_dict(json.load(f))
+        manifest.commit()
+        print('\n============================================')
+        print(f'Imported record_dict from: \n{json_addr}')
+        print(f'to the manifest: \n{db_addr}')
+        print('============================================\n')
+    return manifest
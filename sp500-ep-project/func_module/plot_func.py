@@ -1,5 +1,8 @@
+import numpy as np
 import polars as pl
 
+import func_module.calendar_func as cf
+
 def plots_page0(ax, df,
                 title= None, 
                 ylim = (None, None), 
@@ -254,14 +257,67 @@ def plots_page3(ax, df,
     return ax
 
 
+def plots_page4(ax, df,
+                title= None,
+                xlabl= None,
+                ylabl= None,
+                vlim= 50,
+                cbar_labl= None):
+    """
+        show a heat map: one row for each series,
+        one col for each quarter
+        x axis is the 1st col of df, yr_qtr
+        the rows are the remaining cols, top to bottom
+        values beyond -vlim and vlim take the end colors;
+        nulls are blank
+        the whole matrix is drawn as one image
+    """
+    
+    # create the title and labels for the plot
+    ax.set_title(title, fontweight= 'bold', loc= 'left')
+    ax.set_xlabel(xlabl, fontweight= 'bold')
+    ax.set_ylabel(ylabl, fontweight= 'bold')
+    
+    # prepare labels for the horizontal axis
+    [yq, x_tick_labels] = yq_and_ticklabels(df)
+    
+    # rows: series, cols: quarters; nulls are nan
+    names = list(df.columns)[1:]
+    matrix = df.select(pl.col(names).cast(pl.Float64))\
+               .to_numpy()\
+               .T
+    
+    image = ax.imshow(np.ma.masked_invalid(matrix),
+                      cmap= 'RdYlGn',
+                      vmin= -vlim,
+                      vmax= vlim,
+                      aspect= 'auto',
+                      interpolation= 'nearest')
+    
+    # a label for each series; x labels only for 1st qtrs
+    ax.set_yticks(range(len(names)), names, fontsize= 8)
+    x_ticks = [idx
+               for idx, item in enumerate(x_tick_labels)
+               if len(item) > 2]
+    ax.set_xticks(x_ticks, [yq[idx] for idx in x_ticks],
+                  rotation= 90, fontsize= 8)
+    
+    cbar = ax.figure.colorbar(image, ax= ax, extend= 'both')
+    cbar.set_label(cbar_labl, fontsize= 8)
+    cbar.ax.tick_params(labelsize= 8)
+    return ax
+
+
 def yq_and_ticklabels(df):
     '''
-        input a series of str in col yr_qtr of df
+        input a series of qtr keys in col yr_qtr of df
         return a list containing 2 lists
-        1) a list of str, the entries in yr_qtr
+        1) a list of str, the yyyy-Qq labels of the keys in yr_qtr
         2) a list of str, the custom x_tick labels for plot
     '''
-    yr_qtr = pl.Series(df['yr_qtr']).to_list()
+    yr_qtr = df.select(cf.key_to_label(pl.col('yr_qtr')))\
+               .to_series()\
+               .to_list()
     
     x_tick_labels = \
         [item if item[-1:] == '1' else item[-2:]
@@ -0,0 +1,254 @@
+'''
+   timing and memory of the named stages of a run,
+   written as a trace that Chrome's trace viewer opens:
+        chrome://tracing or https://ui.perfetto.dev
+
+   for each stage, the trace records
+        wall time, the event's ts and dur
+        cpu time of the stage's thread
+        peak memory traced by tracemalloc during the stage
+        peak rss of the process at the end of the stage
+   stages nest; a stage's peak includes its inner stages'
+   tracemalloc's peak is process-wide: while stages run in two
+   threads, a stage's peak may include the other's memory
+
+   profiling is off until enable(); stage() then costs
+   nearly nothing, so the stages stay in the code
+        with pr.stage('join margins'):
+            ...
+   or, as a decorator
+        @pr.stage('render page 0')
+
+   a worker process records its stages with traced_call();
+   the parent adds them to its trace with add_events()
+
+   access these values in other modules by
+        import func_module.profile_func as pr
+'''
+
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:
+    # windows: no peak rss
+    resource = None
+
+import func_module.helper_func as hp
+
+MIB = 2**20
+# tracemalloc frames kept for each allocation
+TRACE_FRAMES = 1
+
+ENABLED = False
+EVENTS = []
+# the open stages of each thread
+_local = threading.local()
+_lock = threading.Lock()
+
+
+def enable():
+    '''
+        start recording stages, and tracing memory
+    '''
+
+    global ENABLED
+    ENABLED = True
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(TRACE_FRAMES)
+
+
+def disable():
+    '''
+        stop recording stages, and tracing memory
+    '''
+
+    global ENABLED
+    ENABLED = False
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+def max_rss_mib():
+    '''
+        peak resident set size of this process, MiB
+        None if the platform does not report it
+    '''
+
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # bytes on macos, KiB on linux
+    scale = 1 if sys.platform == 'darwin' else 2**10
+    return round(max_rss * scale / MIB, 1)
+
+
+@contextmanager
+def stage(name, **args):
+    '''
+        record the stage name while the block runs
+        args: json-serializable values shown with the stage
+    '''
+
+    if not ENABLED:
+        yield
+        return
+
+    stack = getattr(_local, 'stack', None)
+    if stack is None:
+        stack = _local.stack = []
+        # the trace viewer's name for the thread
+        with _lock:
+            EVENTS.append({'name': 'thread_name',
+                           'ph': 'M',
+                           'pid': os.getpid(),
+                           'tid': threading.get_ident(),
+                           'args': {'name':
+                                    threading.current_thread().name}})
+
+    # the outer stages keep the peak so far; this stage
+    # starts from the memory in use now
+    current, peak = tracemalloc.get_traced_memory()
+    for outer in stack:
+        outer['peak'] = max(outer['peak'], peak)
+    tracemalloc.reset_peak()
+    frame = {'peak': current}
+    stack.append(frame)
+
+    start = time.perf_counter_ns()
+    start_cpu = time.thread_time_ns()
+    try:
+        yield
+    finally:
+        dur = time.perf_counter_ns() - start
+        cpu = time.thread_time_ns() - start_cpu
+        _, peak = tracemalloc.get_traced_memory()
+        frame['peak'] = max(frame['peak'], peak)
+        stack.pop()
+        for outer in stack:
+            outer['peak'] = max(outer['peak'], frame['peak'])
+
+        event = {'name': name,
+                 'cat': 'stage',
+                 'ph': 'X',
+                 'ts': start / 1000,
+                 'dur': dur / 1000,
+                 'pid': os.getpid(),
+                 'tid': threading.get_ident(),
+                 'args': {'cpu_ms': round(cpu / 1e6, 3),
+                          'peak_traced_mib':
+                              round(frame['peak'] / MIB, 2),
+                          'max_rss_mib': max_rss_mib(),
+                          **args}}
+        with _lock:
+            EVENTS.append(event)
+
+
+def traced_call(enabled, name, func, *args):
+    '''
+        in a worker process: call func(*args) in stage name,
+        recording its stages if enabled
+        module-level, so that it can run in a worker process
+        return (result of func, list of the events recorded)
+    '''
+
+    if enabled:
+        enable()
+    with stage(name):
+        result = func(*args)
+    return result, drain_events()
+
+
+def add_events(events):
+    '''
+        add the events recorded in a worker process
+    '''
+
+    with _lock:
+        EVENTS.extend(events)
+
+
+def drain_events():
+    '''
+        return list of the events recorded, and clear it
+    '''
+
+    with _lock:
+        events = list(EVENTS)
+        EVENTS.clear()
+    return events
+
+
+def process_names(events):
+    '''
+        trace viewer's metadata events that name
+        the processes of events
+    '''
+
+    main_pid = os.getpid()
+    return [{'name': 'process_name',
+             'ph': 'M',
+             'pid': pid,
+             'tid': 0,
+             'args': {'name': 'main' if pid == main_pid
+                      else f'worker {pid}'}}
+            for pid in sorted({event['pid'] for event in events})]
+
+
+def write_trace(trace_addr):
+    '''
+        write the events recorded, as a Chrome trace,
+        to trace_addr; print a summary of the stages
+    '''
+
+    with _lock:
+        metadata = [event for event in EVENTS if event['ph'] == 'M']
+        events = sorted((event for event in EVENTS
+                         if event['ph'] == 'X'),
+                        key= lambda event: event['ts'])
+
+    trace = {'traceEvents': [*process_names(events),
+                             *metadata, *events],
+             'displayTimeUnit': 'ms'}
+    hp.replace_atomically(
+        trace_addr,
+        lambda tmp_addr: tmp_addr.write_text(json.dumps(trace)))
+
+    print_summary(events)
+    print('\n============================================')
+    print(f'Wrote profile trace to: \n{trace_addr}')
+    print('============================================\n')
+
+
+def print_summary(events):
+    '''
+        print, for each stage name, the number of times the stage
+        ran, its total wall and cpu times, and its largest peak
+    '''
+
+    totals = dict()
+    for event in events:
+        count, wall, cpu, peak = totals.get(event['name'],
+                                            (0, 0.0, 0.0, 0.0))
+        totals[event['name']] = (
+            count + 1,
+            wall + event['dur'] / 1e6,
+            cpu + event['args']['cpu_ms'] / 1e3,
+            max(peak, event['args']['peak_traced_mib']))
+
+    print('\n============================================')
+    print(f'{"stage":<32}{"n":>5}{"wall s":>9}{"cpu s":>9}'
+          f'{"peak MiB":>10}')
+    for name, (count, wall, cpu, peak) in totals.items():
+        print(f'{name[:31]:<32}{count:>5}{wall:>9.3f}{cpu:>9.3f}'
+              f'{peak:>10.2f}')
+    max_rss = max_rss_mib()
+    if max_rss is not None:
+        print(f'\npeak rss of the main process: {max_rss} MiB')
+    print('============================================\n')
@@ -0,0 +1,169 @@
+'''
+   the rate stores: FRED's observations of interest rates, by
+   date, and the rates at the end of each quarter
+        the real-rate store: DFII10, from DFII10.xlsx or .csv
+        the curve store: several series, DFII5 ... DFII30 and
+            DGS10, from fredgraph.xlsx or .csv, one col each
+
+   update_data.py reads only the observations after the last date
+   in a store; append_rates adds them, and recomputes the
+   end-of-quarter rates only for the quarters of the new dates
+
+   two .parquet files for each store
+        the observations: cols date, pl.Date, and the rate of each
+            series, pl.Float32, in order of date
+        the quarters: cols yr_qtr, the qtr key, and for each series
+            its last observation in the quarter, in order of qtr
+
+   rate_curve interpolates the real rates of each quarter
+   at the maturities of the curve
+
+   access these values in other modules by
+        import func_module.rate_store_func as rs
+'''
+
+import numpy as np
+import polars as pl
+
+import func_module.calendar_func as cf
+import func_module.helper_func as hp
+
+DATE_COL = 'date'
+
+
+def eoq_frame(daily_df, yr_qtr_name):
+    '''
+        the last observation of each series in each quarter
+        of daily_df; a series missing on the last date of the
+        quarter, a holiday, keeps its previous observation
+        return df, cols yr_qtr_name and the series,
+            sorted by qtr key
+    '''
+
+    return daily_df.with_columns(cf.qtr_key(pl.col(DATE_COL))
+                                   .alias(yr_qtr_name))\
+                   .group_by(yr_qtr_name)\
+                   .agg([pl.exclude(DATE_COL)
+                           .sort_by(DATE_COL)
+                           .drop_nulls()
+                           .last()])\
+                   .sort(by= yr_qtr_name)
+
+
+def read_store(daily_addr, qtr_addr):
+    '''
+        return (df of the observations, df of the quarters),
+        or (None, None) if there is no store
+    '''
+
+    if not (daily_addr.exists() and qtr_addr.exists()):
+        return None, None
+    return pl.read_parquet(daily_addr), pl.read_parquet(qtr_addr)
+
+
+def last_date(daily_df):
+    '''
+        the date of the last observation in daily_df
+        None if daily_df is None or empty
+    '''
+
+    if daily_df is None or daily_df.height == 0:
+        return None
+    return daily_df[DATE_COL].max()
+
+
+def append_rates(daily_df, qtr_df, new_df, yr_qtr_name):
+    '''
+        add the observations in new_df after the last date in
+        daily_df, and recompute the rates of their quarters
+        daily_df, qtr_df: the store, or None for a new store
+        return (daily_df, qtr_df, list of the qtr keys updated)
+    '''
+
+    if daily_df is None or qtr_df is None:
+        daily_df, qtr_df = new_df.clear(), None
+    last = last_date(daily_df)
+    if last is not None:
+        new_df = new_df.filter(pl.col(DATE_COL) > last)
+    if new_df.height == 0:
+        return daily_df, qtr_df, []
+
+    daily_df = pl.concat([daily_df, new_df.sort(by= DATE_COL)])
+    keys = new_df.select(cf.qtr_key(pl.col(DATE_COL)).unique())\
+                 .to_series()\
+                 .sort()\
+                 .to_list()
+
+    # only the quarters of the new observations, from all
+    # of their observations
+    upd_df = eoq_frame(daily_df.filter(cf.qtr_key(pl.col(DATE_COL))
+                                         .is_in(keys)),
+                       yr_qtr_name)
+    if qtr_df is None:
+        return daily_df, upd_df, keys
+    qtr_df = pl.concat([qtr_df.filter(~pl.col(yr_qtr_name).is_in(keys)),
+                        upd_df])\
+               .sort(by= yr_qtr_name)
+    return daily_df, qtr_df, keys
+
+
+def write_store(daily_df, qtr_df, daily_addr, qtr_addr):
+    '''
+        write the observations and the quarters of the store
+    '''
+
+    for df, file_addr in [(daily_df, daily_addr), (qtr_df, qtr_addr)]:
+        file_addr.parent.mkdir(parents= True, exist_ok= True)
+        hp.replace_atomically(file_addr, df.write_parquet)
+
+
+def rate_curve(qtr_df, maturities, curve_maturities,
+               yr_qtr_name, col_prefix= 'real_rate_'):
+    '''
+        the rates of each quarter of qtr_df at curve_maturities,
+        linear in maturity between the maturities quoted in the
+        quarter, flat beyond the shortest and the longest
+        maturities: dict, col of qtr_df -> its maturity, years;
+            cols with maturity None are not in the curve
+        curve_maturities: list of maturities, years
+        return df, cols yr_qtr_name and, for each maturity n,
+            f'{col_prefix}{n}y', pl.Float32
+    '''
+
+    quoted = sorted((maturity, col)
+                    for col, maturity in maturities.items()
+                    if maturity is not None and col in qtr_df.columns)
+    mats = np.array([maturity for maturity, _ in quoted], dtype= float)
+    targets = np.array(curve_maturities, dtype= float)
+
+    # rows: quarters, cols: the quoted maturities; nan if missing
+    rates = qtr_df.select([pl.col(col).cast(pl.Float64)
+                           for _, col in quoted])\
+                  .fill_null(np.nan)\
+                  .to_numpy()
+    valid = ~np.isnan(rates)
+
+    # for each quarter and target: the nearest quoted maturities
+    # at or below, lo, and at or above, hi
+    below = valid[:, None, :] & (mats <= targets[:, None])
+    above = valid[:, None, :] & (mats >= targets[:, None])
+    lo = np.where(below, mats, -np.inf).argmax(axis= 2)
+    hi = np.where(above, mats, np.inf).argmin(axis= 2)
+    # flat beyond the quoted maturities
+    lo = np.where(below.any(axis= 2), lo, hi)
+    hi = np.where(above.any(axis= 2), hi, lo)
+
+    lo_rates = np.take_along_axis(rates, lo, axis= 1)
+    hi_rates = np.take_along_axis(rates, hi, axis= 1)
+    span = mats[hi] - mats[lo]
+    weight = np.divide(targets - mats[lo], span,
+                       out= np.zeros(span.shape),
+                       where= span > 0)
+    curve = lo_rates + weight * (hi_rates - lo_rates)
+
+    return pl.DataFrame(
+        [qtr_df[yr_qtr_name],
+         *[pl.Series(f'{col_prefix}{maturity:g}y', curve[:, idx],
+                     nan_to_null= True)
+             .cast(pl.Float32)
+           for idx, maturity in enumerate(targets)]])
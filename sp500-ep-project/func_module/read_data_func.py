@@ -7,13 +7,59 @@
 '''
 
 import sys
+import multiprocessing
+import zipfile
+from bisect import bisect_right
+from collections import deque
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from xml.etree.ElementTree import ParseError
 
 from openpyxl import load_workbook
 import openpyxl.utils.cell
 import polars as pl
 import polars.selectors as cs
 
+import func_module.cache_func as ch
+import func_module.calendar_func as cf
 import func_module.helper_func as hp
+import func_module.profile_func as pr
+import func_module.rate_store_func as rs
+import func_module.xlsx_func as xf
+
+# readers of .xlsx workbooks
+#   'fast': xf.XlsxWorkbook, streams only the sheets and cols read
+#   'openpyxl': load_workbook(read_only= True, data_only= True)
+XLSX_BACKENDS = ['fast', 'openpyxl']
+
+
+def open_workbook(file_addr, backend= 'fast'):
+    '''
+        open an excel workbook to read its values
+        if the fast backend cannot read the workbook,
+        fall back to openpyxl
+        return workbook
+    '''
+    
+    if backend == 'fast':
+        try:
+            return xf.XlsxWorkbook(file_addr)
+        except (zipfile.BadZipFile, KeyError, ParseError) as err:
+            print('\n============================================')
+            print(f'Fast reader could not open: \n{file_addr}')
+            print(f'{type(err).__name__}: {err}')
+            print('Reading the workbook with openpyxl')
+            print('============================================\n')
+    
+    elif backend != 'openpyxl':
+        print('\n============================================')
+        print(f'{backend} is not one of {XLSX_BACKENDS}')
+        print('============================================\n')
+        sys.exit()
+    
+    return load_workbook(filename= file_addr,
+                         read_only= True,
+                         data_only= True)
 
 def read_sp_date(wksht,
                  date_keys, value_col_1, 
@@ -24,6 +70,7 @@ def read_sp_date(wksht,
         fetch dates and prices that have occurred after
         the last reported set of financial data if
         include_prices= True
+        wksht is a worksheet or its hp.SheetIndex
         return date in name_date
         (optional) return df with recent dates and prices
     '''
@@ -34,6 +81,8 @@ def read_sp_date(wksht,
         print('============================================\n')
         sys.exit()
     
+    wksht = hp.sheet_index(wksht)
+    
     # fetch row for latest date and price
     key_row = hp.find_key_row(wksht, 'A', 1, date_keys)
 
@@ -44,7 +93,7 @@ def read_sp_date(wksht,
         sys.exit()
         
     name_date = hp.dt_str_to_date(
-                    wksht[f'{value_col_1}{key_row}'].value)
+                    hp.cell_value(wksht, value_col_1, key_row))
     
     # return without prices if include_prices is False
     if not include_prices:
@@ -55,7 +104,7 @@ def read_sp_date(wksht,
     
     date_lst.append(name_date)
     name_date = name_date.date()  # value to return should be date()
-    price_lst.append(wksht[f'{value_col_1}{key_row + 1}'].value)
+    price_lst.append(hp.cell_value(wksht, value_col_1, key_row + 1))
     
     # fetch next date and price
     key_row = hp.find_key_row(wksht, 'A', key_row, date_key_2)
@@ -67,15 +116,25 @@ def read_sp_date(wksht,
         sys.exit()
     
     date_lst.append(hp.dt_str_to_date(
-        wksht[f'A{key_row - 2}'].value))
-    price_lst.append(wksht[f'{value_col_2}{key_row -2}'].value)
+        hp.cell_value(wksht, 'A', key_row - 2)))
+    price_lst.append(hp.cell_value(wksht, value_col_2, key_row - 2))
+    
+    df = sp_date_frame(date_lst, price_lst, column_names)
+    return [name_date, df]
+
+
+def sp_date_frame(date_lst, price_lst, column_names):
+    '''
+        build the df of recent dates and prices
+        return df
+    '''
     
     df = pl.DataFrame({
                 column_names[0]: date_lst,
                 column_names[1]: price_lst},
                 schema= {column_names[0]: pl.Date, 
                             column_names[1]: pl.Float32})
-    return [name_date, df]
+    return df
 
 
 def data_block_reader(wksht, start_row, stop_row,
@@ -84,8 +143,13 @@ def data_block_reader(wksht, start_row, stop_row,
     """
     This function returns the block of data in a worksheet
     as a list of lists
+    for a SheetIndex, the block comes from its record of the rows
     """
     
+    if isinstance(wksht, hp.SheetIndex):
+        return wksht.block(start_row, stop_row,
+                           first_col, last_col, skip_col)
+    
     # read a list of lists (rows)
     rng = wksht[f'{first_col}{start_row}:{last_col}{stop_row}']
     data = [[col_cell.value 
@@ -102,9 +166,12 @@ def sp_loader(wksht,
     '''
         read data from s&p excel workbook sheet
         that contains history for prices and earnings
+        wksht is a worksheet or its hp.SheetIndex
         return df
     '''
     
+    wksht = hp.sheet_index(wksht)
+    
     # fetch historical earnings data from wksht
     # fix the block of rows and cols that contain the data
     key_row = hp.find_key_row(wksht, 'A', 1, act_key)
@@ -117,6 +184,15 @@ def sp_loader(wksht,
     # fetch the data from the block
     data = data_block_reader(wksht, start_row, stop_row,
                              first_col, last_col, skip_col)
+    return sp_frame(data, column_names)
+
+
+def sp_frame(data, column_names):
+    '''
+        build the df from the rows of data read by sp_loader
+        return df
+    '''
+    
     # iterate over rows to convert all dates to datetime.date
     # row[0]: datetime or str, '%m/%d/%Y' is first 'word' in str
     for row in data:
@@ -135,9 +211,12 @@ def margin_loader(wksht, row_key, first_col, stop_col_key,
     '''
         read data from s&p excel worksheet
         that contains history for margins
+        wksht is a worksheet or its hp.SheetIndex
         return df
     '''
     
+    wksht = hp.sheet_index(wksht)
+    
     # find the rows with dates and data
     # start row contains dates
     start_row = hp.find_key_row(wksht, 'A', 1, row_key)
@@ -157,6 +236,15 @@ def margin_loader(wksht, row_key, first_col, stop_col_key,
         
     data =  data_block_reader(wksht, start_row, stop_row_data,
                               first_col, stop_col, [])
+    return margin_frame(data, yr_qtr_name)
+
+
+def margin_frame(data, yr_qtr_name):
+    '''
+        build the "tall" df of margins from the rows read by
+        margin_loader, the first row contains the years
+        return df
+    '''
      
     # data_values omits the first row (col headers) from data
     data_values = [row for row in data[1:]]
@@ -167,19 +255,14 @@ def margin_loader(wksht, row_key, first_col, stop_col_key,
     # build "tall" 2-col DF with 'year_qtr' and 'margin'
     df = pl.DataFrame(data_values, schema= col_names,
                       orient= 'row')\
-                .with_columns(pl.col('QTR')
-                              .map_elements(lambda x: x.split(' ')[0],
-                                            return_dtype= str))\
                 .cast({cs.float(): pl.Float32})\
                 .unpivot(index= 'QTR', variable_name='year')
             # index: names of cols to remain cols
             # variable_name: name of col to contain names of cols pivoted
     
     df = df.with_columns(
-                pl.struct(['QTR', 'year'])\
-                    .map_elements(lambda x: 
-                                  f"{x['year']}-{x['QTR']}",
-                                  return_dtype= pl.String)\
+                cf.margin_qtr_key(pl.col('year'),
+                                  pl.col('QTR'))\
                     .alias(yr_qtr_name))\
             .drop(['year', 'QTR'])\
             .rename({'value': 'op_margin'})
@@ -193,9 +276,12 @@ def industry_loader(wksht, row_key,
     '''
         read data from s&p excel worksheet
         that contains history for industry data
+        wksht is a worksheet or its hp.SheetIndex
         return df
     '''
     
+    wksht = hp.sheet_index(wksht)
+    
     # find the rows with dates and data
     # start row contains dates
     start_row = hp.find_key_row(wksht, 'A', 1, row_key)
@@ -217,20 +303,33 @@ def industry_loader(wksht, row_key,
     dates_raw = data_block_reader(wksht, start_row, start_row,
                               first_col, stop_col, [])
     
-    # fetch 1st row to build the dates for the data
-    # first 4 char in str are year; last char is qtr #
-    dates = (f'{item[:4]}-Q{item[-1:]}'
-             for item in dates_raw)
-    
     # fetch the data
     # list of lists for each row
     data = data_block_reader(wksht, start_row_data, stop_row_data,
                               first_col, stop_col, [])
-    # remove rows without data
+    return industry_frame(dates_raw, data, num_inds, yr_qtr_name)
+
+
+def industry_frame(dates_raw, data, num_inds, yr_qtr_name):
+    '''
+        build the df of industry data from the rows read by
+        industry_loader
+        return df
+    '''
+    
+    # fetch 1st row to build the dates for the data
+    # dates follow the name and price cols, 'yyyy Qq'
+    # first 4 char in str are year; last char is qtr #
+    dates = cf.labels_to_keys([f'{str(item)[:4]}-Q{str(item)[-1:]}'
+                               for item in dates_raw[0][2:]])
+    
+    # remove rows without data: blanks and section titles,
+    # such as 'As Reported Earnings Per Share by Economic Sector'
     data = [row 
             for row in data
-            if row[0] not in 
-              ['', 'As Reported Earnings Per Share by Economic Sector']]
+            if isinstance(row[0], str) and
+               any(isinstance(value, (int, float))
+                   for value in row[2:])][:2 * num_inds]
     
     # data values appear in 3rd through last cols of data
     data_values = [row[2:] for row in data]
@@ -252,7 +351,7 @@ def industry_loader(wksht, row_key,
                       schema= col_names,
                       orient= 'col')\
             .cast({cs.float(): pl.Float32})\
-            .with_columns(pl.Series(dates)
+            .with_columns(pl.Series(dates, dtype= cf.QTR_KEY_DTYPE)
                       .alias(yr_qtr_name))
             
     return df
@@ -263,22 +362,593 @@ def fred_reader(wksht, first_row, col_1, col_2,
     '''
         read data from FRED excel worksheet
         that contains history for real interest rates
-        return df
+        wksht is a worksheet or its hp.SheetIndex
+        return df of the last rate in each quarter
     '''
 
+    daily_df = fred_daily_reader(wksht, first_row, col_1, col_2,
+                                 rr_col_name)
+    return rs.eoq_frame(daily_df, yr_qtr_name)
+
+
+def fred_daily_reader(wksht, first_row, col_1, col_2,
+                      rr_col_name, after= None):
+    '''
+        read the observations from FRED excel worksheet,
+        only those dated after the date after, if given
+        wksht is a worksheet or its hp.SheetIndex
+        return df, cols date, pl.Date, and rr_col_name, pl.Float32
+    '''
+
+    wksht = hp.sheet_index(wksht)
+    
+    start_row = first_row
     last_row = wksht.max_row
-    data = data_block_reader(wksht, first_row, last_row,
+    if after is not None:
+        # the dates in col A ascend; any rows below them sort last
+        after = datetime(after.year, after.month, after.day)
+        start_row = bisect_right(
+            wksht.rows, after, lo= first_row, hi= last_row + 1,
+            key= lambda row: row[0] if isinstance(row[0], datetime)
+                             else datetime.max)
+    data = data_block_reader(wksht, start_row, last_row,
                              col_1, col_2, [])
     
     df = pl.DataFrame(data, schema=['date', rr_col_name],
                       orient='row')\
-           .with_columns(pl.col('date')
-                        .map_batches(hp.date_to_year_qtr)
-                        .alias(yr_qtr_name))\
-           .group_by(yr_qtr_name)\
-           .agg([pl.all().sort_by('date').last()])\
-           .sort(by= yr_qtr_name)\
-           .drop('date')\
-           .cast({cs.datetime(): pl.Date,
-                  cs.float(): pl.Float32})
-    return df
\ No newline at end of file
+           .cast({'date': pl.Date,
+                  rr_col_name: pl.Float32})
+    return df
+
+
+def fred_csv_reader(file_addr, rr_col_name, after= None):
+    '''
+        read the observations from a FRED .csv download:
+        a header row, then date, yyyy-mm-dd, and value;
+        '.' or a blank for a missing value
+        only those dated after the date after, if given
+        return df, as fred_daily_reader
+    '''
+
+    lf = pl.scan_csv(file_addr,
+                     infer_schema= False,
+                     null_values= ['.', ''])\
+           .select(pl.nth(0).str.to_date('%Y-%m-%d').alias('date'),
+                   pl.nth(1).cast(pl.Float32).alias(rr_col_name))
+    if after is not None:
+        lf = lf.filter(pl.col('date') > after)
+    return lf.collect()
+
+
+def fred_series_reader(wksht, header_keys, series, after= None):
+    '''
+        read the observations of several series from FRED excel
+        worksheet, one col each, below the header row: the row
+        with one of header_keys in col A and the series ids
+        only those dated after the date after, if given
+        wksht is a worksheet or its hp.SheetIndex
+        return df, cols date, pl.Date, and each of series,
+            pl.Float32, null for a series not in the worksheet
+    '''
+
+    wksht = hp.sheet_index(wksht)
+    
+    header_row = wksht.find_key_row(1, header_keys)
+    if header_row == 0:
+        return pl.DataFrame(schema= {'date': pl.Date,
+                                     **{name: pl.Float32
+                                        for name in series}})
+    header = wksht.rows[header_row]
+    
+    start_row = header_row + 1
+    if after is not None:
+        # the dates in col A ascend; any rows below them sort last
+        after = datetime(after.year, after.month, after.day)
+        start_row = bisect_right(
+            wksht.rows, after, lo= start_row, hi= wksht.max_row + 1,
+            key= lambda row: row[0] if isinstance(row[0], datetime)
+                             else datetime.max)
+    rows = [row for row in wksht.rows[start_row:]
+            if len(row) > 0 and isinstance(row[0], datetime)]
+    
+    # one pass over the rows: the values of each series' col
+    cols = {name: header.index(name) for name in series
+            if name in header}
+    df = pl.DataFrame({'date': [row[0] for row in rows],
+                       **{name: [row[idx] if idx < len(row) else None
+                                 for row in rows]
+                          for name, idx in cols.items()}},
+                      strict= False)
+    return df.select(pl.col('date').cast(pl.Date),
+                     *[pl.col(name).cast(pl.Float32, strict= False)
+                       if name in cols
+                       else pl.lit(None, dtype= pl.Float32).alias(name)
+                       for name in series])
+
+
+def fred_series_csv_reader(file_addr, series, after= None):
+    '''
+        read the observations of several series from a FRED .csv
+        download: a header row, date and the series ids, then
+        date, yyyy-mm-dd, and values; '.' or a blank if missing
+        only those dated after the date after, if given
+        return df, as fred_series_reader
+    '''
+
+    lf = pl.scan_csv(file_addr,
+                     infer_schema= False,
+                     null_values= ['.', ''])
+    names = lf.collect_schema().names()
+    lf = lf.select(pl.nth(0).str.to_date('%Y-%m-%d').alias('date'),
+                   *[pl.col(name).cast(pl.Float32)
+                     if name in names
+                     else pl.lit(None, dtype= pl.Float32).alias(name)
+                     for name in series])
+    if after is not None:
+        lf = lf.filter(pl.col('date') > after)
+    return lf.collect()
+
+
+# +++++  extraction plans  ++++++++++++++++++++++++++++++++++++++++++++
+# the loaders' param dicts for the blocks of one worksheet compile to
+# a plan: a list of block dicts
+# read_blocks reads all blocks of a plan in one forward pass over
+# the rows of the worksheet and builds a df for each block
+
+def compile_plan(blocks):
+    '''
+        blocks: dict, name -> (kind, params)
+            kind names the loader whose params are given:
+                'sp_date', 'sp', 'margin', or 'industry'
+            params is the param dict for that loader
+        return plan, a list of block dicts
+    '''
+    
+    col_idx = openpyxl.utils.cell.column_index_from_string
+    
+    plan = []
+    for name, (kind, params) in blocks.items():
+        if kind == 'sp_date':
+            include_prices = params.get('include_prices', False)
+            block = {
+                'key': params['date_keys'],
+                'value_idx_1': col_idx(params['value_col_1']) - 1,
+                'include_prices': include_prices,
+                'key_2': params['date_key_2'],
+                'value_idx_2': (col_idx(params['value_col_2']) - 1
+                                if include_prices else 0),
+                'column_names': (params['column_names'] 
+                                 or ['date', 'price'])
+            }
+            block['max_col'] = 1 + max(block['value_idx_1'],
+                                       block['value_idx_2'])
+        elif kind == 'sp':
+            first_idx = col_idx(params['first_col']) - 1
+            last_idx = col_idx(params['last_col']) - 1
+            block = {
+                'key': params['act_key'],
+                'col_idxs': [idx 
+                             for idx in range(first_idx, last_idx + 1)
+                             if (idx - first_idx) 
+                                 not in params['skip_col']],
+                'column_names': params['column_names']
+            }
+            block['max_col'] = 1 + last_idx
+        elif kind in ['margin', 'industry']:
+            block = {
+                'key': params['row_key'],
+                'first_col': col_idx(params['first_col']),
+                'stop_col_key': params['stop_col_key'],
+                'first_row_offset': 
+                    params.get('start_row_data_offset', 1),
+                'last_row_offset': params['stop_row_data_offset'],
+                'num_inds': params.get('num_inds'),
+                'yr_qtr_name': params['yr_qtr_name'],
+                # the last col is found in the key row
+                'max_col': None
+            }
+        else:
+            print('\n============================================')
+            print(f'In compile_plan(), block {name}:')
+            print(f'{kind} is not a kind of block')
+            print('============================================\n')
+            sys.exit()
+        
+        if not isinstance(block['key'], list):
+            print('\n============================================')
+            print(f'In compile_plan(), block {name}:')
+            print(f'key {block['key']} is not a list of strings')
+            print('============================================\n')
+            sys.exit()
+            
+        block['name'] = name
+        block['kind'] = kind
+        plan.append(block)
+    return plan
+
+
+def read_blocks(wksht, plan):
+    '''
+        read every block of the plan in one pass over
+        the rows of wksht, a worksheet or its hp.SheetIndex
+        read only the cols that the blocks use
+        stop reading rows when all blocks are complete
+        return dict, block name -> df
+    '''
+    
+    # if any block's last col is unknown, read all cols
+    max_cols = [block['max_col'] for block in plan]
+    max_col = None if None in max_cols else max(max_cols)
+    
+    if isinstance(wksht, hp.SheetIndex):
+        rows = wksht.rows[1:]
+    else:
+        rows = wksht.iter_rows(max_col= max_col, values_only= True)
+    
+    states = {block['name']: {'key_row': 0,
+                              'rows': [],
+                              'done': False}
+              for block in plan}
+    
+    # the two rows that precede the current row
+    prev_rows = deque([(), ()], maxlen= 2)
+    
+    open_blocks = plan
+    with pr.stage(f'scan rows {wksht.title}'):
+        for row_number, row in enumerate(rows, start= 1):
+            item = row[0] if len(row) > 0 else None
+            for block in open_blocks:
+                FEED_BLOCK[block['kind']](block, states[block['name']],
+                                          row_number, row, item,
+                                          prev_rows)
+            
+            open_blocks = [block 
+                           for block in open_blocks
+                           if not states[block['name']]['done']]
+            if len(open_blocks) == 0:
+                break
+            prev_rows.append(row)
+    
+    for block in plan:
+        if states[block['name']]['key_row'] == 0:
+            print('\n============================================')
+            print(f'Found no {block['key']} in {wksht.title}')
+            print('============================================\n')
+            sys.exit()
+    
+    blocks = dict()
+    for block in plan:
+        with pr.stage(f'build {block['name']}', kind= block['kind']):
+            blocks[block['name']] = \
+                BUILD_BLOCK[block['kind']](block, 
+                                           states[block['name']],
+                                           wksht)
+    return blocks
+
+
+def row_value(row, idx):
+    '''
+        value in row at (0-based) idx
+        None for cells to the right of the values in row
+    '''
+    
+    return row[idx] if idx < len(row) else None
+
+
+def is_key(item, keys):
+    '''
+        T if item is a str in keys, a list of str
+    '''
+    
+    return isinstance(item, str) and item in keys
+
+
+def feed_sp_date(block, state, row_number, row, item, prev_rows):
+    '''
+        collect the date of the workbook and
+        (optional) the dates and prices that follow
+        the last reported set of financial data
+    '''
+    
+    if state['key_row'] == 0:
+        if is_key(item, block['key']):
+            state['key_row'] = row_number
+            state['dates'] = [row_value(row, block['value_idx_1'])]
+            state['prices'] = []
+            state['done'] = not block['include_prices']
+        return
+    
+    if row_number == state['key_row'] + 1:
+        state['prices'].append(row_value(row, block['value_idx_1']))
+    
+    # date and price appear two rows above date_key_2
+    if is_key(item, block['key_2']):
+        state['dates'].append(row_value(prev_rows[0], 0))
+        state['prices'].append(row_value(prev_rows[0], 
+                                         block['value_idx_2']))
+        state['done'] = True
+        
+        
+def feed_sp(block, state, row_number, row, item, prev_rows):
+    '''
+        collect the rows that follow the key row,
+        up to the first row that is blank in col A
+    '''
+    
+    if state['key_row'] == 0:
+        if is_key(item, block['key']):
+            state['key_row'] = row_number
+        return
+    
+    if item is None:
+        state['done'] = True
+        return
+    
+    state['rows'].append([row_value(row, idx)
+                          for idx in block['col_idxs']])
+    
+
+def feed_offset_block(block, state, row_number, row, item, prev_rows):
+    '''
+        collect the key row, whose cells fix the last col,
+        and the rows within the block's offsets from the key row
+    '''
+    
+    if state['key_row'] == 0:
+        if is_key(item, block['key']):
+            state['key_row'] = row_number
+            # last col with data precedes the stop_col_key
+            state['last_col'] = -1 + hp.find_key_in_row(
+                                        row, 2, block['stop_col_key'])
+            state['header'] = block_values(block, state, row)
+        return
+    
+    offset = row_number - state['key_row']
+    if offset >= block['first_row_offset']:
+        state['rows'].append(block_values(block, state, row))
+    if offset >= block['last_row_offset']:
+        state['done'] = True
+        
+        
+def block_values(block, state, row):
+    '''
+        values from the block's first col through its last col
+    '''
+    
+    return [row_value(row, idx)
+            for idx in range(block['first_col'] - 1,
+                             state['last_col'])]
+
+
+def build_sp_date(block, state, wksht):
+    '''
+        df of the date of the workbook, plus
+        (optional) the recent dates and prices
+    '''
+    
+    if block['include_prices'] and not state['done']:
+        print('\n============================================')
+        print(f'Found no {block['key_2']} in {wksht.title}')
+        print('============================================\n')
+        sys.exit()
+    
+    date_lst = [hp.dt_str_to_date(item)
+                for item in state['dates']]
+    price_lst = state['prices'] if block['include_prices'] else [None]
+    return sp_date_frame(date_lst, price_lst, block['column_names'])
+
+
+def build_sp(block, state, wksht):
+    '''
+        df of the rows collected by feed_sp
+    '''
+    
+    return sp_frame(state['rows'], block['column_names'])
+
+
+def build_margin(block, state, wksht):
+    '''
+        df of the margins collected by feed_offset_block
+    '''
+    
+    return margin_frame([state['header'], *state['rows']],
+                        block['yr_qtr_name'])
+
+
+def build_industry(block, state, wksht):
+    '''
+        df of the industry data collected by feed_offset_block
+    '''
+    
+    return industry_frame([state['header']], state['rows'],
+                          block['num_inds'], block['yr_qtr_name'])
+
+
+FEED_BLOCK = {'sp_date': feed_sp_date,
+              'sp': feed_sp,
+              'margin': feed_offset_block,
+              'industry': feed_offset_block}
+
+BUILD_BLOCK = {'sp_date': build_sp_date,
+               'sp': build_sp,
+               'margin': build_margin,
+               'industry': build_industry}
+
+def read_workbook_blocks(file_addr, sheet_plans,
+                         backend= 'fast', cache_dir= None):
+    '''
+        read the blocks of each sheet's plan from one workbook
+        sheet_plans: dict, sheet name -> plan
+        if cache_dir is not None, fetch the blocks from the 
+        cache when it holds this workbook, read with these plans
+        return dict, block name -> df
+    '''
+    
+    if cache_dir is not None:
+        with pr.stage('cache load', file= file_addr.name):
+            key = ch.cache_key(file_addr, sheet_plans)
+            blocks = ch.cache_load(cache_dir, key)
+        if blocks is not None:
+            return blocks
+    
+    with pr.stage('load workbook', file= file_addr.name):
+        active_workbook = open_workbook(file_addr, backend)
+    blocks = dict()
+    for sht_name, plan in sheet_plans.items():
+        blocks |= read_blocks(active_workbook[sht_name], plan)
+    active_workbook.close()
+    
+    if cache_dir is not None:
+        with pr.stage('cache store', file= file_addr.name):
+            ch.cache_store(cache_dir, key, blocks)
+    return blocks
+
+
+def fred_file_reader(file_addr, fred_params,
+                     backend= 'fast', cache_dir= None, after= None):
+    '''
+        read the observations of the real interest rate from a
+        FRED .csv download or a FRED workbook, using
+        fred_daily_reader on its active sheet
+        only those dated after the date after, if given
+        if cache_dir is not None, fetch the df of a workbook from
+        the cache when it holds this workbook, read with these
+        params after this date
+        return df, as fred_daily_reader
+    '''
+    
+    if file_addr.suffix == '.csv':
+        with pr.stage('fred_csv_reader'):
+            return fred_csv_reader(file_addr,
+                                   fred_params['rr_col_name'],
+                                   after)
+    
+    if cache_dir is not None:
+        with pr.stage('cache load', file= file_addr.name):
+            key = ch.cache_key(file_addr, {**fred_params,
+                                           'after': after})
+            blocks = ch.cache_load(cache_dir, key)
+        if blocks is not None:
+            return blocks['real_rates']
+    
+    with pr.stage('load workbook', file= file_addr.name):
+        active_workbook = open_workbook(file_addr, backend)
+    with pr.stage('fred_daily_reader'):
+        df = fred_daily_reader(hp.SheetIndex(active_workbook.active),
+                               fred_params['first_row'],
+                               fred_params['col_1'],
+                               fred_params['col_2'],
+                               fred_params['rr_col_name'],
+                               after)
+    active_workbook.close()
+    
+    if cache_dir is not None:
+        with pr.stage('cache store', file= file_addr.name):
+            ch.cache_store(cache_dir, key, {'real_rates': df})
+    return df
+
+
+def fred_series_file_reader(file_addr, header_keys, series,
+                            backend= 'fast', after= None):
+    '''
+        read the observations of several series from a
+        FRED .csv download or a FRED workbook's active sheet
+        only those dated after the date after, if given
+        return df, as fred_series_reader
+    '''
+    
+    if file_addr.suffix == '.csv':
+        with pr.stage('fred_series_csv_reader'):
+            return fred_series_csv_reader(file_addr, series, after)
+    
+    with pr.stage('load workbook', file= file_addr.name):
+        active_workbook = open_workbook(file_addr, backend)
+    with pr.stage('fred_series_reader'):
+        df = fred_series_reader(hp.SheetIndex(active_workbook.active),
+                                header_keys, series, after)
+    active_workbook.close()
+    return df
+
+
+def proj_reader(file_addr, sht_name,
+                date_params, proj_params, yr_qtr_name,
+                backend= 'fast', cache_dir= None):
+    '''
+        read the date of the projections and the projections
+        from one s&p excel workbook
+        module-level, so that it can run in a worker process
+        return [name_date, proj_df]
+        return [None, None] if the workbook cannot be read
+    '''
+    
+    try:
+        # read the date and the projections in one pass
+        plan = compile_plan({'proj_date': ('sp_date', date_params),
+                             'proj': ('sp', proj_params)})
+        blocks = read_workbook_blocks(file_addr, {sht_name: plan},
+                                      backend, cache_dir)
+        name_date = blocks['proj_date'].item(0, 'date')
+        
+        # projections for the date
+        proj_df = blocks['proj']\
+                    .with_columns(cf.qtr_key(pl.col('date'))
+                        .alias(yr_qtr_name))
+        
+    # sys.exit() in the loaders must not end a worker process
+    except (Exception, SystemExit) as err:
+        print('\n============================================')
+        print(f'In proj_reader(), could not read: \n{file_addr}')
+        print(f'{type(err).__name__}: {err}')
+        print('============================================\n')
+        return [None, None]
+    
+    # if any date is None, the projections cannot be used
+    if (name_date is None or
+        any([item is None
+             for item in proj_df['date']])):
+        return [None, None]
+    
+    return [name_date, proj_df]
+
+
+def proj_pool_reader(file_addr_lst, workers,
+                     sht_name, date_params, proj_params,
+                     yr_qtr_name, backend= 'fast', cache_dir= None):
+    '''
+        read the projections from each s&p workbook in
+        file_addr_lst, using a pool of worker processes
+        if workers > 1, otherwise read the files in turn
+        return list of [name_date, proj_df], in the order 
+        of file_addr_lst
+    '''
+    
+    args = (sht_name, date_params, proj_params, yr_qtr_name,
+            backend, cache_dir)
+    
+    if (workers is None or
+        workers <= 1 or
+        len(file_addr_lst) <= 1):
+        results = []
+        for file_addr in file_addr_lst:
+            with pr.stage('proj_reader', file= file_addr.name):
+                results.append(proj_reader(file_addr, *args))
+        return results
+    
+    # no more workers than files
+    # 'spawn': a forked child can deadlock on polars' thread pool
+    workers = min(workers, len(file_addr_lst))
+    with ProcessPoolExecutor(
+            max_workers= workers,
+            mp_context= multiprocessing.get_context('spawn')) as pool:
+        # each worker returns its stages with its result
+        futures = [pool.submit(pr.traced_call, pr.ENABLED,
+                               'proj_reader', proj_reader,
+                               file_addr, *args)
+                   for file_addr in file_addr_lst]
+        # results in the order in which the files were submitted
+        results = []
+        for future in futures:
+            result, events = future.result()
+            pr.add_events(events)
+            results.append(result)
+        return results
@@ -0,0 +1,110 @@
+'''
+   fingerprints of the display pages that display_data.py renders
+
+   the fingerprint of a page is the sha-256 of
+        the dfs that the page plots,
+        its params, such as the date in its titles,
+        the code that draws it, and RENDER_CACHE_VERSION
+   display_data.py rewrites a page's pdf only when its
+   fingerprint differs from the one recorded when the pdf
+   was written, or when the pdf is missing
+
+   the fingerprints are recorded in a json file,
+   page's file name -> fingerprint
+
+   access these values in other modules by
+        import func_module.render_cache_func as rc
+'''
+
+import hashlib
+import io
+import json
+
+import matplotlib
+import polars as pl
+
+import func_module.cache_func as ch
+import func_module.helper_func as hp
+
+# change RENDER_CACHE_VERSION to render all pages again
+RENDER_CACHE_VERSION = 1
+
+
+def frame_digest(df):
+    '''
+        sha-256 of the schema and values of df
+        return str of hex digits
+    '''
+
+    # one chunk: the same values give the same ipc bytes
+    buffer = io.BytesIO()
+    df.rechunk().write_ipc(buffer, compression= 'uncompressed')
+    return hashlib.sha256(buffer.getvalue()).hexdigest()
+
+
+def code_digest(code_addrs):
+    '''
+        sha-256 of the files of code that draw the pages,
+        and of the versions of matplotlib and polars
+        return str of hex digits
+    '''
+
+    digest = hashlib.sha256(
+        f'{matplotlib.__version__} {pl.__version__}'.encode())
+    for code_addr in code_addrs:
+        digest.update(ch.file_digest(code_addr).encode())
+    return digest.hexdigest()
+
+
+def page_fingerprint(dfs, params, code_hash):
+    '''
+        dfs: dict, panel -> df plotted in the panel
+        params: json-serializable values that fix the page,
+            such as its titles
+        code_hash: code_digest() of the drawing code
+        return str of hex digits
+    '''
+
+    digest = hashlib.sha256(
+        json.dumps([RENDER_CACHE_VERSION, code_hash, params],
+                   sort_keys= True, default= str).encode())
+    for panel in sorted(dfs):
+        digest.update(panel.encode())
+        digest.update(frame_digest(dfs[panel]).encode())
+    return digest.hexdigest()
+
+
+def load_fingerprints(fingerprint_addr):
+    '''
+        return dict, page's file name -> fingerprint
+        empty if the file is missing or damaged
+    '''
+
+    if not fingerprint_addr.exists():
+        return dict()
+    try:
+        with fingerprint_addr.open('r') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return dict()
+
+
+def store_fingerprints(fingerprint_addr, fingerprints):
+    '''
+        write fingerprints, dict page's file name -> fingerprint
+    '''
+
+    hp.replace_atomically(
+        fingerprint_addr,
+        lambda tmp_addr: tmp_addr.write_text(
+            json.dumps(fingerprints, indent= 4, sort_keys= True)))
+
+
+def is_current(fingerprints, display_addr, fingerprint):
+    '''
+        T if the pdf at display_addr exists and was rendered
+        from data and code with this fingerprint; else F
+    '''
+
+    return (display_addr.exists() and
+            fingerprints.get(display_addr.name) == fingerprint)
@@ -0,0 +1,126 @@
+'''
+   the sector cube: the eps of the sector indexes, from the
+   SECTOR EPS sheet, in long format, one row for each
+   quarter, sector, and eps
+        yr_qtr: the qtr key
+        sector: name of the sector index, 'S&P 500 Energy'
+        eps: 'op' or 'rep', pl.Enum
+        value: pl.Float32
+
+   one .parquet file, sorted by sector, eps, and yr_qtr, about one
+   row group for each sector, with row-group statistics: a query
+   for a sector reads only its row groups
+   sector is stored as str, which parquet encodes with a
+   dictionary, as it would a pl.Categorical, and whose statistics
+   prune row groups; scan_cube returns it as pl.Categorical
+
+   update_data.py upserts the rows of the latest workbook into
+   the cube: only new or revised values change the cube
+
+   access these values in other modules by
+        import func_module.sector_func as sc
+'''
+
+import polars as pl
+
+import func_module.helper_func as hp
+
+SECTOR = 'sector'
+EPS = 'eps'
+VALUE = 'value'
+EPS_DTYPE = pl.Enum(['op', 'rep'])
+# industry_loader's col prefix of each eps
+EPS_PREFIXES = {'op_E': 'op', 'rep_E': 'rep'}
+
+
+def cube_frame(industry_df, yr_qtr_name):
+    '''
+        the rows of the cube from the wide df of industry_loader,
+        whose cols are yr_qtr_name and '<prefix> <sector>'
+        return df, sorted by sector, eps, and yr_qtr_name
+    '''
+
+    name = pl.col('col').str.splitn(' ', 2)
+    return industry_df.unpivot(index= yr_qtr_name,
+                               variable_name= 'col',
+                               value_name= VALUE)\
+                      .with_columns(
+                          name.struct.field('field_1').alias(SECTOR),
+                          name.struct.field('field_0')
+                              .replace_strict(EPS_PREFIXES)
+                              .cast(EPS_DTYPE)
+                              .alias(EPS))\
+                      .select(yr_qtr_name, SECTOR, EPS,
+                              pl.col(VALUE).cast(pl.Float32))\
+                      .sort(by= [SECTOR, EPS, yr_qtr_name])
+
+
+def upsert_cube(cube_df, new_df, yr_qtr_name):
+    '''
+        replace the rows of cube_df whose values new_df revises,
+        add the rows of new_df that cube_df does not have
+        cube_df: the cube, or None for a new cube
+        return (df sorted by sector, eps, and yr_qtr_name,
+                list of the qtr keys that changed)
+    '''
+
+    keys = [yr_qtr_name, SECTOR, EPS]
+    if cube_df is None:
+        return new_df, new_df[yr_qtr_name].unique().sort().to_list()
+
+    upd_df = new_df.join(cube_df,
+                         on= [*keys, VALUE],
+                         how= 'anti',
+                         join_nulls= True)
+    if upd_df.height == 0:
+        return cube_df, []
+
+    df = pl.concat([cube_df.join(upd_df.select(keys),
+                                 on= keys,
+                                 how= 'anti'),
+                    upd_df])\
+           .sort(by= [SECTOR, EPS, yr_qtr_name])
+    return df, upd_df[yr_qtr_name].unique().sort().to_list()
+
+
+def read_cube(cube_addr):
+    '''
+        return df of the cube, or None if there is no cube
+    '''
+
+    if not cube_addr.exists():
+        return None
+    return pl.read_parquet(cube_addr)
+
+
+def write_cube(cube_df, cube_addr):
+    '''
+        write the cube, about one row group for each sector
+    '''
+
+    n_sectors = max(cube_df[SECTOR].n_unique(), 1)
+    row_group_size = max(cube_df.height // n_sectors, 1)
+
+    cube_addr.parent.mkdir(parents= True, exist_ok= True)
+    hp.replace_atomically(
+        cube_addr,
+        lambda tmp_addr: cube_df.write_parquet(
+            tmp_addr,
+            statistics= True,
+            row_group_size= row_group_size))
+
+
+def scan_cube(cube_addr, sectors= None, eps= None):
+    '''
+        LazyFrame of the cube, with sector as pl.Categorical
+        sectors: list of the names of the sectors to read
+        eps: 'op' or 'rep'
+        None reads all sectors, both eps
+    '''
+
+    lf = pl.scan_parquet(cube_addr)
+    if sectors is not None:
+        lf = lf.filter(pl.col(SECTOR).is_in(sectors))
+    if eps is not None:
+        lf = lf.filter(pl.col(EPS) == eps)
+    return lf.with_columns(pl.col(SECTOR).cast(pl.Categorical))
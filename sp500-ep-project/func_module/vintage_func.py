@@ -0,0 +1,241 @@
+'''
+   the vintage store: every set of projections that update_data.py
+   reads, each identified by its vintage, the date of the
+   projections, 'yyyy-mm-dd'
+
+   the vintages form one chain, in order of their dates
+   successive vintages differ in only a few rows, so most vintages
+   are stored as deltas against the vintage before:
+        the rows that are new or revised, by target qtr, yr_qtr,
+        and the target qtrs that were dropped, with DELETED true
+   every SNAPSHOT_EVERY-th vintage in the chain, and any vintage
+   whose rows cannot be keyed by yr_qtr, is a full snapshot
+
+   a segment, one .parquet file, holds a snapshot and the deltas
+   that follow it, with col VINTAGE; one read of a segment
+   rebuilds any of its vintages
+        <first vintage of the segment>.<generation>.segment.parquet
+   adding a vintage rewrites only the last segment
+
+   a rewritten segment gets a new generation, a new file: the files
+   that the manifest's committed chain names are never overwritten,
+   and the files they supersede are removed only after the commit
+
+   the manifest's vintages table indexes the chain; the projections
+   dataset, estimates/, holds the latest vintage of each quarter,
+   the view that manifest.latest_vintages() derives from the index
+
+   access these values in other modules by
+        import func_module.vintage_func as vt
+'''
+
+import polars as pl
+
+import func_module.helper_func as hp
+
+KEY = 'yr_qtr'
+VINTAGE = 'vintage'
+DELETED = 'deleted'
+SNAPSHOT_EVERY = 8
+
+
+def segment_file_name(vintage, generation= 0):
+    '''
+        name of the file of the segment that
+        begins with vintage
+        generation 0 is the name of the first stores' files
+    '''
+
+    if generation == 0:
+        return f'{vintage}.segment.parquet'
+    return f'{vintage}.{generation}.segment.parquet'
+
+
+def segment_generation(file_name):
+    '''
+        the generation of the segment file, file_name
+    '''
+
+    parts = file_name.split('.')
+    return int(parts[1]) if len(parts) == 4 else 0
+
+
+def is_keyed(df):
+    '''
+        T if the rows of df have unique target qtrs,
+        most recent first: the order in which a delta
+        rebuilds them
+    '''
+
+    keys = df[KEY]
+    return (keys.null_count() == 0 and
+            keys.is_unique().all() and
+            keys.equals(keys.sort(descending= True)))
+
+
+def delta_frame(prev_df, df):
+    '''
+        the rows of df that are new or revised since prev_df,
+        plus a row for each target qtr dropped, with DELETED true
+        return df, or None if df cannot be stored as a delta
+    '''
+
+    if (prev_df is None or
+        prev_df.schema != df.schema or
+        not is_keyed(prev_df) or
+        not is_keyed(df)):
+        return None
+
+    # rows of df that differ, value for value, from prev_df's
+    changed_df = df.join(prev_df,
+                         on= df.columns,
+                         how= 'anti',
+                         join_nulls= True)
+    dropped_df = prev_df.select(KEY)\
+                        .join(df.select(KEY), on= KEY, how= 'anti')
+    return pl.concat([changed_df.with_columns(
+                          pl.lit(False).alias(DELETED)),
+                      dropped_df.with_columns(
+                          pl.lit(True).alias(DELETED))],
+                     how= 'diagonal')
+
+
+def apply_delta(prev_df, delta_df):
+    '''
+        the vintage that follows prev_df, from its delta
+        return df
+    '''
+
+    keys = delta_df[KEY]
+    upd_df = delta_df.filter(~pl.col(DELETED))\
+                     .drop(DELETED)\
+                     .select(prev_df.columns)
+    return pl.concat([prev_df.filter(~pl.col(KEY).is_in(keys)),
+                      upd_df])\
+             .sort(by= KEY, descending= True)
+
+
+def iter_vintages(vintage_dir, chain, start= 0):
+    '''
+        rebuild the vintages of the chain in order,
+        from chain[start] to the end
+        chain: list of (vintage, qtr key, file name, kind),
+            as from manifest.vintages()
+        yield (entry of the chain, df)
+    '''
+
+    if start >= len(chain):
+        return
+
+    # the snapshot at or before start
+    first = start
+    while first > 0 and chain[first][3] != 'snapshot':
+        first -= 1
+
+    df = None
+    segment_name, segment_df = None, None
+    for idx in range(first, len(chain)):
+        vintage, _, file_name, kind = chain[idx]
+        if file_name != segment_name:
+            segment_name = file_name
+            segment_df = pl.read_parquet(vintage_dir / file_name)
+        rows_df = segment_df.filter(pl.col(VINTAGE) == vintage)\
+                            .drop(VINTAGE)
+        df = rows_df.drop(DELETED) if kind == 'snapshot' \
+            else apply_delta(df, rows_df)
+        if idx >= start:
+            yield chain[idx], df
+
+
+def read_vintage(vintage_dir, chain, vintage):
+    '''
+        the projections of vintage, 'yyyy-mm-dd'
+        return df, or None if the chain has no such vintage
+    '''
+
+    vintages = [entry[0] for entry in chain]
+    if vintage not in vintages:
+        return None
+    idx = vintages.index(vintage)
+    return next(iter_vintages(vintage_dir, chain, idx))[1]
+
+
+def add_vintages(manifest, vintage_dir, new_vintages):
+    '''
+        add the new vintages to the store and to the manifest's
+        index, rewriting the segments from the one that the
+        earliest new vintage joins; a new vintage replaces a
+        stored one of the same date
+        each segment is written to a new file; remove the files
+        it supersedes, with remove_segments, after the manifest
+        is committed
+        new_vintages: list of (vintage, qtr key, df)
+        return (number of segment files written,
+                list of the names of the superseded files)
+    '''
+
+    if len(new_vintages) == 0:
+        return 0, []
+    vintage_dir.mkdir(parents= True, exist_ok= True)
+
+    chain = manifest.vintages()
+    new_dfs = {vintage: (proj_yr_qtr, df)
+               for vintage, proj_yr_qtr, df in new_vintages}
+
+    # ordinarily the new vintages follow the chain: only the
+    # last segment is rewritten; an earlier vintage rewrites
+    # the segments from the one it joins
+    first = len([entry for entry in chain
+                 if entry[0] < min(new_dfs)])
+    first = max(first - 1, 0)
+    while first > 0 and chain[first][3] != 'snapshot':
+        first -= 1
+
+    # the stored vintages from first on, rebuilt before
+    # their segments are rewritten
+    old_dfs = {entry[0]: (entry[1], df)
+               for entry, df in iter_vintages(vintage_dir, chain, first)
+               if entry[0] not in new_dfs}
+    old_files = {entry[2] for entry in chain[first:]}
+    # the generation of each segment file in the chain, by its
+    # first vintage; a new file never overwrites one it names
+    generations = {file_name.split('.')[0]: segment_generation(file_name)
+                   for file_name in {entry[2] for entry in chain}}
+
+    # rows of each segment, by file name
+    segments = dict()
+    prev_df = None
+    for idx, vintage in enumerate(sorted(old_dfs | new_dfs),
+                                  start= first):
+        proj_yr_qtr, df = new_dfs.get(vintage) or old_dfs[vintage]
+        delta_df = None if idx % SNAPSHOT_EVERY == 0 else \
+            delta_frame(prev_df, df)
+        if delta_df is None:
+            kind = 'snapshot'
+            file_name = segment_file_name(
+                vintage, generations.get(vintage, 0) + 1)
+            rows_df = df.with_columns(pl.lit(False).alias(DELETED))
+        else:
+            kind = 'delta'
+            rows_df = delta_df
+        segments.setdefault(file_name, []).append(
+            rows_df.with_columns(pl.lit(vintage).alias(VINTAGE)))
+        manifest.set_vintage(vintage, proj_yr_qtr, file_name, kind)
+        prev_df = df
+
+    for file_name, rows_dfs in segments.items():
+        segment_df = pl.concat(rows_dfs, how= 'diagonal')
+        hp.replace_atomically(vintage_dir / file_name,
+                              segment_df.write_parquet)
+
+    return len(segments), sorted(old_files - set(segments))
+
+
+def remove_segments(vintage_dir, file_names):
+    '''
+        remove the segment files that add_vintages superseded
+        call only after the manifest is committed
+    '''
+
+    for file_name in file_names:
+        (vintage_dir / file_name).unlink(missing_ok= True)
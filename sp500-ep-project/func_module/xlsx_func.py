@@ -0,0 +1,373 @@
+'''
+   a streaming reader for .xlsx workbooks, the fast path
+   for the read_data_func functions
+
+   reads the xlsx zip directly, resolves the shared strings,
+   and parses only the sheets, and the cols, that are requested,
+   one row at a time, into the values that openpyxl returns
+   when read_only= True and data_only= True
+
+   XlsxWorkbook and XlsxSheet provide the parts of openpyxl's
+   Workbook and ReadOnlyWorksheet that the loaders use:
+        wb[sheet_name], wb.active, wb.sheetnames, wb.close()
+        wksht.title, wksht.max_row, wksht.max_column,
+        wksht.iter_rows(values_only= True)
+
+   access these values in other modules by
+        import func_module.xlsx_func as xf
+'''
+
+import posixpath
+import zipfile
+from xml.etree.ElementTree import fromstring, iterparse
+
+from openpyxl.styles.numbers import (
+    builtin_format_code,
+    is_date_format,
+    is_timedelta_format
+)
+from openpyxl.utils.cell import (
+    column_index_from_string,
+    range_boundaries
+)
+from openpyxl.utils.datetime import (
+    from_excel,
+    from_ISO8601,
+    CALENDAR_MAC_1904,
+    CALENDAR_WINDOWS_1900
+)
+
+NS_MAIN = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+NS_DOC_REL = \
+    '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+NS_PKG_REL = \
+    '{http://schemas.openxmlformats.org/package/2006/relationships}'
+
+ROW_TAG = f'{NS_MAIN}row'
+CELL_TAG = f'{NS_MAIN}c'
+VALUE_TAG = f'{NS_MAIN}v'
+TEXT_TAG = f'{NS_MAIN}t'
+INLINE_TAG = f'{NS_MAIN}is'
+DIMENSION_TAG = f'{NS_MAIN}dimension'
+SHEET_DATA_TAG = f'{NS_MAIN}sheetData'
+
+
+class XlsxWorkbook:
+    '''
+        an .xlsx workbook, opened for reading values
+        the workbook's xml for sheets, relationships, and styles
+        are read when opened; the shared strings when a sheet
+        is first read; a sheet's xml only when its rows are read
+    '''
+
+    def __init__(self, file_addr):
+        self.archive = zipfile.ZipFile(file_addr)
+
+        workbook = fromstring(self.archive.read('xl/workbook.xml'))
+        rels = fromstring(
+            self.archive.read('xl/_rels/workbook.xml.rels'))
+
+        # address in the zip of each relationship's target
+        targets = {rel.get('Id'): zip_address(rel.get('Target'))
+                   for rel in rels.iter(f'{NS_PKG_REL}Relationship')}
+
+        # sheet name -> address of its xml in the zip
+        self.sheet_addrs = {
+            sheet.get('name'): targets[sheet.get(f'{NS_DOC_REL}id')]
+            for sheet in workbook.iter(f'{NS_MAIN}sheet')}
+        self.sheetnames = list(self.sheet_addrs)
+
+        view = workbook.find(f'{NS_MAIN}bookViews/{NS_MAIN}workbookView')
+        self.active_idx = int(view.get('activeTab', 0)) \
+                            if view is not None else 0
+
+        props = workbook.find(f'{NS_MAIN}workbookPr')
+        self.epoch = CALENDAR_WINDOWS_1900
+        if (props is not None and
+            props.get('date1904', 'false') in ['1', 'true']):
+            self.epoch = CALENDAR_MAC_1904
+
+        self.date_styles, self.timedelta_styles = \
+            read_date_styles(self.archive)
+        self._shared_strings = None
+
+    @property
+    def shared_strings(self):
+        '''
+            list of the workbook's shared strings, read once
+        '''
+
+        if self._shared_strings is None:
+            self._shared_strings = read_shared_strings(self.archive)
+        return self._shared_strings
+
+    @property
+    def active(self):
+        '''
+            the sheet that was active when the workbook was saved
+        '''
+
+        return self[self.sheetnames[self.active_idx]]
+
+    def __getitem__(self, sheet_name):
+        if sheet_name not in self.sheet_addrs:
+            raise KeyError(f'Worksheet {sheet_name} does not exist.')
+        return XlsxSheet(self, sheet_name, self.sheet_addrs[sheet_name])
+
+    def close(self):
+        self.archive.close()
+
+
+class XlsxSheet:
+    '''
+        a worksheet of an XlsxWorkbook
+        iter_rows() parses the sheet's xml as a stream of rows
+    '''
+
+    def __init__(self, parent, title, sheet_addr):
+        self.parent = parent
+        self.title = title
+        self.sheet_addr = sheet_addr
+        self.max_row, self.max_column = read_dimension(parent.archive,
+                                                       sheet_addr)
+
+    def __repr__(self):
+        return f'<XlsxSheet "{self.title}">'
+
+    def iter_rows(self, min_row= None, max_row= None,
+                  min_col= None, max_col= None,
+                  values_only= True):
+        '''
+            yield a tuple of values for each row,
+            from min_row to max_row, from min_col to max_col
+            rows missing from the xml are yielded as blank rows,
+            as openpyxl does when read_only= True
+        '''
+
+        if not values_only:
+            raise ValueError('XlsxSheet reads values only')
+
+        min_row = min_row or 1
+        min_col = min_col or 1
+        max_row = max_row or self.max_row
+        max_col = max_col or self.max_column
+
+        empty_row = ()
+        if max_col is not None:
+            empty_row = (None,) * (max_col + 1 - min_col)
+
+        counter = min_row
+        row_number = 1
+        for row_number, cells in self.parse_rows(min_col, max_col):
+            if max_row is not None and row_number > max_row:
+                break
+            if row_number < min_row:
+                continue
+
+            # some rows are missing
+            while counter < row_number:
+                counter += 1
+                yield empty_row
+
+            counter += 1
+            yield row_tuple(cells, min_col, max_col)
+
+        # missing rows before a row beyond max_row
+        if max_row is not None and max_row < row_number:
+            while counter <= max_row:
+                counter += 1
+                yield empty_row
+
+    def parse_rows(self, min_col, max_col):
+        '''
+            stream the sheet's xml, yield (row number, cells)
+            cells: list of (col number, value), min_col to max_col
+        '''
+
+        shared = self.parent.shared_strings
+        date_styles = self.parent.date_styles
+        timedelta_styles = self.parent.timedelta_styles
+        epoch = self.parent.epoch
+        col_numbers = dict()
+
+        row_counter = 0
+        with self.parent.archive.open(self.sheet_addr) as src:
+            for _, elem in iterparse(src, events= ('end',)):
+                if elem.tag != ROW_TAG:
+                    continue
+
+                row_attr = elem.get('r')
+                row_counter = int(row_attr) if row_attr \
+                                  else row_counter + 1
+
+                cells = []
+                col_counter = 0
+                for cell in elem.iter(CELL_TAG):
+                    ref = cell.get('r')
+                    if ref:
+                        col_ltr = ref.rstrip('0123456789')
+                        col_numb = col_numbers.get(col_ltr)
+                        if col_numb is None:
+                            col_numb = column_index_from_string(col_ltr)
+                            col_numbers[col_ltr] = col_numb
+                    else:
+                        col_numb = col_counter + 1
+                    col_counter = col_numb
+
+                    if (col_numb < min_col or
+                        (max_col is not None and col_numb > max_col)):
+                        continue
+                    cells.append((col_numb,
+                                  cell_value(cell, shared, date_styles,
+                                             timedelta_styles, epoch)))
+
+                # discard the parsed cells
+                elem.clear()
+                yield row_counter, cells
+
+
+def zip_address(target):
+    '''
+        address in the zip of a target in xl/_rels/workbook.xml.rels
+    '''
+
+    if target.startswith('/'):
+        return target[1:]
+    return posixpath.normpath(posixpath.join('xl', target))
+
+
+def read_shared_strings(archive):
+    '''
+        list of the shared strings in the workbook
+        rich text is read as its plain text
+    '''
+
+    if 'xl/sharedStrings.xml' not in archive.namelist():
+        return []
+
+    strings = []
+    with archive.open('xl/sharedStrings.xml') as src:
+        for _, elem in iterparse(src):
+            if elem.tag == f'{NS_MAIN}si':
+                strings.append(item_text(elem))
+                elem.clear()
+    return strings
+
+
+def item_text(elem):
+    '''
+        text of a shared or inline string,
+        omitting phonetic runs
+    '''
+
+    text = elem.findtext(TEXT_TAG)
+    if text is not None:
+        return text
+    return ''.join(run.findtext(TEXT_TAG) or ''
+                   for run in elem.iter(f'{NS_MAIN}r'))
+
+
+def read_date_styles(archive):
+    '''
+        sets of the indexes of the cell styles that format
+        numbers as dates and as timedeltas
+    '''
+
+    if 'xl/styles.xml' not in archive.namelist():
+        return set(), set()
+
+    styles = fromstring(archive.read('xl/styles.xml'))
+    custom = {int(fmt.get('numFmtId')): fmt.get('formatCode')
+              for fmt in styles.iter(f'{NS_MAIN}numFmt')}
+
+    date_styles = set()
+    timedelta_styles = set()
+    cell_xfs = styles.find(f'{NS_MAIN}cellXfs')
+    if cell_xfs is None:
+        return date_styles, timedelta_styles
+
+    for idx, xf in enumerate(cell_xfs.iter(f'{NS_MAIN}xf')):
+        fmt_id = int(xf.get('numFmtId', 0))
+        fmt = custom.get(fmt_id) or builtin_format_code(fmt_id)
+        if fmt is None:
+            continue
+        if is_date_format(fmt):
+            date_styles.add(idx)
+        if is_timedelta_format(fmt):
+            timedelta_styles.add(idx)
+    return date_styles, timedelta_styles
+
+
+def read_dimension(archive, sheet_addr):
+    '''
+        max_row and max_column from the sheet's <dimension>
+        reads only the xml that precedes <sheetData>
+        (None, None) if the sheet does not record its dimension
+    '''
+
+    with archive.open(sheet_addr) as src:
+        for event, elem in iterparse(src, events= ('start',)):
+            if elem.tag == DIMENSION_TAG:
+                ref = elem.get('ref')
+                if ':' not in ref:
+                    ref = f'{ref}:{ref}'
+                _, _, max_col, max_row = range_boundaries(ref)
+                return max_row, max_col
+            if elem.tag == SHEET_DATA_TAG:
+                break
+    return None, None
+
+
+def cell_value(cell, shared, date_styles, timedelta_styles, epoch):
+    '''
+        value of a <c> element, typed as openpyxl types it
+    '''
+
+    data_type = cell.get('t', 'n')
+
+    if data_type == 'inlineStr':
+        inline = cell.find(INLINE_TAG)
+        return item_text(inline) if inline is not None else None
+
+    value = cell.findtext(VALUE_TAG)
+    if not value:
+        return None
+
+    if data_type == 'n':
+        if '.' in value or 'E' in value or 'e' in value:
+            value = float(value)
+        else:
+            value = int(value)
+        style = int(cell.get('s', 0))
+        if style in date_styles:
+            try:
+                return from_excel(value, epoch,
+                                  timedelta= style in timedelta_styles)
+            except (OverflowError, ValueError):
+                return '#VALUE!'
+        return value
+    if data_type == 's':
+        return shared[int(value)]
+    if data_type == 'b':
+        return bool(int(value))
+    if data_type == 'd':
+        return from_ISO8601(value)
+    # 'str' (formula result), 'e' (error): the text of the value
+    return value
+
+
+def row_tuple(cells, min_col, max_col):
+    '''
+        tuple of values, min_col to max_col, None for blank cells
+        without max_col, the tuple ends at the last cell in the row
+    '''
+
+    if max_col is None:
+        if not cells:
+            return ()
+        max_col = cells[-1][0]
+
+    values = [None] * (max_col + 1 - min_col)
+    for col_numb, value in cells:
+        values[col_numb - min_col] = value
+    return tuple(values)
@@ -25,10 +25,21 @@ BASE_DIR = Path.cwd()
 RECORD_DICT_DIR = BASE_DIR
 RECORD_DICT_FILE = "record_dict.json"
 RECORD_DICT_ADDR = RECORD_DICT_DIR / RECORD_DICT_FILE
+MANIFEST_FILE = "manifest.sqlite"
+MANIFEST_ADDR = RECORD_DICT_DIR / MANIFEST_FILE
 
 INPUT_DIR = BASE_DIR / "input_dir"
 INPUT_RR_FILE = 'DFII10.xlsx'
 INPUT_RR_ADDR = INPUT_DIR / INPUT_RR_FILE
+# FRED's .csv download; read instead of DFII10.xlsx, if present
+INPUT_RR_CSV_FILE = 'DFII10.csv'
+INPUT_RR_CSV_ADDR = INPUT_DIR / INPUT_RR_CSV_FILE
+# FRED's download of several series, one col each, for the
+# real-rate curve; the .csv is read instead of the .xlsx
+INPUT_CURVE_FILE = 'fredgraph.xlsx'
+INPUT_CURVE_ADDR = INPUT_DIR / INPUT_CURVE_FILE
+INPUT_CURVE_CSV_FILE = 'fredgraph.csv'
+INPUT_CURVE_CSV_ADDR = INPUT_DIR / INPUT_CURVE_CSV_FILE
 # #INPUT_SPRICE_FILE = INPUT_DIR / 'SP500.xlsx'
 
 ARCHIVE_DIR = \
@@ -41,6 +52,7 @@ ARCHIVE_DIR = \
 # ==========================================
 #INPUT_DIR = ARCHIVE_DIR
 #INPUT_RR_ADDR = ARCHIVE_DIR / INPUT_RR_FILE
+#INPUT_RR_CSV_ADDR = ARCHIVE_DIR / INPUT_RR_CSV_FILE
 # ==========================================
 # after reinitializing, recomment these lines
 
@@ -49,19 +61,52 @@ OUTPUT_HIST_FILE = 'sp500_pe_df_actuals.parquet'
 OUTPUT_HIST_ADDR = OUTPUT_DIR / OUTPUT_HIST_FILE
 OUTPUT_HIST_FILE = OUTPUT_DIR / 'sp500_pe_df_actuals.parquet'
 OUTPUT_PROJ_DIR = OUTPUT_DIR / 'estimates'
+# the real-rate store: observations and end-of-quarter rates,
+# see rate_store_func.py
+OUTPUT_RR_DAILY_FILE = 'real_rates_daily.parquet'
+OUTPUT_RR_DAILY_ADDR = OUTPUT_DIR / OUTPUT_RR_DAILY_FILE
+OUTPUT_RR_QTR_FILE = 'real_rates_qtr.parquet'
+OUTPUT_RR_QTR_ADDR = OUTPUT_DIR / OUTPUT_RR_QTR_FILE
+# the curve store: the series of fredgraph, same layout
+OUTPUT_CURVE_DAILY_FILE = 'fred_series_daily.parquet'
+OUTPUT_CURVE_DAILY_ADDR = OUTPUT_DIR / OUTPUT_CURVE_DAILY_FILE
+OUTPUT_CURVE_QTR_FILE = 'fred_series_qtr.parquet'
+OUTPUT_CURVE_QTR_ADDR = OUTPUT_DIR / OUTPUT_CURVE_QTR_FILE
+# the eps of the sector indexes, long format, see sector_func.py
+OUTPUT_SECTOR_FILE = 'sector_eps.parquet'
+OUTPUT_SECTOR_ADDR = OUTPUT_DIR / OUTPUT_SECTOR_FILE
+# every vintage of the projections, see vintage_func.py
+OUTPUT_VINTAGE_DIR = OUTPUT_DIR / 'vintages'
+# uncompressed arrow ipc copies of the history and the projections,
+# read by memory map, see ipc_func.py
+OUTPUT_MIRROR_DIR = OUTPUT_DIR / 'mirror'
+OUTPUT_HIST_MIRROR_FILE = 'sp500_pe_df_actuals.arrow'
+OUTPUT_HIST_MIRROR_ADDR = OUTPUT_MIRROR_DIR / OUTPUT_HIST_MIRROR_FILE
+OUTPUT_PROJ_MIRROR_FILE = 'sp500_pe_df_estimates.arrow'
+OUTPUT_PROJ_MIRROR_ADDR = OUTPUT_MIRROR_DIR / OUTPUT_PROJ_MIRROR_FILE
 
 BACKUP_DIR = BASE_DIR / 'backup_dir'
 BACKUP_HIST_FILE = "backup_pe_df_actuals.parquet"
 BACKUP_HIST_ADDR = BACKUP_DIR / BACKUP_HIST_FILE
-BACKUP_RECORD_DICT =  "backup_record_dict.json"
-BACKUP_RECORD_DICT_ADDR = BACKUP_DIR / BACKUP_RECORD_DICT
+
+CACHE_DIR = BASE_DIR / 'cache_dir'
 
 DISPLAY_DIR = BASE_DIR / "display_dir"
 DISPLAY_0 = 'eps_page0.pdf'
 DISPLAY_1 = 'eps_page1.pdf'
 DISPLAY_2 = 'eps_page2.pdf'
 DISPLAY_3 = 'eps_page3.pdf'
+DISPLAY_4 = 'eps_page4.pdf'
 DISPLAY_0_ADDR = DISPLAY_DIR / DISPLAY_0
 DISPLAY_1_ADDR = DISPLAY_DIR / DISPLAY_1
 DISPLAY_2_ADDR = DISPLAY_DIR / DISPLAY_2
 DISPLAY_3_ADDR = DISPLAY_DIR / DISPLAY_3
+DISPLAY_4_ADDR = DISPLAY_DIR / DISPLAY_4
+
+# fingerprints of the pages in DISPLAY_DIR, beside DISPLAY_DIR
+DISPLAY_FINGERPRINT_FILE = 'display_fingerprints.json'
+DISPLAY_FINGERPRINT_ADDR = BASE_DIR / DISPLAY_FINGERPRINT_FILE
+
+# trace of the stages of a run, written with --profile
+PROFILE_TRACE_FILE = 'profile_trace.json'
+PROFILE_TRACE_ADDR = BASE_DIR / PROFILE_TRACE_FILE
@@ -0,0 +1,89 @@
+'''This program updates the data files and displays the data
+   in one process: update_data.py, then display_data.py.
+   The display stage receives the history and the new projections
+   from the update stage in memory. A background thread writes the
+   .parquet files, archives the input files, and commits the
+   manifest while the pages are rendered.
+
+   The addresses of documents for this project appear in this program's
+   project directory: S&P500_PE/sp500_pe/__init__.py
+'''
+
+import argparse
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import paths as sp
+import display_data as dd
+import update_data as ud
+import func_module.profile_func as pr
+
+
+def run(workers= 1, use_cache= True, incremental= True,
+        pages= None, render_workers= 1, force= False):
+    '''update the data files from new .xlsx workbooks,
+       then render the display pages from the same data
+       workers, use_cache, incremental: as for update_data_files
+       pages, force: as for display_data
+       render_workers: number of processes that render the pages
+    '''
+
+    # one thread writes the output files, in order,
+    # while the pages are rendered
+    with ThreadPoolExecutor(max_workers= 1) as writer:
+        run_data = ud.update_data_files(workers= workers,
+                                        use_cache= use_cache,
+                                        incremental= incremental,
+                                        writer= writer)
+        dd.display_data(pages= pages,
+                        workers= render_workers,
+                        force= force,
+                        run_data= run_data)
+
+        # wait for the writes; raise any error from the writer
+        with pr.stage('wait for writes'):
+            run_data['writes'].result()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description= 'update the data files, then display the data')
+    parser.add_argument('--workers', type= int, default= 1,
+                        help= 'number of processes that read workbooks')
+    parser.add_argument('--no-cache', action= 'store_true',
+                        help= 'parse every workbook; ignore the cache')
+    parser.add_argument('--rebuild', action= 'store_true',
+                        help= 'rewrite the history file from the '
+                              'latest workbook')
+    parser.add_argument('--pages', type= int, nargs= '+',
+                        choices= dd.PAGES, default= None,
+                        help= 'pages to render; default all')
+    parser.add_argument('--render-workers', type= int, default= 1,
+                        help= 'number of processes that render pages')
+    parser.add_argument('--force', action= 'store_true',
+                        help= 'render the pages even if unchanged')
+    parser.add_argument('--no-mirror', action= 'store_true',
+                        help= 'do not write the ipc mirror; remove '
+                              'any existing mirror')
+    parser.add_argument('--profile', nargs= '?', type= Path,
+                        const= sp.PROFILE_TRACE_ADDR, default= None,
+                        metavar= 'ADDR',
+                        help= 'record the time and memory of each stage '
+                              'as a Chrome trace')
+    args = parser.parse_args()
+
+    if args.no_mirror:
+        ud.WRITE_IPC_MIRROR = False
+    if args.profile is not None:
+        pr.enable()
+    try:
+        run(workers= args.workers,
+            use_cache= not args.no_cache,
+            incremental= not args.rebuild,
+            pages= args.pages,
+            render_workers= args.render_workers,
+            force= args.force)
+    finally:
+        if args.profile is not None:
+            pr.write_trace(args.profile)
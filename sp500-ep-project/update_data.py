@@ -16,16 +16,25 @@
    project directory: S&P500_PE/sp500_pe/__init__.py
 '''
 
+import argparse
 import sys
 import gc
 
 import polars as pl
 import json
-from openpyxl import load_workbook
+from pathlib import Path
 
 import paths as sp
+import func_module.calendar_func as cf
+import func_module.dataset_func as ds
 import func_module.helper_func as hp
+import func_module.ipc_func as ic
+import func_module.manifest_func as mf
+import func_module.profile_func as pr
+import func_module.rate_store_func as rs
 import func_module.read_data_func as rd
+import func_module.sector_func as sc
+import func_module.vintage_func as vt
 
 #######################  Parameters  ##################################
 
@@ -39,6 +48,14 @@ YR_QTR_NAME = 'yr_qtr'
 PREFIX_OUTPUT_FILE_NAME = 'sp-500-eps-est'
 EXT_OUTPUT_FILE_NAME = '.parquet'
 
+# reader for .xlsx workbooks: 'fast' or 'openpyxl'
+# openpyxl reads any workbook that the fast reader cannot open
+XLSX_BACKEND = 'fast'
+
+# write the ipc mirror of the history and the projections,
+# see ipc_func.py; readers map it into memory
+WRITE_IPC_MIRROR = True
+
 SHT_EST_NAME = "ESTIMATES&PEs"
 COLUMN_NAMES = ['date', 'price', 'op_eps', 'rep_eps',
                 'op_p/e', 'rep_p/e', '12m_op_eps', '12m_rep_eps']
@@ -98,6 +115,23 @@ SHT_QTR_PARAMS = {
     'column_names' : COLUMN_NAMES_QTR
 }
 
+# blocks read in one pass over the "ESTIMATES&PEs" sheet
+SHT_EST_PLAN = rd.compile_plan({
+    'dates': ('sp_date', {**SHT_EST_DATE_PARAMS,
+                          'include_prices': True}),
+    'actuals': ('sp', SHT_HIST_PARAMS),
+    'margins': ('margin', SHT_BC_MARG_PARAMS)
+})
+
+SHT_QTR_PLAN = rd.compile_plan({
+    'quarterly': ('sp', SHT_QTR_PARAMS)
+})
+
+# the eps of the sector indexes, for the sector cube
+SHT_IND_PLAN = rd.compile_plan({
+    'sectors': ('industry', SHT_BC_IND_PARAMS)
+})
+
 SHT_EST_PROJ_DATE_PARAMS = {
     'date_keys' : ['Date', 'Data as of the close of:'],
     'value_col_1' : 'D', 
@@ -123,58 +157,65 @@ SHT_FRED_PARAMS = {
     'rr_col_name': RR_COL_NAME
 }
 
+# FRED's downloads of several series: the header row, in col A
+FRED_HEADER_KEYS = ['observation_date', 'DATE']
+# the series of fredgraph, and the maturity, years, of each real
+# rate; DGS10, nominal, is stored but not in the curve
+CURVE_SERIES = {'DFII5': 5,
+                'DFII10': 10,
+                'DFII20': 20,
+                'DFII30': 30,
+                'DGS10': None}
+# maturities, years, of the curve joined to the history,
+# cols real_rate_5y ... real_rate_30y
+CURVE_MATURITIES = [5, 7, 10, 20, 30]
+
 
 #######################  MAIN Function  ###############################
 
-def update_data_files():
+@pr.stage('update_data_files')
+def update_data_files(workers= 1, use_cache= True, incremental= True,
+                      writer= None):
     '''create or update earnings, p/e, and margin data
        from 'sp-500-eps-est ...' files
+       workers: number of processes that read the projections
+       use_cache: fetch the dfs parsed from unchanged workbooks
+                  from sp.CACHE_DIR
+       incremental: upsert new and revised quarters into the
+                    existing history file, rather than rewrite it
+       writer: an executor, such as ThreadPoolExecutor(1); if given,
+               write_output_files runs in writer, and this function
+               returns without waiting for the files to be written
+       return run_data, dict of the data written:
+            'actual_df': the history
+            'sector_df': the sector cube
+            'proj_dfs': dict, qtr key -> the new projections
+            'latest_used_file', 'proj_yr_qtrs', 'proj_files':
+                as recorded in the manifest
+            'writes': the Future of write_output_files, or None
     '''
     
+    cache_dir = sp.CACHE_DIR if use_cache else None
+    
 
 # ++++++  PRELIMINARIES +++++++++++++++++++++++++++++++++++++++++++++++
-# load file containing record_dict: record of files seen previously
-#   if record_dict does not exist, create an empty dict to initialize
-    if sp.RECORD_DICT_ADDR.exists():
-        with sp.RECORD_DICT_ADDR.open('r') as f:
-            record_dict = json.load(f)
-        print('\n============================================')
-        print(f'Read record_dict from: \n{sp.RECORD_DICT_ADDR}')
-        print('============================================\n')
-        
-        # backup record_dict
-        with sp.BACKUP_RECORD_DICT_ADDR.open('w') as f:
-            json.dump(record_dict, f)
-        print('============================================')
-        print(f'Wrote record_dict to: \n{sp.BACKUP_RECORD_DICT_ADDR}')
-        print('============================================\n')
-        
-    else:
-        print('\n============================================')
-        print(f'No record dict file found at: \n{sp.RECORD_DICT_ADDR}')
-        print(f'Initialized record_dict with no entries')
-        print('============================================\n')
-        record_dict = {'sources': {'s&p': '',
-                                   'tips': ''},
-                       'latest_used_file': "",
-                       'proj_yr_qtrs' : [],
-                       'prev_used_files': [],
-                       'output_proj_files': [],
-                       'prev_files': []}
+# open the manifest: record of files seen previously
+#   a new manifest imports an existing record_dict.json
+#   updates below are kept only if the run reaches manifest.commit()
+    manifest = mf.open_manifest(sp.MANIFEST_ADDR, sp.RECORD_DICT_ADDR)
+    print('\n============================================')
+    print(f'Opened manifest: \n{sp.MANIFEST_ADDR}')
+    print('============================================\n')
     
     # ensure that recorded sources are current
-    record_dict['sources']['s&p'] = sp.SP_SOURCE
-    record_dict['sources']['tips'] = sp.REAL_RATE_SOURCE
+    manifest.set_meta('s&p', sp.SP_SOURCE)
+    manifest.set_meta('tips', sp.REAL_RATE_SOURCE)
         
 # create list of earnings input files not previously seen
-# and add them to 'prev_files'
-    prev_files_set = set(record_dict['prev_files'])
-    
-    new_files_set = \
-        set(str(f.name) 
-            for f in sp.INPUT_DIR.glob('sp-500-eps*.xlsx'))
-    
-    new_files_set = new_files_set - prev_files_set
+# and add them to input_files
+    new_files_set = manifest.new_input_files(
+        str(f.name) 
+        for f in sp.INPUT_DIR.glob('sp-500-eps*.xlsx'))
     
     # if no new data, print alert and exit
     if len(new_files_set) == 0:
@@ -185,19 +226,15 @@ def update_data_files():
         sys.exit()
         
 # there is new data, add new files to historical record
-    record_dict['prev_files'] \
-        .extend(list(new_files_set)) \
-        .sort(reverse= True)
+    manifest.add_input_files(new_files_set)
 
 # find the latest new file for each quarter (agg(sort).last)
     data_df = pl.DataFrame(list(new_files_set), 
                           schema= ["new_files"],
                           orient= 'row')\
-                .with_columns(pl.col('new_files')
-                            .map_batches(hp.string_to_date)
+                .with_columns(cf.file_date(pl.col('new_files'))
                             .alias('date'))\
-                .with_columns(pl.col('date')
-                            .map_batches(hp.date_to_year_qtr)
+                .with_columns(cf.qtr_key(pl.col('date'))
                             .alias('yr_qtr'))\
                 .group_by('yr_qtr')\
                 .agg([pl.all().sort_by('date').last()])\
@@ -207,124 +244,146 @@ def update_data_files():
     del new_files_set
     gc.collect()
 
-# combine with prev_files where new_files has larger date for year_qtr
-# (new files can update and replace prev files for same year_qtr)
+# combine with used files where new_files has larger date for year_qtr
+# (new files can update and replace used files for same year_qtr)
 # new_files has only one file per quarter -- no need for group_by
-    prev_used = record_dict['prev_used_files']
-    if len(prev_used) > 0:
-        used_df = pl.DataFrame(prev_used, 
-                               schema= ['used_files'],
-                               orient= 'row')\
-                .with_columns(pl.col('used_files')
-                            .map_batches(hp.string_to_date)
-                            .alias('date'))\
-                .with_columns(pl.col('date')
-                            .map_batches(hp.date_to_year_qtr)
-                            .alias('yr_qtr'))
-                
-    # update used_files, a join with new files
-        # 1st filter removes yr_qtr rows that have no dates in data_df
-        # 2nd filter keeps only the rows with new data
-    # after renaming, ensures that 'date' ref only files with new data
-    # and proj_to_delete ref only files that are null or are superceded
-        used_df = used_df.join(data_df,
-                               on= 'yr_qtr',
-                               how= 'full',
-                               coalesce= True)\
-                         .filter(pl.col('date_right').is_not_null())\
-                         .filter(((pl.col('date').is_null()) | 
-                                  (pl.col('date') <
-                                   pl.col('date_right'))))\
-                         .rename({'used_files' : 'proj_to_delete'})\
-                         .drop(['date'])\
-                         .rename({'date_right': 'date'})\
-                         .sort(by= 'yr_qtr')
-                         
-        # remove old files from record_dict lists
-        #   prev_used_files (.xlsx) & output_proj_files (.parquet)
-        # remove the output .parquet file from output_proj_dir
-        files_to_remove_list = \
-            pl.Series(used_df.select(pl.col('proj_to_delete'))\
-                             .filter(pl.col('proj_to_delete')
-                                    .is_not_null()))\
-                            .to_list()
-                            
-        for file in files_to_remove_list:
-            record_dict['prev_used_files'].remove(file)
-            file_list = file.split(" ", 1)
-            proj_file = \
-                f'{file_list[0]} {file_list[1]
-                                    .replace(' ', '-')
-                                    .replace('.xlsx', '.parquet')}'
-            record_dict['output_proj_files'].remove(proj_file)
-            # using Path() object
-            address_proj_file = sp.OUTPUT_PROJ_DIR / proj_file
-            if address_proj_file.exists():
-                address_proj_file.unlink()
-                print('\n============================================')
-                print(f'Removed {proj_file} from: \n{sp.OUTPUT_PROJ_DIR}')
-                print(f'Found file with more recent date for the quarter')
-                print('============================================\n')
-            else:
-                print('\n============================================')
-                print(f"WARNING")
-                print(f"Tried to remove: \n{address_proj_file}")
-                print(f'Address does not exist')
-                print('============================================\n') 
-                
-    # when len(prev_used) == 0
-    else:
-        used_df = data_df
-
+    # fetch the used file, if any, for each quarter of the new files
+    used_df = pl.DataFrame([(yr_qtr, manifest.used_file(yr_qtr))
+                            for yr_qtr in data_df['yr_qtr']],
+                           schema= {'yr_qtr': cf.QTR_KEY_DTYPE,
+                                    'proj_to_delete': pl.String},
+                           orient= 'row')\
+                .with_columns(cf.file_date(pl.col('proj_to_delete'))
+                            .alias('used_date'))
+    
+    # keep only the quarters with new data:
+    # no used file, or a used file with an earlier date
+    # 'proj_to_delete' ref only files that are superceded
+    used_df = data_df.join(used_df,
+                           on= 'yr_qtr',
+                           how= 'left',
+                           coalesce= True)\
+                     .filter((pl.col('used_date').is_null()) | 
+                             (pl.col('used_date') < pl.col('date')))\
+                     .drop('used_date')\
+                     .sort(by= 'yr_qtr')
+    
     del data_df
-    gc.collect()           
+    gc.collect()
     
-    # add dates of projections and year_qtr to record_dict
-    # https://www.rhosignal.com/posts/polars-nested-dtypes/   pl.list explanation
-    # https://www.codemag.com/Article/2212051/Using-the-Polars-DataFrame-Library
-    # pl.show_versions()
+    # remove the output .parquet files of superceded used files
+    # from the manifest; the files are removed from the projections
+    # dataset by write_output_files, just before the manifest is
+    # committed: a run that ends early leaves them in place
+    proj_removals = []
+    for yr_qtr in used_df.filter(pl.col('proj_to_delete')
+                                   .is_not_null())['yr_qtr']:
+        proj_file = manifest.proj_file(yr_qtr)
+        if proj_file is None:
+            continue
+        manifest.remove_proj_file(yr_qtr)
+        proj_removals.append((yr_qtr, proj_file))
 
 # files with new data: files_to_read_list, which is
 # also used below in update projection files section
-    files_to_read_list = \
-        pl.Series(used_df.select('new_files')).to_list()
+    files_to_read_list = used_df['new_files'].to_list()
+    yr_qtrs_to_read_list = used_df['yr_qtr'].to_list()
             
-    # add dates of projections and year_qtr to record_dict
-    record_dict['prev_used_files'] \
-        .extend(files_to_read_list) \
-        .sort(reverse= True)
-        
-    record_dict['proj_yr_qtrs']= \
-        hp.date_to_year_qtr(
-                hp.string_to_date(record_dict['prev_used_files'])
-            ).to_list()
+    # record the new files as the used files for their quarters
+    for yr_qtr, file in zip(yr_qtrs_to_read_list, files_to_read_list):
+        manifest.set_used_file(yr_qtr, file)
+    
     # most recent is first
-    record_dict["latest_used_file"] = record_dict['prev_used_files'][0]
+    latest_used_file = manifest.latest_used_file()
 
 ## +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++              
 ## +++++  fetch the historical data  +++++++++++++++++++++++++++++++++++++++
 ## +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++ 
 
     print('\n================================================')
-    print(f'Updating historical data from: {record_dict["latest_used_file"]}')
+    print(f'Updating historical data from: {latest_used_file}')
     print(f'in directory: \n{sp.INPUT_DIR}')
     print('================================================\n')
     
 ## REAL INTEREST RATES, eoq, from FRED DFII10
-    active_workbook = load_workbook(filename= sp.INPUT_RR_ADDR,
-                                    read_only= True,
-                                    data_only= True)
-    active_sheet = active_workbook.active
-    real_rt_df = rd.fred_reader(active_sheet,
-                                **SHT_FRED_PARAMS)
+    # the store holds the observations read before: read only
+    # those after its last date, and recompute only their quarters
+    # rebuild: read all observations, and rewrite the store
+    rr_input_addr = fred_input([sp.INPUT_RR_CSV_ADDR, sp.INPUT_RR_ADDR])
+    rr_daily_df, real_rt_df = \
+        rs.read_store(sp.OUTPUT_RR_DAILY_ADDR, sp.OUTPUT_RR_QTR_ADDR) \
+        if incremental or rr_input_addr is None else (None, None)
+    
+    if rr_input_addr is None and real_rt_df is None:
+        print('\n============================================')
+        print(f'No {sp.INPUT_RR_FILE} or {sp.INPUT_RR_CSV_FILE} in: '
+              f'\n{sp.INPUT_DIR}')
+        print(f'and no real-rate store at: \n{sp.OUTPUT_RR_QTR_ADDR}')
+        print('Processing ended')
+        print('============================================\n')
+        sys.exit()
+    
+    upd_rr_yr_qtrs = []
+    if rr_input_addr is not None:
+        with pr.stage('read real rates'):
+            new_rr_df = rd.fred_file_reader(
+                rr_input_addr,
+                SHT_FRED_PARAMS,
+                XLSX_BACKEND,
+                cache_dir,
+                after= rs.last_date(rr_daily_df))
+            rr_daily_df, real_rt_df, upd_rr_yr_qtrs = \
+                rs.append_rates(rr_daily_df, real_rt_df,
+                                new_rr_df, YR_QTR_NAME)
+    
+    print('\n============================================')
+    print(f'{len(upd_rr_yr_qtrs)} new or revised quarters of '
+          f'real rates from: \n{rr_input_addr}')
+    print(f'through: {rs.last_date(rr_daily_df)}')
+    print('============================================\n')
+    # the stores to be written: those that changed
+    rate_outputs = []
+    if len(upd_rr_yr_qtrs) > 0:
+        rate_outputs.append((rr_daily_df, real_rt_df,
+                             sp.OUTPUT_RR_DAILY_ADDR,
+                             sp.OUTPUT_RR_QTR_ADDR))
+    
+## REAL-RATE CURVE, eoq, from FRED's fredgraph, if any
+    # the series of the curve, one col each, in one pass over the
+    # file; the curve store is kept as the real-rate store
+    curve_input_addr = fred_input([sp.INPUT_CURVE_CSV_ADDR,
+                                   sp.INPUT_CURVE_ADDR])
+    curve_daily_df, curve_qtr_df = \
+        rs.read_store(sp.OUTPUT_CURVE_DAILY_ADDR,
+                      sp.OUTPUT_CURVE_QTR_ADDR) \
+        if incremental or curve_input_addr is None else (None, None)
+    
+    if curve_input_addr is not None:
+        with pr.stage('read rate curve'):
+            new_curve_df = rd.fred_series_file_reader(
+                curve_input_addr,
+                FRED_HEADER_KEYS,
+                list(CURVE_SERIES),
+                XLSX_BACKEND,
+                after= rs.last_date(curve_daily_df))
+            curve_daily_df, curve_qtr_df, upd_curve_yr_qtrs = \
+                rs.append_rates(curve_daily_df, curve_qtr_df,
+                                new_curve_df, YR_QTR_NAME)
+        
+        print('\n============================================')
+        print(f'{len(upd_curve_yr_qtrs)} new or revised quarters of '
+              f'{list(CURVE_SERIES)} from: \n{curve_input_addr}')
+        print(f'through: {rs.last_date(curve_daily_df)}')
+        print('============================================\n')
+        if len(upd_curve_yr_qtrs) > 0:
+            rate_outputs.append((curve_daily_df, curve_qtr_df,
+                                 sp.OUTPUT_CURVE_DAILY_ADDR,
+                                 sp.OUTPUT_CURVE_QTR_ADDR))
     
 ## HISTORICAL DATA from existing .parquet file
-    latest_file_addr = sp.INPUT_DIR / record_dict["latest_used_file"]
+    latest_file_addr = sp.INPUT_DIR / latest_used_file
     
-    # load s&p workbook, contains the most recent update to hist data
-    active_workbook = load_workbook(filename= latest_file_addr,
-                                    read_only= True,
-                                    data_only= True)
+    # s&p workbook, contains the most recent update to hist data
     
     #++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
     #++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
@@ -334,11 +393,19 @@ def update_data_files():
     #++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
     #++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
     
+    # one pass over each sheet reads all blocks in its plan
+    with pr.stage('read history', file= latest_used_file):
+        est_blocks = rd.read_workbook_blocks(
+            latest_file_addr,
+            {SHT_EST_NAME: SHT_EST_PLAN,
+             SHT_QTR_NAME: SHT_QTR_PLAN,
+             SHT_IND_NAME: SHT_IND_PLAN},
+            XLSX_BACKEND,
+            cache_dir)
+    
     # most recent date and prices
-    active_sheet = active_workbook[SHT_EST_NAME]
-    name_date, actual_df = rd.read_sp_date(active_sheet, 
-                                           **SHT_EST_DATE_PARAMS,
-                                           include_prices= True)
+    actual_df = est_blocks['dates']
+    name_date = actual_df.item(0, 'date')
     
 #++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
 #++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
@@ -349,8 +416,7 @@ def update_data_files():
 #++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
     
     # load historical data, if updates are available
-    df = rd.sp_loader(active_sheet,
-                      **SHT_HIST_PARAMS)
+    df = est_blocks['actuals']
     
     # if any date is None, halt
     if (name_date is None or
@@ -373,108 +439,123 @@ def update_data_files():
 #++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
         
     actual_df = pl.concat([actual_df, df], how= "diagonal")\
-                  .with_columns(pl.col('date')
-                        .map_batches(hp.date_to_year_qtr)
+                  .with_columns(cf.qtr_key(pl.col('date'))
                         .alias(YR_QTR_NAME))
                   
     # merge real_rates with p and e history
-    actual_df = actual_df.join( 
-            real_rt_df, 
-            how="left", 
-            on=[YR_QTR_NAME],
-            coalesce= True)
+    with pr.stage('join real rates'):
+        actual_df = actual_df.join( 
+                real_rt_df, 
+                how="left", 
+                on=[YR_QTR_NAME],
+                coalesce= True)
+    
+    # merge the real-rate curve, if any, with the history
+    if curve_qtr_df is not None:
+        with pr.stage('join rate curve'):
+            actual_df = actual_df.join(
+                    rs.rate_curve(curve_qtr_df,
+                                  CURVE_SERIES,
+                                  CURVE_MATURITIES,
+                                  YR_QTR_NAME),
+                    how= 'left',
+                    on= YR_QTR_NAME,
+                    coalesce= True)
     
     del real_rt_df
+    del curve_daily_df, curve_qtr_df
     del df
     gc.collect()
         
 ## MARGINS
-    margins_df = rd.margin_loader(active_sheet,
-                                  **SHT_BC_MARG_PARAMS)
+    margins_df = est_blocks['margins']
     
     # merge margins with previous data
-    actual_df = actual_df.join(margins_df, 
-                               how="left", 
-                               on= YR_QTR_NAME,
-                               coalesce= True)
+    with pr.stage('join margins'):
+        actual_df = actual_df.join(margins_df, 
+                                   how="left", 
+                                   on= YR_QTR_NAME,
+                                   coalesce= True)
     
     del margins_df
     gc.collect()
 
 #++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
 #++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
-    '''
-## INDUSTRIAL DATA
-    ind_df = rd.industry_loader(active_sheet,
-                                **SHT_BC_IND_PARAMS)
-    
-    actual_df = actual_df.join(
-        ind_df,
-        how= 'left',
-        on= YR_QTR_NAME,
-        coalesce= True
-    )
-    
-    del ind_df
+## SECTOR DATA
+    # not joined to the history: the sector cube, one row for
+    # each quarter, sector, and eps, see sector_func.py
+    with pr.stage('build sector cube'):
+        sector_df = sc.cube_frame(est_blocks['sectors'], YR_QTR_NAME)
+    
+    # upsert the new and revised values into the existing cube
+    # the existing file is unchanged when no value has changed
+    cube_df = sc.read_cube(sp.OUTPUT_SECTOR_ADDR) \
+        if incremental else None
+    with pr.stage('upsert sector cube'):
+        sector_df, upd_sector_qtrs = sc.upsert_cube(cube_df,
+                                                    sector_df,
+                                                    YR_QTR_NAME)
+    print('\n============================================')
+    print(f'{len(upd_sector_qtrs)} new or revised quarters for: '
+          f'\n{sp.OUTPUT_SECTOR_ADDR}')
+    print('============================================\n')
+    
+    del cube_df
     gc.collect()
-    '''
 #++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
 #++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
         
 ## QUARTERLY DATA
-    active_sheet = active_workbook[SHT_QTR_NAME]
-
-    qtrly_df = rd.sp_loader(active_sheet, 
-                              **SHT_QTR_PARAMS)\
-                 .with_columns(pl.col('date')
-                            .map_batches(hp.date_to_year_qtr)
+    qtrly_df = est_blocks['quarterly']\
+                 .with_columns(cf.qtr_key(pl.col('date'))
                             .alias(YR_QTR_NAME))
     
     # merge qtrly with previous data
-    actual_df = actual_df.join(qtrly_df,  
-                               how= "left", 
-                               on= [YR_QTR_NAME],
-                               coalesce= True)
+    with pr.stage('join quarterly'):
+        actual_df = actual_df.join(qtrly_df,  
+                                   how= "left", 
+                                   on= [YR_QTR_NAME],
+                                   coalesce= True)
     
-    del qtrly_df
+    del qtrly_df, est_blocks
     gc.collect()
 
 ## +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
 ## +++++ update projection files +++++++++++++++++++++++++++++++++++++++++++
 ## +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
 
-    # ordinarily a very short list
-    # loop through files_to_read, fetch projections of earnings for each date
+    # ordinarily a very short list, but long when reinitializing
+    # fetch projections of earnings for each new file: each is a
+    # vintage of the projections; files_to_read, the latest in
+    # their quarters, also update the projections dataset
+    # in parallel when workers > 1; results in the order of the files
+    vintage_files = sorted(files_to_archive)
+    with pr.stage('read projections',
+                  files= len(vintage_files)):
+        proj_results = dict(zip(vintage_files, rd.proj_pool_reader(
+            [sp.INPUT_DIR / file for file in vintage_files],
+            workers,
+            SHT_EST_NAME,
+            SHT_EST_PROJ_DATE_PARAMS,
+            SHT_EST_PROJ_PARAMS,
+            YR_QTR_NAME,
+            XLSX_BACKEND,
+            cache_dir)))
+    
     failure_to_read_lst = []
-    for file in files_to_read_list:
-        # echo file name and address to console
-        active_workbook = load_workbook(filename= sp.INPUT_DIR / file,
-                                        read_only= True,
-                                        data_only= True)
-        active_sheet = active_workbook[SHT_EST_NAME]
-        print(f'\n input file: {file}')    
+    proj_outputs = []
+    for yr_qtr, file in zip(yr_qtrs_to_read_list,
+                            files_to_read_list):
+        name_date, proj_df = proj_results[file]
+        # echo file name to console
+        print(f'\n input file: {file}')
         
-# projections of earnings
-        # read date of projection, no prices or other data
-        name_date, _ = \
-            rd.read_sp_date(active_sheet, 
-                            **SHT_EST_PROJ_DATE_PARAMS)
-        name_date = name_date.date()
-    
-        # load projections for the date
-        proj_df = rd.sp_loader(active_sheet, 
-                               **SHT_EST_PROJ_PARAMS)\
-                    .with_columns(pl.col('date')
-                        .map_batches(hp.date_to_year_qtr)
-                        .alias(YR_QTR_NAME))
-
         # if any date is None, abort and continue
-        if (name_date is None or
-            any([item is None
-                for item in proj_df['date']])):
+        if proj_df is None:
             print('\n============================================')
             print('In main(), projections:')
-            print(f'Skipped sp-500 {name_date} missing projection date')
+            print(f'Skipped {file} missing projection date')
             print('============================================\n')
             failure_to_read_lst.append(file)
             continue
@@ -488,75 +569,252 @@ def update_data_files():
             sys.exit()
 ############
 
-## +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
-## +++++ write files +++++++++++++++++++++++++++++++++++++++++++++++++++++++
-## +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
-
-## +++++  write proj_df  ++++++++++++++++++++++++++++++++++++++++++++++++++
+## +++++  record proj_df  +++++++++++++++++++++++++++++++++++++++++++++++++
         output_file_name = \
             f'{PREFIX_OUTPUT_FILE_NAME} {name_date}{EXT_OUTPUT_FILE_NAME}'
-        record_dict['output_proj_files'].append(output_file_name)
-        output_file_address = sp.OUTPUT_PROJ_DIR / output_file_name
+        manifest.set_proj_file(yr_qtr, output_file_name)
         print(f'output file: {output_file_name}')
-        
-        with output_file_address.open('w') as f:
-            proj_df.write_parquet(f)
+        proj_outputs.append((yr_qtr, output_file_name, proj_df))
+    
+## +++++  record the vintages  +++++++++++++++++++++++++++++++++++++++++++
+    # the earlier files in each quarter, as well as the latest
+    vintage_outputs = []
+    for yr_qtr, file in zip(cf.file_names_to_keys(vintage_files),
+                            vintage_files):
+        name_date, proj_df = proj_results[file]
+        if proj_df is None:
+            if file not in failure_to_read_lst:
+                failure_to_read_lst.append(file)
+            continue
+        vintage_outputs.append((str(name_date), yr_qtr, proj_df))
             
-## +++++ write history file ++++++++++++++++++++++++++++++++++++++++++++
-    # move any existing hist file in output_dir to backup
-    if sp.OUTPUT_HIST_ADDR.exists():
-        sp.OUTPUT_HIST_ADDR.rename(sp.BACKUP_HIST_ADDR)
+## +++++ merge history +++++++++++++++++++++++++++++++++++++++++++++++++
+    # upsert the new and revised quarters into the existing hist file
+    # the existing file is unchanged when no quarter has changed
+    if incremental and sp.OUTPUT_HIST_ADDR.exists():
+        hist_df = cf.migrate_qtr_keys(
+                        pl.read_parquet(sp.OUTPUT_HIST_ADDR))
+        with pr.stage('upsert history'):
+            actual_df, upd_yr_qtrs = hp.upsert_rows(hist_df,
+                                                    actual_df,
+                                                    YR_QTR_NAME)
+        del hist_df
         print('\n============================================')
-        print(f'Moved history file from: \n{sp.OUTPUT_HIST_ADDR}')
-        print(f'to: \n{sp.BACKUP_HIST_ADDR}')
+        print(f'{len(upd_yr_qtrs)} new or revised quarters for: '
+              f'\n{sp.OUTPUT_HIST_ADDR}')
+        print([cf.key_label(key) for key in upd_yr_qtrs[:8]])
         print('============================================\n')
     else:
+        upd_yr_qtrs = actual_df[YR_QTR_NAME].to_list()
+    
+    # for the caller: the data to be written and
+    # the manifest as it will be committed
+    # clone(), a cheap copy: a df cannot be used by the caller
+    # while the writer is writing it
+    run_data = {'actual_df': actual_df.clone(),
+                'sector_df': sector_df.clone(),
+                'proj_dfs': {yr_qtr: proj_df.clone()
+                             for yr_qtr, _, proj_df in proj_outputs},
+                'latest_used_file': latest_used_file,
+                'proj_yr_qtrs': manifest.proj_yr_qtrs(),
+                'proj_files': manifest.proj_files(),
+                'writes': None}
+    
+## +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+## +++++ write files +++++++++++++++++++++++++++++++++++++++++++++++++++++++
+## +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    # in writer, if any: the caller can use run_data meanwhile
+    write_args = (manifest, proj_outputs, proj_removals,
+                  vintage_outputs, rate_outputs,
+                  sector_df, upd_sector_qtrs,
+                  actual_df, upd_yr_qtrs,
+                  files_to_archive, files_to_read_list,
+                  failure_to_read_lst)
+    if writer is None:
+        write_output_files(*write_args)
+    else:
+        run_data['writes'] = writer.submit(write_output_files,
+                                           *write_args)
+    return run_data
+
+
+def fred_input(input_addrs):
+    '''the first of input_addrs, FRED's downloads of the same
+       series, that is present: DFII10.csv before DFII10.xlsx
+       return None if there is none
+    '''
+    
+    for input_address in input_addrs:
+        if input_address.exists():
+            return input_address
+    return None
+
+
+@pr.stage('write_output_files')
+def write_output_files(manifest, proj_outputs, proj_removals,
+                       vintage_outputs, rate_outputs,
+                       sector_df, upd_sector_qtrs,
+                       actual_df, upd_yr_qtrs,
+                       files_to_archive, files_to_read_list,
+                       failure_to_read_lst):
+    '''write the projections, their vintages, the rate stores,
+       the sector cube, and the history, archive the input files,
+       then commit the manifest
+       proj_outputs: list of (qtr key, file name, proj_df)
+       proj_removals: list of (qtr key, file name), the projection
+            files of superceded used files, removed just before
+            the manifest is committed
+       vintage_outputs: list of (vintage, qtr key, proj_df); the
+            segment files they supersede are removed after the
+            manifest is committed
+       rate_outputs: list of (observations df, quarters df,
+            observations addr, quarters addr), the rate stores
+            that have changed
+       upd_sector_qtrs: the qtr keys of the new and revised values
+            in sector_df, the sector cube; the cube is not rewritten
+            if there are none
+       upd_yr_qtrs: the qtr keys of the new and revised quarters
+            in actual_df; the history file is not rewritten
+            if there are none
+    '''
+    
+## +++++  write proj_dfs  +++++++++++++++++++++++++++++++++++++++++++++++++
+    # to the partition of the quarter in the projections dataset
+    for yr_qtr, output_file_name, proj_df in proj_outputs:
+        with pr.stage('write projections', file= output_file_name):
+            ds.write_proj(sp.OUTPUT_PROJ_DIR, yr_qtr,
+                          output_file_name, proj_df)
+    
+## +++++  write vintages  ++++++++++++++++++++++++++++++++++++++++++++++++
+    # as deltas against the vintage before, in the vintage store
+    # superseded segment files are removed after the commit
+    with pr.stage('write vintages', vintages= len(vintage_outputs)):
+        written, segment_removals = \
+            vt.add_vintages(manifest, sp.OUTPUT_VINTAGE_DIR,
+                            vintage_outputs)
+    print('\n============================================')
+    print(f'Wrote {written} vintage files to: \n{sp.OUTPUT_VINTAGE_DIR}')
+    print('============================================\n')
+    
+## +++++ write rate stores +++++++++++++++++++++++++++++++++++++++++++++
+    for daily_df, qtr_df, daily_addr, qtr_addr in rate_outputs:
+        with pr.stage('write rate store', file= qtr_addr.name):
+            rs.write_store(daily_df, qtr_df, daily_addr, qtr_addr)
+        print('\n============================================')
+        print(f'Wrote rate store to: \n{daily_addr}')
+        print(f'{qtr_addr}')
+        print('============================================\n')
+    
+## +++++ write sector cube +++++++++++++++++++++++++++++++++++++++++++++
+    if len(upd_sector_qtrs) > 0:
+        with pr.stage('write sector cube', rows= len(sector_df)):
+            sc.write_cube(sector_df, sp.OUTPUT_SECTOR_ADDR)
+        print('\n============================================')
+        print(f'Wrote sector cube to: \n{sp.OUTPUT_SECTOR_ADDR}')
+        print('============================================\n')
+    
+## +++++ write history file ++++++++++++++++++++++++++++++++++++++++++++
+    if len(upd_yr_qtrs) == 0:
         print('\n============================================')
-        print(f'Found no history file at: \n{sp.OUTPUT_HIST_ADDR}')
-        print(f'Wrote no history file to: \n{sp.BACKUP_HIST_ADDR}')
+        print(f'History file is current: \n{sp.OUTPUT_HIST_ADDR}')
+        print('Did not rewrite the history file')
         print('============================================\n')
+    
+    else:
+        # write the new file beside the existing file, then swap
+        tmp_hist_addr = sp.OUTPUT_HIST_ADDR.with_suffix('.tmp')
+        with pr.stage('write history', rows= len(actual_df)):
+            actual_df.write_parquet(tmp_hist_addr)
         
-    # write actual_df, the historical data, into the output file
-    # save sp500_pe_dict to file
-    with sp.OUTPUT_HIST_ADDR.open('w') as f:
-        actual_df.write_parquet(f)
-    print('\n============================================')
-    print(f'Wrote history file to: \n{sp.OUTPUT_HIST_ADDR}')
-    print('============================================\n')
+        # move any existing hist file in output_dir to backup
+        if sp.OUTPUT_HIST_ADDR.exists():
+            sp.OUTPUT_HIST_ADDR.replace(sp.BACKUP_HIST_ADDR)
+            print('\n============================================')
+            print(f'Moved history file from: \n{sp.OUTPUT_HIST_ADDR}')
+            print(f'to: \n{sp.BACKUP_HIST_ADDR}')
+            print('============================================\n')
+        else:
+            print('\n============================================')
+            print(f'Found no history file at: \n{sp.OUTPUT_HIST_ADDR}')
+            print(f'Wrote no history file to: \n{sp.BACKUP_HIST_ADDR}')
+            print('============================================\n')
+            
+        # the historical data, into the output file
+        tmp_hist_addr.replace(sp.OUTPUT_HIST_ADDR)
+        print('\n============================================')
+        print(f'Wrote history file to: \n{sp.OUTPUT_HIST_ADDR}')
+        print('============================================\n')
             
+## +++++ write ipc mirror ++++++++++++++++++++++++++++++++++++++++++++++
+    # after the .parquet files: the mirror is current only if
+    # written after its sources
+    if WRITE_IPC_MIRROR:
+        write_ipc_mirror(actual_df)
+    else:
+        # a mirror that is not rewritten would be stale
+        for mirror_addr in [sp.OUTPUT_HIST_MIRROR_ADDR,
+                            sp.OUTPUT_PROJ_MIRROR_ADDR]:
+            ic.remove_mirror(mirror_addr)
+    
 ## +++++ update archive ++++++++++++++++++++++++++++++++++++++++
     # archive all input files -- uses Path() variables
     # https://sysadminsage.com/python-move-file-to-another-directory/
     print('\n============================================')
-    for file in files_to_archive:
-        input_address = sp.INPUT_DIR / file
-        if input_address.exists():
-            input_address.rename(sp.ARCHIVE_DIR / file)
-            print(f"Archived: {input_address}")
-            
-        else:
-            print(f"\nWARNING")
-            print(f"Tried: {input_address}")
-            print(f'Address does not exist\n')
-    print('============================================\n')
-        
-    sp.INPUT_RR_ADDR.rename(sp.ARCHIVE_DIR / sp.INPUT_RR_FILE)
-    print('\n============================================')
-    print(f"Archived: \n{sp.INPUT_RR_FILE}")
-    print('============================================\n')
+    with pr.stage('archive inputs', files= len(files_to_archive)):
+        for file in files_to_archive:
+            input_address = sp.INPUT_DIR / file
+            if input_address.exists():
+                input_address.rename(sp.ARCHIVE_DIR / file)
+                print(f"Archived: {input_address}")
+                
+            else:
+                print(f"\nWARNING")
+                print(f"Tried: {input_address}")
+                print(f'Address does not exist\n')
+        print('============================================\n')
             
-    # list should begin with most recent items
-    # more efficient search for items to edit above
-    record_dict['prev_files'].sort(reverse= True)
-    record_dict['prev_used_files'].sort(reverse= True)
-    record_dict['output_proj_files'].sort(reverse= True)
+        for input_address in [sp.INPUT_RR_ADDR, sp.INPUT_RR_CSV_ADDR,
+                              sp.INPUT_CURVE_ADDR, sp.INPUT_CURVE_CSV_ADDR]:
+            if input_address.exists():
+                input_address.rename(sp.ARCHIVE_DIR / input_address.name)
+                print('\n============================================')
+                print(f"Archived: \n{input_address.name}")
+                print('============================================\n')
             
-## store record_dict
-    with sp.RECORD_DICT_ADDR.open('w') as f:
-        json.dump(record_dict, f)
+## +++++ remove superceded projection files +++++++++++++++++++++++++++++
+    # after the new projections are written, before the commit
+    # a new file in the same quarter has already replaced its
+    # partition's file, see ds.write_proj
+    written = {(yr_qtr, output_file_name)
+               for yr_qtr, output_file_name, _ in proj_outputs}
+    rewritten = {yr_qtr for yr_qtr, _ in written}
+    for yr_qtr, proj_file in proj_removals:
+        if (yr_qtr, proj_file) in written:
+            continue
+        if ds.remove_proj(sp.OUTPUT_PROJ_DIR, yr_qtr, proj_file):
+            print('\n============================================')
+            print(f'Removed {proj_file} from: \n{sp.OUTPUT_PROJ_DIR}')
+            print(f'Found file with more recent date for the quarter')
+            print('============================================\n')
+        elif yr_qtr not in rewritten:
+            print('\n============================================')
+            print(f"WARNING")
+            print(f"Tried to remove: \n"
+                  f"{ds.proj_file_addr(sp.OUTPUT_PROJ_DIR, yr_qtr, proj_file)}")
+            print(f'Address does not exist')
+            print('============================================\n')
+    
+## commit the manifest: all of this run's updates, or none
+    with pr.stage('commit manifest'):
+        manifest.commit()
+    record_dict = manifest.to_record_dict()
+    
+    # the committed chain no longer names them
+    vt.remove_segments(sp.OUTPUT_VINTAGE_DIR, segment_removals)
+    manifest.close()
     print('\n====================================================')
-    print('Saved record_dict to file')
-    print(f'{sp.RECORD_DICT_ADDR}')
+    print('Saved manifest to file')
+    print(f'{sp.MANIFEST_ADDR}')
     print(f'\nlatest_used_file: {record_dict['latest_used_file']}\n')
     print(f'output_proj_files: \n{record_dict['output_proj_files'][:6]}\n')
     print(f'prev_used_files: \n{record_dict['prev_used_files'][:6]}\n')
@@ -576,5 +834,233 @@ def update_data_files():
     print(failure_to_read_lst)
     print('====================================================')
 
+
+def write_ipc_mirror(actual_df= None):
+    '''write the ipc mirror of the history file and of the
+       projections dataset, unless the mirror is current
+       actual_df: the history, as written to sp.OUTPUT_HIST_ADDR;
+                  None reads the history file
+    '''
+    
+    written = []
+    if (sp.OUTPUT_HIST_ADDR.exists() and
+        not ic.is_current(sp.OUTPUT_HIST_MIRROR_ADDR,
+                          [sp.OUTPUT_HIST_ADDR])):
+        with pr.stage('write history mirror'):
+            if actual_df is None:
+                actual_df = cf.migrate_qtr_keys(
+                                pl.read_parquet(sp.OUTPUT_HIST_ADDR))
+            ic.write_mirror(actual_df, sp.OUTPUT_HIST_MIRROR_ADDR,
+                            [sp.OUTPUT_HIST_ADDR])
+        written.append(sp.OUTPUT_HIST_MIRROR_ADDR)
+    
+    proj_addrs = ds.dataset_addrs(sp.OUTPUT_PROJ_DIR)
+    if (ds.has_partitions(sp.OUTPUT_PROJ_DIR) and
+        not ic.is_current(sp.OUTPUT_PROJ_MIRROR_ADDR, proj_addrs)):
+        with pr.stage('write projections mirror'):
+            ic.write_mirror(ds.scan_proj(sp.OUTPUT_PROJ_DIR).collect(),
+                            sp.OUTPUT_PROJ_MIRROR_ADDR,
+                            proj_addrs)
+        written.append(sp.OUTPUT_PROJ_MIRROR_ADDR)
+    
+    print('\n============================================')
+    if len(written) == 0:
+        print(f'IPC mirror is current: \n{sp.OUTPUT_MIRROR_DIR}')
+    for mirror_addr in written:
+        print(f'Wrote IPC mirror to: \n{mirror_addr}')
+    print('============================================\n')
+
+
+def migrate_data_files():
+    '''rewrite the history file, the projection files, and
+       record_dict, written when yr_qtr held yyyy-Qq labels,
+       with qtr keys in yr_qtr
+    '''
+    
+    files = [sp.OUTPUT_HIST_ADDR,
+             *sorted(sp.OUTPUT_PROJ_DIR.rglob('*.parquet'))]
+    migrated = 0
+    for file in files:
+        if not file.exists():
+            continue
+        df = pl.read_parquet(file)
+        if df.schema.get(YR_QTR_NAME) != pl.String:
+            continue
+        hp.replace_atomically(
+            file, cf.migrate_qtr_keys(df, YR_QTR_NAME).write_parquet)
+        migrated += 1
+    
+    if sp.RECORD_DICT_ADDR.exists():
+        with sp.RECORD_DICT_ADDR.open('r') as f:
+            record_dict = json.load(f)
+        record_dict['proj_yr_qtrs'] = \
+            cf.labels_to_keys(record_dict['proj_yr_qtrs'])
+        with sp.RECORD_DICT_ADDR.open('w') as f:
+            json.dump(record_dict, f)
+    
+    print('\n============================================')
+    print(f'Migrated {migrated} files to qtr keys in: \n{sp.OUTPUT_DIR}')
+    print(f'Migrated record_dict: \n{sp.RECORD_DICT_ADDR}')
+    print('============================================\n')
+
+
+def compact_proj_files():
+    '''rewrite the projection files, one file per quarter in
+       sp.OUTPUT_PROJ_DIR, into the partitions of the projections
+       dataset
+    '''
+    
+    manifest = mf.open_manifest(sp.MANIFEST_ADDR, sp.RECORD_DICT_ADDR)
+    compacted = ds.compact_proj(sp.OUTPUT_PROJ_DIR,
+                                sp.OUTPUT_PROJ_DIR,
+                                manifest.proj_files(),
+                                YR_QTR_NAME)
+    manifest.close()
+    
+    print('\n============================================')
+    print(f'Compacted {len(compacted)} projection files')
+    print(f'into the dataset: \n{sp.OUTPUT_PROJ_DIR}')
+    print('============================================\n')
+    
+    # files that the manifest does not list: their quarters
+    # are unknown, and display_data.py does not read them
+    warn_unlisted_proj_files(ds.loose_proj_files(sp.OUTPUT_PROJ_DIR),
+                             'Did not compact them')
+
+
+def seed_vintages():
+    '''add the projection files in the projections dataset,
+       the latest vintage of each quarter, to the vintage store
+    '''
+    
+    manifest = mf.open_manifest(sp.MANIFEST_ADDR, sp.RECORD_DICT_ADDR)
+    vintage_outputs = []
+    missing = []
+    for yr_qtr, file_name in manifest.proj_files():
+        file_addr = ds.proj_file_addr(sp.OUTPUT_PROJ_DIR,
+                                      yr_qtr, file_name)
+        if not file_addr.exists():
+            missing.append(file_name)
+            continue
+        # "sp-500-eps-est yyyy-mm-dd.parquet" -> "yyyy-mm-dd"
+        vintage = file_name.split(' ')[-1].split('.')[0]
+        vintage_outputs.append((vintage, yr_qtr,
+                                pl.read_parquet(file_addr)))
+    written, segment_removals = \
+        vt.add_vintages(manifest, sp.OUTPUT_VINTAGE_DIR,
+                        vintage_outputs)
+    manifest.commit()
+    manifest.close()
+    vt.remove_segments(sp.OUTPUT_VINTAGE_DIR, segment_removals)
+    
+    print('\n============================================')
+    print(f'Added {len(vintage_outputs)} vintages, {written} files')
+    print(f'to the vintage store: \n{sp.OUTPUT_VINTAGE_DIR}')
+    print('============================================\n')
+    
+    if len(missing) > 0:
+        print('\n============================================')
+        print('WARNING')
+        print(f'{len(missing)} projection files in the manifest '
+              f'are not in the dataset:')
+        for file_name in missing:
+            print(file_name)
+        print('Did not add them to the vintage store')
+        print('============================================\n')
+    warn_unlisted_proj_files(ds.loose_proj_files(sp.OUTPUT_PROJ_DIR),
+                             'Did not add them to the vintage store')
+
+
+def warn_unlisted_proj_files(file_names, action):
+    '''print a warning for projection files in sp.OUTPUT_PROJ_DIR,
+       outside its partitions, that were not read
+       action: what was not done with them
+    '''
+    
+    if len(file_names) == 0:
+        return
+    print('\n============================================')
+    print('WARNING')
+    print(f'{len(file_names)} projection files that the manifest '
+          f'does not list, in: \n{sp.OUTPUT_PROJ_DIR}')
+    for file_name in file_names:
+        print(file_name)
+    print(f'{action}; display_data.py does not read them')
+    print('============================================\n')
+
+
 if __name__ == '__main__':
-    update_data_files()
\ No newline at end of file
+    parser = argparse.ArgumentParser(
+        description= 'update data files from new .xlsx workbooks')
+    parser.add_argument('--workers', type= int, default= 1,
+                        help= 'number of processes that read workbooks')
+    parser.add_argument('--no-cache', action= 'store_true',
+                        help= 'parse every workbook; ignore the cache')
+    parser.add_argument('--rebuild', action= 'store_true',
+                        help= 'rewrite the history file from the '
+                              'latest workbook')
+    parser.add_argument('--migrate', action= 'store_true',
+                        help= 'convert existing output files to qtr '
+                              'keys, then exit')
+    parser.add_argument('--compact', action= 'store_true',
+                        help= 'rewrite the projection files into the '
+                              'partitioned dataset, then exit')
+    parser.add_argument('--seed-vintages', action= 'store_true',
+                        help= 'add the projections dataset to the '
+                              'vintage store, then exit')
+    parser.add_argument('--no-mirror', action= 'store_true',
+                        help= 'do not write the ipc mirror; remove '
+                              'any existing mirror')
+    parser.add_argument('--mirror', action= 'store_true',
+                        help= 'write the ipc mirror of the existing '
+                              'files, then exit')
+    parser.add_argument('--export-json', nargs= '?', type= Path,
+                        const= sp.RECORD_DICT_ADDR, default= None,
+                        metavar= 'ADDR',
+                        help= 'write the manifest as record_dict.json, '
+                              'then exit')
+    parser.add_argument('--profile', nargs= '?', type= Path,
+                        const= sp.PROFILE_TRACE_ADDR, default= None,
+                        metavar= 'ADDR',
+                        help= 'record the time and memory of each stage '
+                              'as a Chrome trace')
+    args = parser.parse_args()
+    
+    if args.migrate:
+        migrate_data_files()
+        sys.exit()
+    
+    if args.compact:
+        compact_proj_files()
+        sys.exit()
+    
+    if args.seed_vintages:
+        seed_vintages()
+        sys.exit()
+    
+    if args.mirror:
+        write_ipc_mirror()
+        sys.exit()
+    
+    if args.no_mirror:
+        WRITE_IPC_MIRROR = False
+    
+    if args.export_json is not None:
+        manifest = mf.open_manifest(sp.MANIFEST_ADDR, sp.RECORD_DICT_ADDR)
+        manifest.export_json(args.export_json)
+        manifest.close()
+        print('\n============================================')
+        print(f'Wrote the manifest to: \n{args.export_json}')
+        print('============================================\n')
+        sys.exit()
+    
+    if args.profile is not None:
+        pr.enable()
+    try:
+        update_data_files(workers= args.workers,
+                          use_cache= not args.no_cache,
+                          incremental= not args.rebuild)
+    finally:
+        # the trace of the stages that ran, even after sys.exit()
+        if args.profile is not None:
+            pr.write_trace(args.profile)
\ No newline at end of file
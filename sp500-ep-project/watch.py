@@ -0,0 +1,218 @@
+'''This program watches input_dir for new sp-500-eps-est workbooks
+   and updates the data files when they arrive, as update_data.py
+   does, then (optional) displays the data, as display_data.py does.
+   It polls input_dir: no external services.
+
+   A workbook is ready when its modification time and size have not
+   changed for SETTLE_SECONDS. A burst of downloads is read as one
+   batch: the update waits until no workbook in input_dir has
+   changed for the debounce period, and until all are ready.
+   DFII10.xlsx or DFII10.csv must be in input_dir, unless update_data.py
+   has written the real-rate store.
+
+   The addresses of documents for this project appear in this program's
+   project directory: S&P500_PE/sp500_pe/__init__.py
+'''
+
+import argparse
+import time
+
+import paths as sp
+import func_module.manifest_func as mf
+import update_data as ud
+
+# seconds between polls of input_dir
+POLL_SECONDS = 30
+# seconds without a change in input_dir before a batch is read
+DEBOUNCE_SECONDS = 120
+# seconds a workbook's mtime and size must be unchanged
+SETTLE_SECONDS = 10
+INPUT_PATTERN = 'sp-500-eps*.xlsx'
+RR_FILES = [sp.INPUT_RR_FILE, sp.INPUT_RR_CSV_FILE]
+
+
+def input_snapshot():
+    '''
+        the workbooks in sp.INPUT_DIR, with the FRED files
+        return dict, file name -> (mtime_ns, size)
+    '''
+
+    snapshot = dict()
+    for file_addr in [*sp.INPUT_DIR.glob(INPUT_PATTERN),
+                      sp.INPUT_RR_ADDR, sp.INPUT_RR_CSV_ADDR]:
+        try:
+            stat = file_addr.stat()
+        except FileNotFoundError:
+            # not there, or renamed since the glob
+            continue
+        snapshot[file_addr.name] = (stat.st_mtime_ns, stat.st_size)
+    return snapshot
+
+
+def new_files(snapshot):
+    '''
+        the sp-500-eps-est workbooks in snapshot that
+        the manifest has not recorded
+        return set of file names
+    '''
+
+    manifest = mf.open_manifest(sp.MANIFEST_ADDR, sp.RECORD_DICT_ADDR)
+    files = manifest.new_input_files(name
+                                     for name in snapshot
+                                     if name not in RR_FILES)
+    manifest.close()
+    return set(files)
+
+
+def is_settled(snapshot, file_names, now_ns):
+    '''
+        T if each file in file_names is in snapshot and
+        was last modified at least SETTLE_SECONDS ago
+    '''
+
+    return all(file_name in snapshot and
+               now_ns - snapshot[file_name][0] >= SETTLE_SECONDS * 1e9
+               for file_name in file_names)
+
+
+def ingest(workers, use_cache, display, pages, force):
+    '''
+        update the data files from the new workbooks,
+        then (optional) display the data
+        return True if the update completed
+    '''
+
+    # update_data_files and display_data end with sys.exit()
+    # when they cannot go on; the watch goes on
+    try:
+        run_data = ud.update_data_files(workers= workers,
+                                        use_cache= use_cache)
+    except SystemExit:
+        return False
+
+    if display:
+        # import here: matplotlib only when the pages are rendered
+        import display_data as dd
+        try:
+            dd.display_data(pages= pages, force= force,
+                            run_data= run_data)
+        except SystemExit:
+            pass
+    return True
+
+
+def watch(poll= POLL_SECONDS, debounce= DEBOUNCE_SECONDS,
+          workers= 1, use_cache= True, display= False,
+          pages= None, force= False, max_batches= None):
+    '''
+        poll sp.INPUT_DIR every poll seconds; read each batch of
+        new workbooks once input_dir has been quiet for debounce
+        seconds and the batch's files have settled
+        display, pages, force: render the display pages after
+            each batch, as display_data
+        max_batches: stop after this many batches; None, never
+    '''
+
+    print('\n============================================')
+    print(f'Watching for new workbooks in: \n{sp.INPUT_DIR}')
+    print(f'poll every {poll}s, debounce {debounce}s')
+    print('Ctrl-C to stop')
+    print('============================================\n')
+
+    prev_snapshot = input_snapshot()
+    last_change = time.monotonic()
+    # the batch that could not be read; not tried again
+    # until input_dir changes
+    failed_snapshot = None
+    waiting_for = None
+    batches = 0
+
+    try:
+        while max_batches is None or batches < max_batches:
+            time.sleep(poll)
+            snapshot = input_snapshot()
+            if snapshot != prev_snapshot:
+                prev_snapshot = snapshot
+                last_change = time.monotonic()
+                continue
+
+            pending = new_files(snapshot)
+            if (len(pending) == 0 or
+                snapshot == failed_snapshot or
+                time.monotonic() - last_change < debounce or
+                not is_settled(snapshot, pending, time.time_ns())):
+                continue
+
+            if (not any(name in snapshot for name in RR_FILES) and
+                not sp.OUTPUT_RR_QTR_ADDR.exists()):
+                if waiting_for != snapshot:
+                    waiting_for = snapshot
+                    print('\n============================================')
+                    print(f'{len(pending)} new workbooks; waiting for '
+                          f'\n{sp.INPUT_RR_ADDR}')
+                    print('============================================\n')
+                continue
+
+            print('\n============================================')
+            print(f'Reading {len(pending)} new workbooks:')
+            for file_name in sorted(pending):
+                print(file_name)
+            print('============================================\n')
+
+            if ingest(workers, use_cache, display, pages, force):
+                failed_snapshot = None
+            else:
+                failed_snapshot = snapshot
+                print('\n============================================')
+                print('Could not update from these workbooks')
+                print('Will try again when input_dir changes')
+                print('============================================\n')
+            batches += 1
+
+            # the update archived the files it read
+            prev_snapshot = input_snapshot()
+            last_change = time.monotonic()
+
+    except KeyboardInterrupt:
+        pass
+
+    print('\n============================================')
+    print(f'Stopped watching: \n{sp.INPUT_DIR}')
+    print(f'{batches} batches read')
+    print('============================================\n')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description= 'update the data files as new .xlsx workbooks '
+                     'arrive in input_dir')
+    parser.add_argument('--poll', type= float, default= POLL_SECONDS,
+                        help= 'seconds between polls of input_dir')
+    parser.add_argument('--debounce', type= float,
+                        default= DEBOUNCE_SECONDS,
+                        help= 'seconds without a change in input_dir '
+                              'before a batch is read')
+    parser.add_argument('--workers', type= int, default= 1,
+                        help= 'number of processes that read workbooks')
+    parser.add_argument('--no-cache', action= 'store_true',
+                        help= 'parse every workbook; ignore the cache')
+    parser.add_argument('--display', action= 'store_true',
+                        help= 'render the display pages after '
+                              'each batch')
+    parser.add_argument('--pages', type= int, nargs= '+',
+                        choices= [0, 1, 2, 3, 4], default= None,
+                        help= 'pages to render; default all')
+    parser.add_argument('--force', action= 'store_true',
+                        help= 'render the pages even if unchanged')
+    parser.add_argument('--batches', type= int, default= None,
+                        help= 'stop after this many batches')
+    args = parser.parse_args()
+
+    watch(poll= args.poll,
+          debounce= args.debounce,
+          workers= args.workers,
+          use_cache= not args.no_cache,
+          display= args.display,
+          pages= args.pages,
+          force= args.force,
+          max_batches= args.batches)
@@ -0,0 +1,42 @@
+'''
+    the tests import the project's modules as its programs do:
+    from the sp500-ep-project directory
+'''
+
+import sys
+from pathlib import Path
+
+import pytest
+
+REPO_DIR = Path(__file__).resolve().parents[1]
+PROJECT_DIR = REPO_DIR / 'sp500-ep-project'
+RECORD_DICT_ADDR = REPO_DIR / 'record_dict.json'
+
+if str(PROJECT_DIR) not in sys.path:
+    sys.path.insert(0, str(PROJECT_DIR))
+
+
+@pytest.fixture
+def record_dict_addr():
+    '''
+        the record_dict.json shipped with the project
+    '''
+    
+    return RECORD_DICT_ADDR
+
+
+@pytest.fixture(scope= 'session')
+def sp_workbook_addr(tmp_path_factory):
+    '''
+        a synthetic sp-500-eps-est workbook, with the sheets
+        and layout that update_data.py reads
+    '''
+    
+    from datetime import datetime
+    import benchmarks.synth_workbooks as sw
+    
+    file_addr = tmp_path_factory.mktemp('input_dir') / \
+        'sp-500-eps-est 2024 12 05.xlsx'
+    sw.make_sp_workbook(file_addr, datetime(2024, 12, 5),
+                        n_hist= 24, seed= 1)
+    return file_addr
@@ -0,0 +1,62 @@
+'''
+    the cache of parsed workbooks: its keys, and the
+    store, load, and eviction of its entries
+'''
+
+import os
+
+import polars as pl
+
+import func_module.cache_func as ch
+
+PARAMS = {'plan': [{'name': 'actuals', 'first_col': 'A'}]}
+
+
+def test_key_changes_with_bytes_params_and_version(tmp_path,
+                                                   monkeypatch):
+    file_addr = tmp_path / 'workbook.xlsx'
+    file_addr.write_bytes(b'workbook')
+    key = ch.cache_key(file_addr, PARAMS)
+    
+    assert ch.cache_key(file_addr, PARAMS) == key
+    assert ch.cache_key(file_addr, {'plan': []}) != key
+    
+    monkeypatch.setattr(ch, 'CACHE_VERSION', ch.CACHE_VERSION + 1)
+    assert ch.cache_key(file_addr, PARAMS) != key
+    monkeypatch.undo()
+    
+    file_addr.write_bytes(b'workbook, revised')
+    assert ch.cache_key(file_addr, PARAMS) != key
+
+
+def test_store_and_load(tmp_path):
+    cache_dir = tmp_path / 'cache_dir'
+    blocks = {'actuals': pl.DataFrame({'yr_qtr': [8101, 8100],
+                                       'price': [1.0, None]}),
+              'dates': pl.DataFrame({'price': [2.0]})}
+    
+    assert ch.cache_load(cache_dir, 'key') is None
+    ch.cache_store(cache_dir, 'key', blocks)
+    loaded = ch.cache_load(cache_dir, 'key')
+    
+    assert loaded.keys() == blocks.keys()
+    for name, df in blocks.items():
+        assert loaded[name].equals(df)
+    assert [path.name for path in cache_dir.iterdir()] == ['key']
+
+
+def test_evict_least_recently_used(tmp_path):
+    cache_dir = tmp_path / 'cache_dir'
+    blocks = {'block': pl.DataFrame({'value': list(range(1000))})}
+    for idx, key in enumerate(['old', 'used', 'new']):
+        ch.cache_store(cache_dir, key, blocks)
+        os.utime(cache_dir / key, (idx, idx))
+    
+    # loading marks the entry as the most recently used
+    ch.cache_load(cache_dir, 'used')
+    entry_bytes = sum(file.stat().st_size
+                      for file in (cache_dir / 'new').iterdir())
+    ch.cache_evict(cache_dir, max_bytes= 2 * entry_bytes)
+    
+    assert sorted(path.name for path in cache_dir.iterdir()) == \
+        ['new', 'used']
@@ -0,0 +1,72 @@
+'''
+    the upsert of the history's rows
+'''
+
+import polars as pl
+
+import func_module.helper_func as hp
+
+YR_QTR = 'yr_qtr'
+
+
+def hist_frame(rows):
+    return pl.DataFrame(rows,
+                        schema= {YR_QTR: pl.Int16,
+                                 'price': pl.Float32,
+                                 'op_eps': pl.Float32},
+                        orient= 'row')
+
+
+HIST_DF = hist_frame([(8102, 10.0, None),
+                      (8101, 9.0, 1.0),
+                      (8100, 8.0, 0.5)])
+
+
+def test_changed_rows():
+    new_df = hist_frame([(8102, 10.0, None), (8101, 9.5, 1.0)])
+    
+    assert hp.changed_rows(HIST_DF, new_df)[YR_QTR].to_list() == [8101]
+    # other cols: all rows are changed
+    assert hp.changed_rows(HIST_DF, new_df.drop('op_eps'))\
+             .height == 2
+
+
+def test_upsert_nothing_new():
+    df, keys = hp.upsert_rows(HIST_DF, HIST_DF.head(2), YR_QTR)
+    
+    assert df is HIST_DF
+    assert keys == []
+
+
+def test_upsert_revised_and_new_rows():
+    new_df = hist_frame([(8103, 11.0, None),
+                         (8102, 10.0, 1.25),
+                         (8101, 9.0, 1.0)])
+    df, keys = hp.upsert_rows(HIST_DF, new_df, YR_QTR)
+    
+    assert sorted(keys) == [8102, 8103]
+    assert df.equals(hist_frame([(8103, 11.0, None),
+                                 (8102, 10.0, 1.25),
+                                 (8101, 9.0, 1.0),
+                                 (8100, 8.0, 0.5)]))
+
+
+def test_replace_atomically(tmp_path):
+    file_addr = tmp_path / 'hist.parquet'
+    HIST_DF.write_parquet(file_addr)
+    
+    def failed_write(tmp_addr):
+        tmp_addr.write_bytes(b'part of a file')
+        raise OSError('disk full')
+    
+    try:
+        hp.replace_atomically(file_addr, failed_write)
+    except OSError:
+        pass
+    assert pl.read_parquet(file_addr).equals(HIST_DF)
+    assert [path.name for path in tmp_path.iterdir()] == ['hist.parquet']
+    
+    new_df = HIST_DF.head(1)
+    hp.replace_atomically(file_addr, new_df.write_parquet)
+    assert pl.read_parquet(file_addr).equals(new_df)
+    assert [path.name for path in tmp_path.iterdir()] == ['hist.parquet']
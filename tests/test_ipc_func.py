@@ -0,0 +1,71 @@
+'''
+    the ipc mirror: its read, and when it is current
+'''
+
+import os
+
+import polars as pl
+import pytest
+
+import func_module.ipc_func as ic
+
+
+@pytest.fixture
+def store(tmp_path):
+    '''
+        a history file, its backup, written earlier,
+        and a mirror of the history
+    '''
+    
+    hist_addr = tmp_path / 'hist.parquet'
+    backup_addr = tmp_path / 'backup.parquet'
+    mirror_addr = tmp_path / 'mirror' / 'hist.arrow'
+    
+    pl.DataFrame({'yr_qtr': [8100, 8099],
+                  'price': [1.0, 2.0]}).write_parquet(backup_addr)
+    os.utime(backup_addr, ns= (10**18, 10**18))
+    hist_df = pl.DataFrame({'yr_qtr': [8101, 8100, 8099],
+                            'price': [3.0, 1.0, 2.0]})
+    hist_df.write_parquet(hist_addr)
+    ic.write_mirror(hist_df, mirror_addr, [hist_addr])
+    return hist_addr, backup_addr, mirror_addr
+
+
+def test_written_mirror_is_current(store):
+    hist_addr, _, mirror_addr = store
+    
+    assert ic.is_current(mirror_addr, [hist_addr])
+    assert ic.read_mirror(mirror_addr).equals(pl.read_parquet(hist_addr))
+    assert ic.scan_mirror(mirror_addr).collect()\
+             .equals(pl.read_parquet(hist_addr))
+
+
+def test_restored_source_makes_mirror_stale(store):
+    hist_addr, backup_addr, mirror_addr = store
+    
+    # restored from the backup: an older mtime than the mirror's
+    backup_addr.replace(hist_addr)
+    assert hist_addr.stat().st_mtime_ns < mirror_addr.stat().st_mtime_ns
+    
+    assert not ic.is_current(mirror_addr, [hist_addr])
+
+
+def test_other_sources_make_mirror_stale(store):
+    hist_addr, backup_addr, mirror_addr = store
+    
+    assert not ic.is_current(mirror_addr, [hist_addr, backup_addr])
+    assert not ic.is_current(mirror_addr, [backup_addr])
+    
+    os.utime(hist_addr)
+    assert not ic.is_current(mirror_addr, [hist_addr])
+
+
+def test_mirror_without_record_is_stale(store):
+    hist_addr, _, mirror_addr = store
+    
+    ic.sources_addr(mirror_addr).unlink()
+    assert not ic.is_current(mirror_addr, [hist_addr])
+    
+    assert ic.remove_mirror(mirror_addr)
+    assert not mirror_addr.exists()
+    assert not ic.remove_mirror(mirror_addr)
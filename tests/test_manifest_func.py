@@ -0,0 +1,71 @@
+'''
+    the manifest: import of record_dict.json, the tables,
+    and the transaction of a run
+'''
+
+import json
+
+import pytest
+
+import func_module.calendar_func as cf
+import func_module.manifest_func as mf
+
+
+@pytest.fixture
+def record_dict(record_dict_addr):
+    with record_dict_addr.open('r') as f:
+        return json.load(f)
+
+
+@pytest.fixture
+def manifest(tmp_path, record_dict_addr):
+    manifest = mf.open_manifest(tmp_path / 'manifest.sqlite',
+                                record_dict_addr)
+    yield manifest
+    manifest.close()
+
+
+def test_import_keeps_all_projection_files(manifest, record_dict):
+    proj_files = dict(manifest.proj_files())
+    
+    assert len(record_dict['output_proj_files']) == 30
+    assert sorted(proj_files.values()) == \
+        sorted(record_dict['output_proj_files'])
+
+
+def test_import_pairs_files_by_position(manifest):
+    # projection files named by the date in the sheet,
+    # not the date in the name of the workbook
+    proj_files = dict(manifest.proj_files())
+    q3_2018, q2_2019 = cf.labels_to_keys(['2018-Q3', '2019-Q2'])
+    
+    assert proj_files[q3_2018] == \
+        'sp-500-eps-est 2018-09-20.parquet'
+    assert proj_files[q2_2019] == \
+        'sp-500-eps-est 2019-06-20.parquet'
+
+
+def test_record_dict_round_trip(manifest, record_dict):
+    exported = manifest.to_record_dict()
+    
+    for key in ['sources', 'latest_used_file',
+                'prev_used_files', 'output_proj_files']:
+        assert exported[key] == record_dict[key]
+    # the manifest holds qtr keys in place of yyyy-Qq labels
+    assert exported['proj_yr_qtrs'] == \
+        cf.labels_to_keys(record_dict['proj_yr_qtrs'])
+    assert sorted(exported['prev_files']) == \
+        sorted(record_dict['prev_files'])
+
+
+def test_uncommitted_updates_are_not_kept(tmp_path):
+    db_addr = tmp_path / 'manifest.sqlite'
+    manifest = mf.open_manifest(db_addr)
+    manifest.add_input_files(['sp-500-eps-est 2025 01 10.xlsx'])
+    manifest.commit()
+    manifest.add_input_files(['sp-500-eps-est 2025 02 10.xlsx'])
+    manifest.close()
+    
+    manifest = mf.open_manifest(db_addr)
+    assert manifest.input_files() == ['sp-500-eps-est 2025 01 10.xlsx']
+    manifest.close()
@@ -0,0 +1,99 @@
+'''
+    the rate stores: appending observations, the end-of-quarter
+    rates, and the curve
+'''
+
+from datetime import date
+
+import polars as pl
+import pytest
+
+import func_module.calendar_func as cf
+import func_module.rate_store_func as rs
+
+YR_QTR = 'yr_qtr'
+
+
+def daily_frame(rows):
+    return pl.DataFrame(rows,
+                        schema= {rs.DATE_COL: pl.Date,
+                                 'DFII5': pl.Float32,
+                                 'DFII10': pl.Float32},
+                        orient= 'row')
+
+
+def test_eoq_keeps_last_observation_of_each_series():
+    daily_df = daily_frame([(date(2024, 3, 27), 1.0, 2.0),
+                            (date(2024, 3, 28), 1.5, 2.5),
+                            # a holiday for one series
+                            (date(2024, 3, 29), None, 2.75),
+                            (date(2024, 4, 1), 1.25, 2.25)])
+    df = rs.eoq_frame(daily_df, YR_QTR)
+    
+    assert df[YR_QTR].to_list() == cf.labels_to_keys(['2024-Q1', 
+                                                     '2024-Q2'])
+    assert df['DFII5'].to_list() == [1.5, 1.25]
+    assert df['DFII10'].to_list() == [2.75, 2.25]
+
+
+def test_append_only_later_dates():
+    old_df = daily_frame([(date(2024, 3, 28), 1.0, 2.0),
+                          (date(2024, 5, 1), 1.1, 2.1)])
+    daily_df, qtr_df, keys = rs.append_rates(None, None, old_df, YR_QTR)
+    assert keys == cf.labels_to_keys(['2024-Q1', '2024-Q2'])
+    
+    # FRED's download repeats, and revises, the earlier dates
+    new_df = daily_frame([(date(2024, 3, 28), 9.0, 9.0),
+                          (date(2024, 5, 1), 9.0, 9.0),
+                          (date(2024, 6, 28), 1.2, 2.2),
+                          (date(2024, 7, 1), 1.3, 2.3)])
+    daily_df, qtr_df, keys = rs.append_rates(daily_df, qtr_df,
+                                             new_df, YR_QTR)
+    
+    assert keys == cf.labels_to_keys(['2024-Q2', '2024-Q3'])
+    assert daily_df[rs.DATE_COL].to_list() == \
+        [date(2024, 3, 28), date(2024, 5, 1),
+         date(2024, 6, 28), date(2024, 7, 1)]
+    assert qtr_df.equals(rs.eoq_frame(daily_df, YR_QTR))
+    
+    # nothing new
+    _, same_df, keys = rs.append_rates(daily_df, qtr_df, new_df, YR_QTR)
+    assert keys == []
+    assert same_df is qtr_df
+
+
+def test_store_round_trip(tmp_path):
+    daily_addr = tmp_path / 'daily.parquet'
+    qtr_addr = tmp_path / 'qtr.parquet'
+    assert rs.read_store(daily_addr, qtr_addr) == (None, None)
+    
+    daily_df, qtr_df, _ = rs.append_rates(
+        None, None, daily_frame([(date(2024, 3, 28), 1.0, 2.0)]), YR_QTR)
+    rs.write_store(daily_df, qtr_df, daily_addr, qtr_addr)
+    read_daily_df, read_qtr_df = rs.read_store(daily_addr, qtr_addr)
+    
+    assert read_daily_df.equals(daily_df)
+    assert read_qtr_df.equals(qtr_df)
+    assert rs.last_date(read_daily_df) == date(2024, 3, 28)
+
+
+def test_rate_curve():
+    qtr_df = pl.DataFrame({YR_QTR: [8100, 8101, 8102],
+                           'DFII5': [1.0, 1.0, None],
+                           'DFII10': [2.0, None, 2.0],
+                           'DFII30': [4.0, 3.0, None],
+                           'DGS10': [5.0, 5.0, 5.0]})
+    maturities = {'DFII5': 5, 'DFII10': 10, 'DFII30': 30, 'DGS10': None}
+    df = rs.rate_curve(qtr_df, maturities, [2, 7, 10, 20, 40], YR_QTR)
+    
+    assert df.columns == [YR_QTR, 'real_rate_2y', 'real_rate_7y',
+                          'real_rate_10y', 'real_rate_20y',
+                          'real_rate_40y']
+    assert df.schema['real_rate_7y'] == pl.Float32
+    rows = df.drop(YR_QTR).rows()
+    # flat beyond the ends, linear between
+    assert rows[0] == pytest.approx((1.0, 1.4, 2.0, 3.0, 4.0))
+    # 10y missing: between 5y and 30y
+    assert rows[1] == pytest.approx((1.0, 1.16, 1.4, 2.2, 3.0))
+    # only 10y
+    assert rows[2] == pytest.approx((2.0, 2.0, 2.0, 2.0, 2.0))
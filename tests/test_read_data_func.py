@@ -0,0 +1,88 @@
+'''
+    the readers: SheetIndex against the cell-by-cell openpyxl
+    lookups, the compiled plan against the loaders, and the
+    fast backend against openpyxl
+'''
+
+import openpyxl
+import pytest
+
+import func_module.helper_func as hp
+import func_module.read_data_func as rd
+import update_data as ud
+
+
+@pytest.fixture(scope= 'module')
+def worksheets(sp_workbook_addr):
+    '''
+        the ESTIMATES&PEs sheet, by openpyxl, with cell access
+    '''
+    
+    workbook = openpyxl.load_workbook(sp_workbook_addr)
+    yield workbook[ud.SHT_EST_NAME]
+    workbook.close()
+
+
+def test_sheet_index_matches_worksheet(worksheets):
+    wksht = worksheets
+    index = hp.SheetIndex(wksht)
+    
+    for keys in [ud.SHT_HIST_PARAMS['act_key'],
+                 ud.SHT_BC_MARG_PARAMS['row_key'],
+                 ud.SHT_EST_DATE_PARAMS['date_keys']]:
+        assert hp.find_key_row(wksht, 'A', 1, keys) > 0
+        for start_row in [1, 10, 40]:
+            assert hp.find_key_row(index, 'A', start_row, keys) == \
+                hp.find_key_row(wksht, 'A', start_row, keys)
+    
+    row = hp.find_key_row(wksht, 'A', 1, ud.SHT_HIST_PARAMS['act_key'])
+    assert hp.find_key_col(index, row, 1, None) == \
+        hp.find_key_col(wksht, row, 1, None)
+    for col_ltr in ['A', 'B', 'D', 'J']:
+        for row_number in [1, 5, row, row + 1]:
+            assert hp.cell_value(index, col_ltr, row_number) == \
+                hp.cell_value(wksht, col_ltr, row_number)
+
+
+def test_plan_matches_loaders(sp_workbook_addr):
+    workbook = rd.open_workbook(sp_workbook_addr, 'openpyxl')
+    est_sht = hp.SheetIndex(workbook[ud.SHT_EST_NAME])
+    ind_sht = hp.SheetIndex(workbook[ud.SHT_IND_NAME])
+    blocks = rd.read_blocks(est_sht, ud.SHT_EST_PLAN)
+    blocks |= rd.read_blocks(ind_sht, ud.SHT_IND_PLAN)
+    
+    loaded = {
+        'dates': rd.read_sp_date(est_sht,
+                                 **{**ud.SHT_EST_DATE_PARAMS,
+                                    'include_prices': True})[1],
+        'actuals': rd.sp_loader(est_sht, **ud.SHT_HIST_PARAMS),
+        'margins': rd.margin_loader(est_sht, **ud.SHT_BC_MARG_PARAMS),
+        'sectors': rd.industry_loader(ind_sht, **ud.SHT_BC_IND_PARAMS)}
+    workbook.close()
+    
+    for name, df in loaded.items():
+        assert blocks[name].equals(df), name
+
+
+def test_backends_agree(sp_workbook_addr):
+    sheet_plans = {ud.SHT_EST_NAME: ud.SHT_EST_PLAN,
+                   ud.SHT_QTR_NAME: ud.SHT_QTR_PLAN,
+                   ud.SHT_IND_NAME: ud.SHT_IND_PLAN}
+    fast = rd.read_workbook_blocks(sp_workbook_addr, sheet_plans, 'fast')
+    slow = rd.read_workbook_blocks(sp_workbook_addr, sheet_plans,
+                                   'openpyxl')
+    
+    assert fast.keys() == slow.keys()
+    for name in fast:
+        assert fast[name].equals(slow[name]), name
+
+
+def test_sector_block(sp_workbook_addr):
+    blocks = rd.read_workbook_blocks(sp_workbook_addr,
+                                     {ud.SHT_IND_NAME: ud.SHT_IND_PLAN})
+    df = blocks['sectors']
+    
+    # op and rep eps for each of the 48 indexes, and yr_qtr
+    assert df.width == 2 * ud.NUM_BASE_IND_NAMES + 1
+    assert df.height > 0
+    assert df[ud.YR_QTR_NAME].is_unique().all()
@@ -0,0 +1,79 @@
+'''
+    the sector cube: its rows, the upsert, and the file
+'''
+
+import polars as pl
+
+import func_module.sector_func as sc
+
+YR_QTR = 'yr_qtr'
+
+
+def industry_frame(values):
+    '''
+        the wide df of industry_loader, two sectors, 
+        for the qtr keys of values: key -> one value
+    '''
+    
+    keys = list(values)
+    cols = {YR_QTR: keys}
+    for prefix in sc.EPS_PREFIXES:
+        for sector in ['S&P 500', 'S&P 500 Energy']:
+            cols[f'{prefix} {sector}'] = list(values.values())
+    return pl.DataFrame(cols, schema_overrides= {YR_QTR: pl.Int16})
+
+
+def test_cube_frame():
+    df = sc.cube_frame(industry_frame({8101: 1.0, 8100: 2.0}), YR_QTR)
+    
+    assert df.columns == [YR_QTR, sc.SECTOR, sc.EPS, sc.VALUE]
+    assert df.height == 2 * 2 * 2
+    assert df.schema[sc.EPS] == sc.EPS_DTYPE
+    assert df.schema[sc.VALUE] == pl.Float32
+    assert df[sc.SECTOR].unique().sort().to_list() == \
+        ['S&P 500', 'S&P 500 Energy']
+    assert df.equals(df.sort(by= [sc.SECTOR, sc.EPS, YR_QTR]))
+
+
+def test_upsert_cube():
+    cube_df = sc.cube_frame(industry_frame({8101: 1.0, 8100: 2.0}),
+                            YR_QTR)
+    df, keys = sc.upsert_cube(None, cube_df, YR_QTR)
+    assert df.equals(cube_df)
+    assert keys == [8100, 8101]
+    
+    # the same rows change nothing
+    df, keys = sc.upsert_cube(cube_df, cube_df, YR_QTR)
+    assert df is cube_df
+    assert keys == []
+    
+    # 8101 revised, 8102 new, 8100 absent from the workbook
+    new_df = sc.cube_frame(industry_frame({8102: 3.0, 8101: 1.5}),
+                           YR_QTR)
+    df, keys = sc.upsert_cube(cube_df, new_df, YR_QTR)
+    assert keys == [8101, 8102]
+    values = dict(df.filter(pl.col(sc.SECTOR) == 'S&P 500',
+                            pl.col(sc.EPS) == 'op')
+                    .select(YR_QTR, sc.VALUE)
+                    .iter_rows())
+    assert values == {8100: 2.0, 8101: 1.5, 8102: 3.0}
+    assert df.equals(df.sort(by= [sc.SECTOR, sc.EPS, YR_QTR]))
+
+
+def test_cube_round_trip(tmp_path):
+    cube_addr = tmp_path / 'sector_eps.parquet'
+    assert sc.read_cube(cube_addr) is None
+    
+    cube_df = sc.cube_frame(industry_frame({8101: 1.0, 8100: None}),
+                            YR_QTR)
+    sc.write_cube(cube_df, cube_addr)
+    assert sc.read_cube(cube_addr).equals(cube_df)
+    
+    df = sc.scan_cube(cube_addr, sectors= ['S&P 500 Energy'],
+                      eps= 'rep')\
+           .collect()
+    assert df.schema[sc.SECTOR] == pl.Categorical
+    assert df.height == 2
+    assert df[sc.SECTOR].cast(pl.String).unique().to_list() == \
+        ['S&P 500 Energy']
+    assert df[sc.VALUE].null_count() == 1
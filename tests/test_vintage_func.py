@@ -0,0 +1,161 @@
+'''
+    the vintage store: deltas, the chain of segments, and
+    the rewrite when an earlier vintage arrives
+'''
+
+from datetime import date, timedelta
+
+import polars as pl
+import pytest
+
+import func_module.manifest_func as mf
+import func_module.vintage_func as vt
+
+
+def proj_frame(seed, n_qtrs= 10):
+    '''
+        projections for n_qtrs target qtrs, most recent first;
+        seed shifts the first qtr and revises some values
+    '''
+    
+    keys = list(range(8100 + seed + n_qtrs, 8100 + seed, -1))
+    return pl.DataFrame(
+        {vt.KEY: keys,
+         'op_eps': [float(key % 7 + seed % 3) for key in keys],
+         'rep_eps': [None if key % 5 == 0 else float(key % 11)
+                     for key in keys]},
+        schema= {vt.KEY: pl.Int16,
+                 'op_eps': pl.Float32,
+                 'rep_eps': pl.Float32})
+
+
+def vintage_label(idx):
+    return (date(2020, 1, 3) + timedelta(weeks= idx)).isoformat()
+
+
+@pytest.fixture
+def manifest(tmp_path):
+    manifest = mf.open_manifest(tmp_path / 'manifest.sqlite')
+    yield manifest
+    manifest.close()
+
+
+def test_delta_round_trip():
+    prev_df = proj_frame(0)
+    df = proj_frame(2)
+    delta_df = vt.delta_frame(prev_df, df)
+    
+    # new and revised rows, and the dropped target qtrs
+    assert delta_df.height < prev_df.height + df.height
+    assert delta_df.filter(pl.col(vt.DELETED)).height == 2
+    assert vt.apply_delta(prev_df, delta_df).equals(df)
+
+
+def test_delta_of_same_frame_is_empty():
+    df = proj_frame(0)
+    delta_df = vt.delta_frame(df, df)
+    
+    assert delta_df.height == 0
+    assert vt.apply_delta(df, delta_df).equals(df)
+
+
+def test_unkeyed_frames_have_no_delta():
+    df = proj_frame(0)
+    
+    assert vt.delta_frame(None, df) is None
+    assert vt.delta_frame(df, df.sort(vt.KEY)) is None
+    assert vt.delta_frame(df, pl.concat([df, df.head(1)])) is None
+    assert vt.delta_frame(df, df.drop('rep_eps')) is None
+
+
+def test_every_vintage_is_rebuilt(manifest, tmp_path):
+    vintage_dir = tmp_path / 'vintages'
+    dfs = {vintage_label(idx): proj_frame(idx) 
+           for idx in range(2 * vt.SNAPSHOT_EVERY + 3)}
+    
+    # one vintage at a time, as update_data.py adds them
+    for vintage, df in dfs.items():
+        _, removals = vt.add_vintages(manifest, vintage_dir,
+                                      [(vintage, 8200, df)])
+        manifest.commit()
+        vt.remove_segments(vintage_dir, removals)
+    chain = manifest.vintages()
+    
+    assert [entry[0] for entry in chain] == list(dfs)
+    assert [entry[3] for entry in chain].count('snapshot') == 3
+    assert len(list(vintage_dir.glob('*.parquet'))) == 3
+    for vintage, df in dfs.items():
+        assert vt.read_vintage(vintage_dir, chain, vintage).equals(df)
+    assert vt.read_vintage(vintage_dir, chain, '1999-01-01') is None
+
+
+def test_earlier_vintage_rewrites_the_store(manifest, tmp_path):
+    vintage_dir = tmp_path / 'vintages'
+    dfs = {vintage_label(idx): proj_frame(idx) 
+           for idx in range(0, 2 * vt.SNAPSHOT_EVERY, 2)}
+    vt.add_vintages(manifest, vintage_dir,
+                    [(vintage, 8200, df) for vintage, df in dfs.items()])
+    
+    # a vintage between the first two, and a revision of the third
+    early = {vintage_label(1): proj_frame(1),
+             vintage_label(4): proj_frame(5)}
+    written, removals = vt.add_vintages(
+        manifest, vintage_dir,
+        [(vintage, 8201, df) for vintage, df in early.items()])
+    manifest.commit()
+    vt.remove_segments(vintage_dir, removals)
+    dfs |= early
+    chain = manifest.vintages()
+    
+    assert [entry[0] for entry in chain] == sorted(dfs)
+    assert chain[0][3] == 'snapshot'
+    for vintage, df in dfs.items():
+        assert vt.read_vintage(vintage_dir, chain, vintage).equals(df)
+    
+    # no segment file is left that the chain does not name
+    assert written == 2
+    assert {entry[2] for entry in chain} == \
+        {path.name for path in vintage_dir.glob('*.parquet')}
+    assert manifest.latest_vintages() == \
+        [(8201, vintage_label(4)), (8200, max(dfs))]
+
+
+def test_uncommitted_vintages_keep_the_store(tmp_path):
+    manifest_addr = tmp_path / 'manifest.sqlite'
+    vintage_dir = tmp_path / 'vintages'
+    dfs = {vintage_label(idx): proj_frame(idx) 
+           for idx in range(1, vt.SNAPSHOT_EVERY + 3)}
+    manifest = mf.open_manifest(manifest_addr)
+    vt.add_vintages(manifest, vintage_dir,
+                    [(vintage, 8200, df) for vintage, df in dfs.items()])
+    manifest.commit()
+    manifest.close()
+    
+    # an earlier vintage and a later one, then the run fails
+    # before the manifest is committed
+    manifest = mf.open_manifest(manifest_addr)
+    _, removals = vt.add_vintages(
+        manifest, vintage_dir,
+        [(vintage_label(0), 8199, proj_frame(0)),
+         (vintage_label(20), 8200, proj_frame(20))])
+    assert len(removals) > 0
+    manifest.close()
+    
+    manifest = mf.open_manifest(manifest_addr)
+    chain = manifest.vintages()
+    assert [entry[0] for entry in chain] == list(dfs)
+    for vintage, df in dfs.items():
+        assert vt.read_vintage(vintage_dir, chain, vintage).equals(df)
+    
+    # the next run rebuilds from the committed chain
+    _, removals = vt.add_vintages(manifest, vintage_dir,
+                                  [(vintage_label(0), 8199,
+                                    proj_frame(0))])
+    manifest.commit()
+    vt.remove_segments(vintage_dir, removals)
+    chain = manifest.vintages()
+    manifest.close()
+    
+    dfs[vintage_label(0)] = proj_frame(0)
+    for vintage, df in dfs.items():
+        assert vt.read_vintage(vintage_dir, chain, vintage).equals(df)